@@ -0,0 +1,18 @@
+-- Pre-aggregated business summary, one row per day.
+-- Counter figures are bucketed by DATE(counter.date_created),
+-- test figures by DATE(patient_tests.verified_at).
+CREATE TABLE IF NOT EXISTS business_daily_rollup (
+    day                     DATE            NOT NULL PRIMARY KEY,
+    total_patient           INT             NOT NULL DEFAULT 0,
+    pending_patient         INT             NOT NULL DEFAULT 0,
+    patient_processed       INT             NOT NULL DEFAULT 0,
+    total_discount          DECIMAL(14,2)   NOT NULL DEFAULT 0,
+    total_amount            DECIMAL(14,2)   NOT NULL DEFAULT 0,
+    paid_amount             DECIMAL(14,2)   NOT NULL DEFAULT 0,
+    due_amount              DECIMAL(14,2)   NOT NULL DEFAULT 0,
+    total_test              INT             NOT NULL DEFAULT 0,
+    processed_test          INT             NOT NULL DEFAULT 0,
+    unprocessed_test_count  INT             NOT NULL DEFAULT 0,
+    refreshed_at            DATETIME        NOT NULL,
+    KEY idx_business_daily_rollup_refreshed (refreshed_at)
+) ENGINE=InnoDB;
@@ -0,0 +1,55 @@
+-- Daily sales / voucher aggregates maintained by utils/rollups.py.
+-- Counter figures are bucketed by DATE(counter.created_at), voucher figures
+-- by journal_voucher.date. trash is part of the key so reports can include
+-- or exclude trashed rows. A NULL collection centre / user is stored as 0.
+
+-- which days of each rollup are materialised (a missing row = recompute)
+CREATE TABLE IF NOT EXISTS rollup_days (
+    rollup          VARCHAR(32)     NOT NULL,
+    day             DATE            NOT NULL,
+    refreshed_at    DATETIME        NOT NULL,
+    PRIMARY KEY (rollup, day)
+) ENGINE=InnoDB;
+
+CREATE TABLE IF NOT EXISTS counter_daily_rollup (
+    day             DATE            NOT NULL,
+    trash           TINYINT         NOT NULL DEFAULT 0,
+    counters        INT             NOT NULL DEFAULT 0,
+    total_fee       DECIMAL(14,2)   NOT NULL DEFAULT 0,
+    paid            DECIMAL(14,2)   NOT NULL DEFAULT 0,
+    discount        DECIMAL(14,2)   NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, trash)
+) ENGINE=InnoDB;
+
+CREATE TABLE IF NOT EXISTS counter_cc_daily_rollup (
+    day             DATE            NOT NULL,
+    cc              INT             NOT NULL DEFAULT 0,
+    trash           TINYINT         NOT NULL DEFAULT 0,
+    counters        INT             NOT NULL DEFAULT 0,
+    total_fee       DECIMAL(14,2)   NOT NULL DEFAULT 0,
+    paid            DECIMAL(14,2)   NOT NULL DEFAULT 0,
+    discount        DECIMAL(14,2)   NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, cc, trash)
+) ENGINE=InnoDB;
+
+CREATE TABLE IF NOT EXISTS counter_user_daily_rollup (
+    day             DATE            NOT NULL,
+    user_id         INT             NOT NULL DEFAULT 0,
+    trash           TINYINT         NOT NULL DEFAULT 0,
+    counters        INT             NOT NULL DEFAULT 0,
+    total_fee       DECIMAL(14,2)   NOT NULL DEFAULT 0,
+    paid            DECIMAL(14,2)   NOT NULL DEFAULT 0,
+    discount        DECIMAL(14,2)   NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, user_id, trash),
+    KEY idx_counter_user_daily_rollup_user (user_id, day)
+) ENGINE=InnoDB;
+
+CREATE TABLE IF NOT EXISTS voucher_daily_rollup (
+    day             DATE            NOT NULL,
+    voucher_type    VARCHAR(10)     NOT NULL,
+    trash           TINYINT         NOT NULL DEFAULT 0,
+    vouchers        INT             NOT NULL DEFAULT 0,
+    total_dr        DECIMAL(14,2)   NOT NULL DEFAULT 0,
+    total_cr        DECIMAL(14,2)   NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, voucher_type, trash)
+) ENGINE=InnoDB;
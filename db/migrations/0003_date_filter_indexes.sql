@@ -0,0 +1,11 @@
+-- Indexes for the half-open date range filters (utils/date_filters.py):
+--   col >= from_date AND col < to_date + 1 day
+-- MySQL has no CREATE INDEX IF NOT EXISTS; `flask --app main db upgrade` applies this once.
+CREATE INDEX idx_counter_created_at ON counter (created_at);
+CREATE INDEX idx_counter_date_created ON counter (date_created);
+CREATE INDEX idx_patient_tests_verified_at ON patient_tests (verified_at);
+CREATE INDEX idx_patient_tests_reporting_time ON patient_tests (reporting_time);
+CREATE INDEX idx_patient_tests_created_at ON patient_tests (created_at);
+CREATE INDEX idx_patient_entry_created_at ON patient_entry (created_at);
+CREATE INDEX idx_cash_date ON cash (date);
+CREATE INDEX idx_journal_voucher_date ON journal_voucher (date);
@@ -0,0 +1,22 @@
+-- Composite indexes for the hot join / lookup keys used in routes/.
+-- Applied by `flask --app main db upgrade`; checked by `flask --app main db explain-check`.
+
+-- report loader, result entry, verification: tests of a patient / counter
+CREATE INDEX idx_patient_tests_patient_counter ON patient_tests (patient_id, counter_id);
+CREATE INDEX idx_patient_tests_counter_test ON patient_tests (counter_id, test_id);
+
+-- parameter history and result upserts (counter first: it is the join key)
+CREATE INDEX idx_patient_results_counter_parameter ON patient_results (counter_id, parameter_id);
+
+-- patient -> counters
+CREATE INDEX idx_counter_pt_id ON counter (pt_id);
+
+-- test profile -> parameters
+CREATE INDEX idx_parameters_test_profile ON parameters (test_profile_id);
+
+-- ledger: entries of an account head in a date range; voucher -> entries
+CREATE INDEX idx_jv_entries_account_date ON journal_voucher_entries (account_head_id, date);
+CREATE INDEX idx_jv_entries_voucher ON journal_voucher_entries (journal_voucher_id);
+
+-- role_required / login permission lookups
+CREATE INDEX idx_user_module_permissions_user_module ON user_module_permissions (userid, modulename);
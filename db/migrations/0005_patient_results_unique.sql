@@ -0,0 +1,13 @@
+-- One result row per (counter, patient test, parameter), required by the
+-- bulk upsert in utils/result_writer.py.
+-- Older data can hold duplicates: keep the oldest row (the one the previous
+-- SELECT-then-UPDATE code kept updating) and drop the rest.
+DELETE pr FROM patient_results pr
+JOIN patient_results keep_row
+    ON keep_row.counter_id = pr.counter_id
+    AND keep_row.patient_test_id = pr.patient_test_id
+    AND keep_row.parameter_id = pr.parameter_id
+    AND keep_row.id < pr.id;
+
+ALTER TABLE patient_results
+    ADD UNIQUE KEY uq_patient_results_counter_test_parameter (counter_id, patient_test_id, parameter_id);
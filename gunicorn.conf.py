@@ -0,0 +1,32 @@
+import multiprocessing
+import os
+
+
+# ---------- Gunicorn settings (override through env vars) ----------
+#   gunicorn -c gunicorn.conf.py wsgi:app
+# Graceful restart: kill -HUP <master pid>  (new workers start, old ones finish
+# their requests within WEB_GRACEFUL_TIMEOUT).
+
+bind = os.getenv("WEB_BIND", f"0.0.0.0:{os.getenv('PORT', 5000)}")
+
+# processes x threads; threads share one worker's MySQL pool, so keep
+# MYSQL_POOL_SIZE >= WEB_THREADS
+workers = int(os.getenv("WEB_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("WEB_THREADS", 4))
+worker_class = "gthread"
+
+# recycle a worker after N requests (+ jitter so they do not all restart together)
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.getenv("WEB_MAX_REQUESTS_JITTER", 200))
+
+timeout = int(os.getenv("WEB_TIMEOUT", 60))
+graceful_timeout = int(os.getenv("WEB_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("WEB_KEEPALIVE", 5))
+
+# build the app in each worker, never in the master: pools, threads and
+# sockets must not be shared across a fork
+preload_app = False
+
+accesslog = os.getenv("WEB_ACCESS_LOG", "-")
+errorlog = os.getenv("WEB_ERROR_LOG", "-")
+loglevel = os.getenv("WEB_LOG_LEVEL", "info")
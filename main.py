@@ -1,7 +1,13 @@
 from flask import Flask, jsonify, request, make_response,render_template
 from dotenv import load_dotenv
-from flask_mysqldb import MySQL
+from utils.db_pool import PooledMySQL
 import os
+from utils.token_store import RevokedTokenStore
+from utils.table_versions import TableVersionStore
+from utils.asset_cache import preload_assets
+from utils.compression import init_compression
+from utils.rollups import rollups_cli
+from utils.migrations import db_cli
 
 
 # Import blueprints (only once)
@@ -45,111 +51,151 @@ from routes.invoicepdf.invoicepdf import invoicepdf_bp
 from routes.balance_sheet.balance_sheet import balance_sheet_report_bp
 from routes.trial_balance.trial_balance import trial_balance_report_bp
 from routes.stock_usage_report.stock_usage_report import stock_usage_report_bp
+from routes.pdf_jobs.pdf_jobs import pdf_jobs_bp
+from routes.metrics.metrics import metrics_bp
 # Load .env variables
 load_dotenv()
-app = Flask(__name__)
-
-# Accept both with / without trailing slash (prevents 308 redirects)
-app.url_map.strict_slashes = False
-
-# file uploader configue
-UPLOAD_FOLDER = 'static/uploads'
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-# Set secret key from .env
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY')
-# app.config['TOKEN_EXPIRY_MINUTES'] = int(os.getenv("TOKEN_EXPIRY_MINUTES", 10))  # default 10 minutes
-
-
-#  Blacklist set
-app.blacklisted_tokens = set()
-# ---------- MySQL Config ----------
-try:
-    app.config['MYSQL_HOST'] = os.getenv('MYSQL_HOST', '127.0.0.1')
-    app.config['MYSQL_USER'] = os.getenv('MYSQL_USER', 'root')
-    app.config['MYSQL_PASSWORD'] = os.getenv('MYSQL_PASSWORD', '')
-    app.config['MYSQL_DB'] = os.getenv('MYSQL_DB', '')
-    app.config['MYSQL_PORT'] = int(os.getenv('MYSQL_PORT', 3306))
-
-    mysql = MySQL(app)
-    app.mysql = mysql
-    print(" MySQL config loaded successfully:", app.config['MYSQL_HOST'], app.config['MYSQL_DB'])
-except Exception as e:
-    print("MySQL config failed:", str(e))
-    
-# ---------- Manual CORS (Werkzeug / Flask) ----------
-@app.after_request
-def add_cors_headers(response):
-    response.headers['Access-Control-Allow-Origin'] = '*'
-    response.headers['Access-Control-Allow-Methods'] = 'GET,POST,PUT,DELETE,OPTIONS'
-    response.headers['Access-Control-Allow-Headers'] = 'Content-Type,Authorization'
-    response.headers['Access-Control-Allow-Credentials'] = 'true'
-    return response
-
-@app.before_request
-def handle_preflight():
-    if request.method == 'OPTIONS':
-        resp = make_response()
-        resp.status_code = 200
-        resp.headers['Access-Control-Allow-Origin'] = '*'
-        resp.headers['Access-Control-Allow-Methods'] = 'GET,POST,PUT,DELETE,OPTIONS'
-        resp.headers['Access-Control-Allow-Headers'] = 'Content-Type,Authorization'
-        resp.headers['Access-Control-Allow-Credentials'] = 'true'
-        return resp
-
-
-# Root test route
-@app.route("/api")
-def first():
-    return render_template("index.html")
-    
-
-
-# ---------- Register Blueprints ----------
-app.register_blueprint(department_bp)
-app.register_blueprint(consultant_bp)
-app.register_blueprint(parameter_bp)
-app.register_blueprint(interpretation_bp)
-app.register_blueprint(packages_bp)
-app.register_blueprint(users_bp)
-app.register_blueprint(companies_panel_bp)
-app.register_blueprint(role_bp)
-app.register_blueprint(test_profile_bp)
-app.register_blueprint(patient_entry_bp)
-app.register_blueprint(invoice_bp)
-app.register_blueprint(results_bp)
-app.register_blueprint(cash_bp) 
-app.register_blueprint(report_bp)
-app.register_blueprint(pdfreport_bp)
-app.register_blueprint(authentication_bp)
-app.register_blueprint(permission_bp)
-app.register_blueprint(collectioncenter_bp)
-app.register_blueprint(lab_bp)
-app.register_blueprint(reporting_bp)
-app.register_blueprint(invoicepdf_bp)
-app.register_blueprint(balance_sheet_report_bp)
-app.register_blueprint(trial_balance_report_bp)
-app.register_blueprint(stock_usage_report_bp)
-#main
-
-
-
-# ---------- Account Book Blueprints ----------
-app.register_blueprint(account_bp)
-app.register_blueprint(voucher_bp)
-app.register_blueprint(bank_payment_bp)
-app.register_blueprint(bank_receipt_voucher_bp) 
-app.register_blueprint(cash_payment_bp)
-app.register_blueprint(cash_receipt_bp)
-app.register_blueprint(account_settings_bp)
-app.register_blueprint(liabilities_bp)
-app.register_blueprint(stock_items_bp)
-app.register_blueprint(stock_purchase_bp)
-app.register_blueprint(stock_usage_bp)
-app.register_blueprint(inventory_bp)
-app.register_blueprint(dashboard_bp)
-
-# ---------- Run App ----------
+
+
+def create_app():
+    """Build the Flask app. Each server worker calls this once, so the MySQL
+    pool, caches and background threads belong to that worker."""
+    app = Flask(__name__)
+
+    # Accept both with / without trailing slash (prevents 308 redirects)
+    app.url_map.strict_slashes = False
+
+    # file uploader configue
+    UPLOAD_FOLDER = 'static/uploads'
+    app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+    # Set secret key from .env
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY')
+    # app.config['TOKEN_EXPIRY_MINUTES'] = int(os.getenv("TOKEN_EXPIRY_MINUTES", 10))  # default 10 minutes
+
+
+    #  Revoked (logged out) tokens, shared by all workers through a SQLite file
+    app.revoked_tokens = RevokedTokenStore(
+        os.getenv('REVOKED_TOKENS_DB', os.path.join(app.instance_path, 'revoked_tokens.sqlite3'))
+    )
+    #  Table change counters (catalogue cache / ETags), shared the same way
+    app.table_versions = TableVersionStore(
+        os.getenv('TABLE_VERSIONS_DB', os.path.join(app.instance_path, 'table_versions.sqlite3'))
+    )
+    # ---------- MySQL Config ----------
+    try:
+        app.config['MYSQL_HOST'] = os.getenv('MYSQL_HOST', '127.0.0.1')
+        app.config['MYSQL_USER'] = os.getenv('MYSQL_USER', 'root')
+        app.config['MYSQL_PASSWORD'] = os.getenv('MYSQL_PASSWORD', '')
+        app.config['MYSQL_DB'] = os.getenv('MYSQL_DB', '')
+        app.config['MYSQL_PORT'] = int(os.getenv('MYSQL_PORT', 3306))
+        # per-process connection pool (see utils/db_pool.py)
+        app.config['MYSQL_POOL_SIZE'] = int(os.getenv('MYSQL_POOL_SIZE', 10))
+        app.config['MYSQL_POOL_TIMEOUT'] = float(os.getenv('MYSQL_POOL_TIMEOUT', 10))
+        app.config['MYSQL_POOL_MAX_LIFETIME'] = float(os.getenv('MYSQL_POOL_MAX_LIFETIME', 3600))
+        app.config['MYSQL_POOL_PING_IDLE'] = float(os.getenv('MYSQL_POOL_PING_IDLE', 5))
+
+        mysql = PooledMySQL(app)
+        app.mysql = mysql
+        print(" MySQL config loaded successfully:", app.config['MYSQL_HOST'], app.config['MYSQL_DB'])
+    except Exception as e:
+        print("MySQL config failed:", str(e))
+
+    # ---------- Manual CORS (Werkzeug / Flask) ----------
+    @app.after_request
+    def add_cors_headers(response):
+        response.headers['Access-Control-Allow-Origin'] = '*'
+        response.headers['Access-Control-Allow-Methods'] = 'GET,POST,PUT,DELETE,OPTIONS'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type,Authorization'
+        response.headers['Access-Control-Allow-Credentials'] = 'true'
+        return response
+
+    @app.before_request
+    def handle_preflight():
+        if request.method == 'OPTIONS':
+            resp = make_response()
+            resp.status_code = 200
+            resp.headers['Access-Control-Allow-Origin'] = '*'
+            resp.headers['Access-Control-Allow-Methods'] = 'GET,POST,PUT,DELETE,OPTIONS'
+            resp.headers['Access-Control-Allow-Headers'] = 'Content-Type,Authorization'
+            resp.headers['Access-Control-Allow-Credentials'] = 'true'
+            return resp
+
+
+    # ---------- Response compression (gzip / brotli) ----------
+    init_compression(app)
+
+    # Root test route
+    @app.route("/api")
+    def first():
+        return render_template("index.html")
+
+
+
+    # ---------- Register Blueprints ----------
+    app.register_blueprint(department_bp)
+    app.register_blueprint(consultant_bp)
+    app.register_blueprint(parameter_bp)
+    app.register_blueprint(interpretation_bp)
+    app.register_blueprint(packages_bp)
+    app.register_blueprint(users_bp)
+    app.register_blueprint(companies_panel_bp)
+    app.register_blueprint(role_bp)
+    app.register_blueprint(test_profile_bp)
+    app.register_blueprint(patient_entry_bp)
+    app.register_blueprint(invoice_bp)
+    app.register_blueprint(results_bp)
+    app.register_blueprint(cash_bp) 
+    app.register_blueprint(report_bp)
+    app.register_blueprint(pdfreport_bp)
+    app.register_blueprint(authentication_bp)
+    app.register_blueprint(permission_bp)
+    app.register_blueprint(collectioncenter_bp)
+    app.register_blueprint(lab_bp)
+    app.register_blueprint(reporting_bp)
+    app.register_blueprint(invoicepdf_bp)
+    app.register_blueprint(balance_sheet_report_bp)
+    app.register_blueprint(trial_balance_report_bp)
+    app.register_blueprint(stock_usage_report_bp)
+    app.register_blueprint(pdf_jobs_bp)
+    app.register_blueprint(metrics_bp)
+    #main
+
+
+
+    # ---------- Account Book Blueprints ----------
+    app.register_blueprint(account_bp)
+    app.register_blueprint(voucher_bp)
+    app.register_blueprint(bank_payment_bp)
+    app.register_blueprint(bank_receipt_voucher_bp) 
+    app.register_blueprint(cash_payment_bp)
+    app.register_blueprint(cash_receipt_bp)
+    app.register_blueprint(account_settings_bp)
+    app.register_blueprint(liabilities_bp)
+    app.register_blueprint(stock_items_bp)
+    app.register_blueprint(stock_purchase_bp)
+    app.register_blueprint(stock_usage_bp)
+    app.register_blueprint(inventory_bp)
+    app.register_blueprint(dashboard_bp)
+
+    # ---------- Static report assets (encoded once, reloaded on change) ----------
+    preload_assets([
+        os.path.join(app.root_path, 'static', 'report_footer.jpeg'),
+        os.path.join(app.root_path, 'static', 'gardezi_logo.jpg'),
+    ])
+
+    # ---------- CLI commands ----------
+    # flask --app main rollups rebuild --from YYYY-MM-DD [--to YYYY-MM-DD]
+    # flask --app main db upgrade | status | explain-check
+    app.cli.add_command(rollups_cli)
+    app.cli.add_command(db_cli)
+
+    return app
+
+
+# ---------- Run App (development server) ----------
+# Production: gunicorn -c gunicorn.conf.py wsgi:app
 if __name__ == "__main__":
+    app = create_app()
     port = int(os.environ.get("PORT", 5000))
     print(f" Starting Flask on 0.0.0.0:{port}")
     app.run(host="0.0.0.0", port=port, debug=True)
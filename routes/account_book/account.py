@@ -2,10 +2,9 @@ import math
 from flask import Blueprint, request, jsonify, current_app
 from routes.authentication.authentication import token_required
 import MySQLdb.cursors
-from flask_mysqldb import MySQL
+from utils.db_pool import mysql
 
 account_bp = Blueprint('account', __name__, url_prefix='/api/accounts')
-mysql = MySQL()
 
 
 # -------------------- GET with Search + Pagination -------------------- #
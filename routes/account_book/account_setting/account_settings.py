@@ -1,11 +1,10 @@
 import MySQLdb.cursors
 from flask import Blueprint, jsonify, request, current_app
-from flask_mysqldb import MySQL
+from utils.db_pool import mysql
 import time
 from routes.authentication.authentication import token_required
 
 account_settings_bp = Blueprint('default', __name__, url_prefix='/api/default')
-mysql = MySQL()
 
 @account_settings_bp.route('/<int:id>', methods=['PUT'])
 @token_required
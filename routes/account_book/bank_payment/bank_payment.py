@@ -1,11 +1,11 @@
 import MySQLdb.cursors
 from flask import Blueprint, jsonify, request, current_app
 from routes.authentication.authentication import token_required
-from flask_mysqldb import MySQL
+from utils.rollups import invalidate_voucher_rollups
+from utils.db_pool import mysql
 import time
 
 bank_payment_bp = Blueprint('bank_payment', __name__, url_prefix='/api/bank_payment_voucher')
-mysql = MySQL()
 
 
 # -------------------- CREATE (POST) -------------------- #
@@ -49,6 +49,8 @@ def create_bank_payment_voucher():
 
         listing_voucher = f"{voucher_type}-{last_number + 1:03d}"
 
+        invalidate_voucher_rollups(cursor, days=[date])
+
         cursor.execute("""
             INSERT INTO journal_voucher (date, narration, voucher_type, listing_voucher)
             VALUES (%s, %s, %s, %s)
@@ -204,6 +206,8 @@ def delete_bank_payment_voucher(id):
             cursor.close()
             return jsonify({"message": "Bank Payment Voucher not found"}), 404
 
+        invalidate_voucher_rollups(cursor, [id])
+
         cursor.execute("DELETE FROM journal_voucher_entries WHERE journal_voucher_id = %s", (id,))
         cursor.execute("DELETE FROM journal_voucher WHERE id = %s", (id,))
 
@@ -253,6 +257,8 @@ def update_bank_payment_voucher(id):
             cursor.close()
             return jsonify({"message": "Bank Payment Voucher not found"}), 404
 
+        invalidate_voucher_rollups(cursor, [id], days=[date])
+
         cursor.execute("""
             UPDATE journal_voucher
             SET date = %s, narration = %s, voucher_type = %s
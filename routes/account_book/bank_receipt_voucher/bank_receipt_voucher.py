@@ -1,12 +1,12 @@
 import MySQLdb.cursors
 from flask import Blueprint, jsonify, request, current_app
 from routes.authentication.authentication import token_required
-from flask_mysqldb import MySQL
+from utils.rollups import invalidate_voucher_rollups
+from utils.db_pool import mysql
 import time   # <-- added
 
 # Blueprint setup
 bank_receipt_voucher_bp = Blueprint('bank_receipt_voucher', __name__, url_prefix='/api/bank_receipt_voucher')
-mysql = MySQL()
 
 # -------------------- CREATE (POST) -------------------- #
 @bank_receipt_voucher_bp.route('/', methods=['POST'])
@@ -54,6 +54,7 @@ def create_bank_receipt_voucher():
         listing_voucher = f"{voucher_type}-{last_number + 1:03d}"
 
         # ---- Insert main voucher record ----
+        invalidate_voucher_rollups(cursor, days=[date])
         cursor.execute("""
             INSERT INTO journal_voucher (date, narration, voucher_type, listing_voucher)
             VALUES (%s, %s, %s, %s)
@@ -146,6 +147,8 @@ def update_cash_receipt_voucher(id):
             cursor.close()
             return jsonify({"message": "Cash Receipt Voucher not found"}), 404
 
+        invalidate_voucher_rollups(cursor, [id], days=[date])
+
         cursor.execute("""
             UPDATE journal_voucher
             SET date = %s, narration = %s, voucher_type = %s
@@ -232,6 +235,8 @@ def update_bank_receipt_voucher(id):
             cursor.close()
             return jsonify({"message": "Bank Receipt Voucher not found"}), 404
 
+        invalidate_voucher_rollups(cursor, [id], days=[date])
+
         cursor.execute("""
             UPDATE journal_voucher
             SET date = %s, narration = %s, voucher_type = %s
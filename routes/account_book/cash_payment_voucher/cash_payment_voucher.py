@@ -2,10 +2,10 @@ import time
 import MySQLdb.cursors
 from flask import Blueprint, jsonify, request, current_app
 from routes.authentication.authentication import token_required
-from flask_mysqldb import MySQL
+from utils.rollups import invalidate_voucher_rollups
+from utils.db_pool import mysql
 import math
 cash_payment_bp = Blueprint('cash_payment', __name__, url_prefix='/api/cash_payment_voucher')
-mysql = MySQL()
 
 # -------------------- CREATE (POST) -------------------- #
 @cash_payment_bp.route('/', methods=['POST'])
@@ -52,6 +52,7 @@ def create_cash_payment_voucher():
         listing_voucher = f"{voucher_type}-{last_number + 1:03d}"
 
         # Insert main voucher
+        invalidate_voucher_rollups(cursor, days=[date])
         cursor.execute("""
             INSERT INTO journal_voucher (date, narration, voucher_type, listing_voucher)
             VALUES (%s, %s, %s, %s)
@@ -141,6 +142,7 @@ def update_cash_payment_voucher(id):
             return jsonify({"message": "Cash Payment Voucher not found"}), 404
 
         # Update main voucher
+        invalidate_voucher_rollups(cursor, [id], days=[date])
         cursor.execute("""
             UPDATE journal_voucher
             SET date = %s, narration = %s, voucher_type = %s
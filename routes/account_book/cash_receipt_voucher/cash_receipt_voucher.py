@@ -3,10 +3,10 @@ import math
 import MySQLdb.cursors
 from flask import Blueprint, jsonify, request, current_app
 from routes.authentication.authentication import token_required
-from flask_mysqldb import MySQL
+from utils.rollups import invalidate_voucher_rollups
+from utils.db_pool import mysql
 
 cash_receipt_bp = Blueprint('cash_receipt', __name__, url_prefix='/cash_receipt_voucher')
-mysql = MySQL()
 
 
 # -------------------- CREATE (POST) -------------------- #
@@ -51,6 +51,8 @@ def create_cash_receipt_voucher():
 
         listing_voucher = f"{voucher_type}-{last_number + 1:03d}"
 
+        invalidate_voucher_rollups(cursor, days=[date])
+
         cursor.execute("""
             INSERT INTO journal_voucher (date, narration, voucher_type, listing_voucher)
             VALUES (%s, %s, %s, %s)
@@ -258,6 +260,7 @@ def delete_cash_receipt_voucher(id):
             return jsonify({"message": "Cash Receipt Voucher not found"}), 404
 
         # SOFT DELETE 
+        invalidate_voucher_rollups(cursor, [id])
         cursor.execute(
             "UPDATE journal_voucher SET trash = 1 WHERE id = %s",
             (id,)
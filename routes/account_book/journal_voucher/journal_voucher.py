@@ -1,13 +1,16 @@
 import MySQLdb.cursors
 from flask import Blueprint, jsonify, request, current_app, make_response
 from routes.authentication.authentication import token_required
-from flask_mysqldb import MySQL
+from utils.date_filters import date_range_sql, InvalidDate
+from utils.rollups import invalidate_voucher_rollups
+from utils.counting import count_total, total_pages
+from utils.pagination import get_cursor_args, keyset_clause, keyset_page
+from utils.db_pool import mysql
 import os
 import time
 import math
 
 voucher_bp = Blueprint('voucher', __name__, url_prefix='/api/journal_vouchers')
-mysql = MySQL()
 
 # -------------------- CREATE (POST) -------------------- #
 @voucher_bp.route('/', methods=['POST'])
@@ -51,6 +54,8 @@ def create_journal_voucher():
 
         listing_voucher = f"{voucher_type}-{last_number + 1:03d}"
 
+        invalidate_voucher_rollups(cursor, days=[date])
+
         cursor.execute("""
             INSERT INTO journal_voucher (date, narration, voucher_type, listing_voucher)
             VALUES (%s, %s, %s, %s)
@@ -105,6 +110,10 @@ def get_all_journal_vouchers():
         current_page = request.args.get('currentpage', 1, type=int)
         record_per_page = request.args.get('recordperpage', 30, type=int)
         offset = (current_page - 1) * record_per_page
+        try:
+            direction, cursor_id = get_cursor_args()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         # ---------------- Base Query ---------------- #
         base_query = """
@@ -134,11 +143,22 @@ def get_all_journal_vouchers():
             where_clause = "WHERE " + " AND ".join(where_clauses)
 
         # ---------------- Count Total Records ---------------- #
-        count_query = f"SELECT COUNT(DISTINCT jv.id) AS total {base_query} {where_clause}"
-        cursor.execute(count_query, values)
-        total_records = cursor.fetchone()['total']
+        # entries join is not needed to count vouchers
+        count_query = f"SELECT COUNT(*) AS total FROM journal_voucher AS jv {where_clause}"
+        total_records = count_total(cursor, count_query, values, table=None if where_clauses else "journal_voucher")
 
         # ---------------- Data Query with Pagination ---------------- #
+        order_by = "ORDER BY jv.id DESC"
+        page_clause = "LIMIT %s OFFSET %s"
+        page_values = [record_per_page, offset]
+        if direction:
+            seek, seek_values, order_by = keyset_clause("jv.id", direction, cursor_id)
+            if seek:
+                where_clause = ("WHERE " + " AND ".join(where_clauses + [seek]))
+                values.extend(seek_values)
+            page_clause = "LIMIT %s"
+            page_values = [record_per_page + 1]
+
         data_query = f"""
             SELECT 
                 jv.id,
@@ -150,23 +170,30 @@ def get_all_journal_vouchers():
             {base_query}
             {where_clause}
             GROUP BY jv.id
-            ORDER BY jv.id DESC
-            LIMIT %s OFFSET %s
+            {order_by}
+            {page_clause}
         """
-        values.extend([record_per_page, offset])
+        values.extend(page_values)
         cursor.execute(data_query, values)
         vouchers = cursor.fetchall()
         cursor.close()
 
+        next_cursor = prev_cursor = None
+        if direction:
+            vouchers, next_cursor, prev_cursor = keyset_page(
+                vouchers, "id", direction, cursor_id, record_per_page
+            )
+
         # ---------------- Pagination Calculation ---------------- #
-        total_pages = math.ceil(total_records / record_per_page)
         execution_time = time.time() - start_time
 
         return jsonify({
             "data": vouchers,
             "totalRecords": total_records,
-            "totalPages": total_pages,
+            "totalPages": total_pages(total_records, record_per_page),
             "currentPage": current_page,
+            "nextCursor": next_cursor,
+            "prevCursor": prev_cursor,
             "execution_time": execution_time
         }), 200
 
@@ -203,6 +230,8 @@ def update_journal_voucher(id):
             execution_time = end_time - start_time
             return jsonify({"message": "Journal Voucher not found", "execution_time": execution_time}), 404
 
+        invalidate_voucher_rollups(cursor, [id], days=[date])
+
         cursor.execute("""
             UPDATE journal_voucher
             SET date = %s, narration = %s, voucher_type = %s
@@ -262,6 +291,8 @@ def delete_journal_voucher(id):
             execution_time = end_time - start_time
             return jsonify({"message": "Journal Voucher not found", "execution_time": execution_time}), 404
 
+        invalidate_voucher_rollups(cursor, [id])
+
         cursor.execute("DELETE FROM journal_voucher_entries WHERE journal_voucher_id = %s", (id,))
         cursor.execute("DELETE FROM journal_voucher WHERE id = %s", (id,))
 
@@ -486,11 +517,12 @@ def get_ledger_report():
         to_date = request.args.get('to_date')
 
         # Fetch ledger entries
-        cursor.execute("""
+        date_sql, date_params = date_range_sql("date", from_date, to_date)
+        cursor.execute(f"""
             SELECT *FROM journal_voucher_entries WHERE account_head_id = %s
-              AND date BETWEEN %s AND %s
+              {date_sql}
             ORDER BY date ASC
-        """, (account_head_id, from_date, to_date))
+        """, [account_head_id] + date_params)
 
         entries = cursor.fetchall()
 
@@ -518,5 +550,7 @@ def get_ledger_report():
             "entries": entries
         }), 200
 
+    except InvalidDate as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
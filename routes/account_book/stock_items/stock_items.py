@@ -1,12 +1,11 @@
 import MySQLdb.cursors
 from flask import Blueprint, jsonify, request, current_app
 from routes.authentication.authentication import token_required
-from flask_mysqldb import MySQL
+from utils.db_pool import mysql
 import time
 import math
 
 stock_items_bp = Blueprint('stock_items', __name__, url_prefix='/api/stock_items')
-mysql = MySQL()
 
 # -------------------- CREATE (POST) -------------------- #
 @stock_items_bp.route('/', methods=['POST'])
@@ -2,14 +2,16 @@ import time
 import MySQLdb.cursors
 from flask import Blueprint, jsonify, request, current_app
 from routes.authentication.authentication import token_required
-from flask_mysqldb import MySQL
+from utils.rollups import invalidate_voucher_rollups
+from utils.counting import count_total, total_pages
+from utils.pagination import get_cursor_args, keyset_clause, keyset_page
+from utils.db_pool import mysql
 from datetime import datetime
 import math
 
 stock_purchase_bp = Blueprint(
     'stock_purchase', __name__, url_prefix='/api/stock_purchases'
 )
-mysql = MySQL()
 
 # -------------------- CREATE (POST) -------------------- #
 @stock_purchase_bp.route('/', methods=['POST'])
@@ -41,6 +43,7 @@ def create_stock_purchase():
         date = datetime.now().strftime('%Y-%m-%d')
 
         # Journal voucher
+        invalidate_voucher_rollups(cursor, days=[date])
         cursor.execute("""
             INSERT INTO journal_voucher (date, narration, voucher_type, listing_voucher)
             VALUES (%s, %s, %s, %s)
@@ -91,6 +94,10 @@ def get_all_stock_purchases():
         current_page = request.args.get("currentpage", 1, type=int)
         record_per_page = request.args.get("recordperpage", 30, type=int)
         offset = (current_page - 1) * record_per_page
+        try:
+            direction, cursor_id = get_cursor_args()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         where_clause = "WHERE sp.trash = 0"
         values = []
@@ -105,8 +112,18 @@ def get_all_stock_purchases():
             LEFT JOIN stock_items si ON sp.stock_item_id = si.id
             {where_clause}
         """
-        cursor.execute(count_query, values)
-        total_records = cursor.fetchone()["total"] or 0
+        total_records = count_total(cursor, count_query, values)
+
+        order_by = "ORDER BY sp.id DESC"
+        page_clause = "LIMIT %s OFFSET %s"
+        page_values = [record_per_page, offset]
+        if direction:
+            seek, seek_values, order_by = keyset_clause("sp.id", direction, cursor_id)
+            if seek:
+                where_clause += f" AND {seek}"
+                values = values + seek_values
+            page_clause = "LIMIT %s"
+            page_values = [record_per_page + 1]
 
         data_query = f"""
             SELECT 
@@ -119,17 +136,25 @@ def get_all_stock_purchases():
             FROM stock_purchases sp
             LEFT JOIN stock_items si ON sp.stock_item_id = si.id
             {where_clause}
-            ORDER BY sp.id DESC
-            LIMIT %s OFFSET %s
+            {order_by}
+            {page_clause}
         """
-        cursor.execute(data_query, values + [record_per_page, offset])
+        cursor.execute(data_query, values + page_values)
         purchases = cursor.fetchall()
 
+        next_cursor = prev_cursor = None
+        if direction:
+            purchases, next_cursor, prev_cursor = keyset_page(
+                purchases, "id", direction, cursor_id, record_per_page
+            )
+
         return jsonify({
             "data": purchases,
             "totalRecords": total_records,
-            "totalPages": math.ceil(total_records / record_per_page),
+            "totalPages": total_pages(total_records, record_per_page),
             "currentPage": current_page,
+            "nextCursor": next_cursor,
+            "prevCursor": prev_cursor,
             "execution_time": time.time() - start_time
         }), 200
 
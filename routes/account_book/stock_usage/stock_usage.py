@@ -2,12 +2,11 @@ import time
 import MySQLdb.cursors
 from flask import Blueprint, jsonify, request, current_app
 from routes.authentication.authentication import token_required
-from flask_mysqldb import MySQL
+from utils.db_pool import mysql
 import math
 
 # Blueprint
 stock_usage_bp = Blueprint('stock_usage', __name__, url_prefix='/api/stock_usage')
-mysql = MySQL()
 
 # -------------------- CREATE (POST) -------------------- #
 @stock_usage_bp.route('/', methods=['POST'])
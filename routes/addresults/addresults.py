@@ -1,13 +1,12 @@
 from routes.authentication.authentication import token_required
 import math
 from flask import Blueprint, request, jsonify,current_app
-from flask_mysqldb import MySQL
+from utils.db_pool import mysql
 from MySQLdb.cursors import DictCursor
 import MySQLdb
 import time
 
 results_bp = Blueprint('results', __name__, url_prefix='/api/results')
-mysql = MySQL()
 
 # -------------------- Create a new result -------------------- #
 @results_bp.route('/', methods=['POST'])
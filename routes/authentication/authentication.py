@@ -3,8 +3,10 @@ from MySQLdb.cursors import DictCursor
 import jwt
 import datetime
 import time
+import uuid
 from functools import wraps
 import re
+from utils.permission_cache import get_cached_role_permissions
 
 authentication_bp = Blueprint(
     'authentication_bp',
@@ -22,14 +24,13 @@ def token_required(f):
 
         token = auth_header.split(" ")[1]
         try:
-            if token in current_app.blacklisted_tokens:
-                return jsonify({"error": "Token has been revoked"}), 401
-
             data = jwt.decode(
                 token,
                 str(current_app.config['SECRET_KEY']),
                 algorithms=["HS256"]
             )
+            if current_app.revoked_tokens.is_revoked(token, data):
+                return jsonify({"error": "Token has been revoked"}), 401
             g.user = data
         except jwt.ExpiredSignatureError:
             return jsonify({"error": "Token expired"}), 401
@@ -117,13 +118,14 @@ def login_user():
         role = user["role"]
 
         # 3. Dynamic Permissions (Ab koi ALLOWED_ROLES list ki zaroorat nahi)
-        permissions = get_role_permissions(role)
+        permissions = get_cached_role_permissions(role, get_role_permissions)
 
         # 4. JWT Token Generation
         payload = {
             "user_id": user["id"],
             "email": user["email"],
             "role": role,
+            "jti": uuid.uuid4().hex,
             "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=2)
 
         }
@@ -155,7 +157,7 @@ def logout_user():
     try:
         auth_header = request.headers.get('Authorization')
         token = auth_header.split(" ")[1]
-        current_app.blacklisted_tokens.add(token)
+        current_app.revoked_tokens.revoke(token, g.user)
 
         return jsonify({
             "status": 200,
@@ -174,14 +176,13 @@ def verify_token():
     token = auth_header.split(" ")[1]
 
     try:
-        if token in current_app.blacklisted_tokens:
-            return jsonify({"valid": False}), 401
-
-        jwt.decode(
+        data = jwt.decode(
             token,
             str(current_app.config['SECRET_KEY']),
             algorithms=["HS256"]
         )
+        if current_app.revoked_tokens.is_revoked(token, data):
+            return jsonify({"valid": False}), 401
 
         return jsonify({"valid": True}), 200
 
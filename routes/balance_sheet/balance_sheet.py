@@ -1,14 +1,14 @@
 import MySQLdb.cursors
 from flask import Blueprint, jsonify, request, current_app
 from routes.authentication.authentication import token_required
-from flask_mysqldb import MySQL
+from utils.date_filters import date_range_sql, InvalidDate
+from utils.db_pool import mysql
 import time
 import math
 
 balance_sheet_report_bp = Blueprint(
     'balance_sheet_report', __name__, url_prefix='/api/balance_sheet'
 )
-mysql = MySQL()
 
 
 # -------------------- CREATE POST -------------------- #
@@ -87,8 +87,9 @@ def get_all_balance_sheet():
 
         # ---------------- Date Filter ---------------- #
         if from_date and to_date:
-            base_query += " AND date BETWEEN %s AND %s"
-            values.extend([from_date, to_date])
+            date_sql, date_params = date_range_sql("date", from_date, to_date)
+            base_query += date_sql
+            values.extend(date_params)
 
         # ---------------- Search Filter ---------------- #
         if search:
@@ -157,6 +158,8 @@ def get_all_balance_sheet():
             "execution_time": execution_time
         }), 200
 
+    except InvalidDate as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         execution_time = time.time() - start_time
         return jsonify({
@@ -1,12 +1,14 @@
 from flask import Flask, request, jsonify, Blueprint, current_app
 from routes.authentication.authentication import token_required
-from flask_mysqldb import MySQL
+from utils.date_filters import date_range, InvalidDate
+from utils.counting import count_total, total_pages
+from utils.pagination import get_cursor_args, keyset_clause, keyset_page
+from utils.db_pool import mysql
 import MySQLdb.cursors
 from datetime import datetime
 import time
 import math
 cash_bp = Blueprint('cash', __name__, url_prefix='/api/cash')
-mysql = MySQL()
 
 #----------------- GET data from cash table ----------------
 
@@ -25,20 +27,18 @@ def get_data_cash():
         record_per_page = request.args.get("recordperpage", 30, type=int)
 
         offset = (current_page - 1) * record_per_page
+        try:
+            direction, cursor_id = get_cursor_args()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         filters = []
         params = []
 
         # 🔹 Date filters
-        if from_date and to_date:
-            filters.append("DATE(date) BETWEEN %s AND %s")
-            params.extend([from_date, to_date])
-        elif from_date:
-            filters.append("DATE(date) >= %s")
-            params.append(from_date)
-        elif to_date:
-            filters.append("DATE(date) <= %s")
-            params.append(to_date)
+        date_filters, date_params = date_range("date", from_date, to_date)
+        filters += date_filters
+        params += date_params
 
         # 🔹 Search filter (sirf description)
         if search:
@@ -55,30 +55,42 @@ def get_data_cash():
         """
 
         # 🔹 Count total records
-        count_query = f"SELECT COUNT(*) as total FROM ({base_query}) as subquery"
-        cursor.execute(count_query, params)
-        total_records = cursor.fetchone()["total"]
+        count_query = f"SELECT COUNT(*) AS total FROM cash {where_clause}"
+        total_records = count_total(cursor, count_query, params, table=None if filters else "cash")
 
         # 🔹 Pagination + order
-        base_query += " ORDER BY id DESC LIMIT %s OFFSET %s"
-        params.extend([record_per_page, offset])
-
-        cursor.execute(base_query, params)
-        result = cursor.fetchall()
+        next_cursor = prev_cursor = None
+        if direction:
+            seek, seek_params, order_by = keyset_clause("id", direction, cursor_id)
+            if seek:
+                base_query += (" AND " if filters else " WHERE ") + seek
+            base_query += f" {order_by} LIMIT %s"
+            cursor.execute(base_query, params + seek_params + [record_per_page + 1])
+            result, next_cursor, prev_cursor = keyset_page(
+                cursor.fetchall(), "id", direction, cursor_id, record_per_page
+            )
+        else:
+            base_query += " ORDER BY id DESC LIMIT %s OFFSET %s"
+            params.extend([record_per_page, offset])
+
+            cursor.execute(base_query, params)
+            result = cursor.fetchall()
 
         cursor.close()
         end_time = time.time()
 
-        total_pages = math.ceil(total_records / record_per_page)
-
         return jsonify({
             "data": result,
             "totalRecords": total_records,
-            "totalPages": total_pages,
+            "totalPages": total_pages(total_records, record_per_page),
             "currentPage": current_page,
+            "nextCursor": next_cursor,
+            "prevCursor": prev_cursor,
             "executionTime": end_time - start_time
         }), 200
 
+    except InvalidDate as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify,current_app
-from flask_mysqldb import MySQL
 from routes.authentication.authentication import token_required
+from utils.date_filters import date_range_sql, InvalidDate
+from utils.counting import count_total, total_pages
 from MySQLdb.cursors import DictCursor
 import MySQLdb
 import time, re
@@ -38,13 +39,12 @@ def get_collection_centers():
             params.append(f"%{search}%")
 
         # Apply WHERE
-        if where_clauses:
-            base_query += " WHERE " + " AND ".join(where_clauses)
+        where_sql = " WHERE " + " AND ".join(where_clauses)
+        base_query += where_sql
 
         # Count query
-        count_query = f"SELECT COUNT(*) AS total FROM ({base_query}) AS subquery"
-        cursor.execute(count_query, params)
-        total_records = cursor.fetchone()["total"]
+        count_query = f"SELECT COUNT(*) AS total FROM collectioncenter{where_sql}"
+        total_records = count_total(cursor, count_query, params, table=None if search else "collectioncenter")
 
         # Pagination
         base_query += " ORDER BY id DESC LIMIT %s OFFSET %s"
@@ -54,12 +54,11 @@ def get_collection_centers():
         collection_centers = cursor.fetchall()
 
         end_time = time.time()
-        total_pages = math.ceil(total_records / record_per_page)
 
         return jsonify({
             "data": collection_centers,
             "totalRecords": total_records,
-            "totalPages": total_pages,
+            "totalPages": total_pages(total_records, record_per_page),
             "currentPage": current_page,
             "executionTime": end_time - start_time
         }), 200
@@ -195,15 +194,16 @@ def collection_center_report(center_id):
     from_date = request.args.get('from_date')
     to_date = request.args.get('to_date')
 
-    if not from_date or not to_date:
-        from_date = "0001-01-01"
-        to_date = "9999-12-31"
-
     try:
         mysql = current_app.mysql
         cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
 
-        query = """
+        # no range given -> whole history
+        if not from_date or not to_date:
+            from_date = to_date = None
+        date_sql, date_params = date_range_sql("cr.report_date", from_date, to_date)
+
+        query = f"""
             SELECT 
                 pe.name AS patient_name,
                 pe.mr_number,
@@ -217,10 +217,10 @@ def collection_center_report(center_id):
             LEFT JOIN counter c ON cr.patient_id = c.patient_id
             LEFT JOIN users u ON pe.reff_by = u.id
             WHERE cr.id = %s 
-            AND cr.report_date BETWEEN %s AND %s
+            {date_sql}
         """
 
-        cursor.execute(query, (center_id, from_date, to_date))
+        cursor.execute(query, [center_id] + date_params)
         reports = cursor.fetchall()
 
         end_time = time.time()
@@ -231,6 +231,8 @@ def collection_center_report(center_id):
             "execution_time": execution_time
         }), 200
 
+    except InvalidDate as e:
+        return jsonify({"error": str(e)}), 400
     except MySQLdb.Error as e:
         return jsonify({"error": str(e)}), 500
 
@@ -1,13 +1,14 @@
 import math
 from flask import Blueprint, request, jsonify, current_app
 import MySQLdb.cursors
-from flask_mysqldb import MySQL
+from utils.db_pool import mysql
 import time
 from routes.authentication.authentication import token_required
+from utils.date_filters import date_range, date_range_sql, InvalidDate
+from utils.counting import count_total, total_pages
 
 
 companies_panel_bp = Blueprint('companies_panel', __name__, url_prefix='/api/companies_panel')
-mysql = MySQL()
 
 # ===================== Companies Panel CRUD Operations ===================== #
 
@@ -41,15 +42,9 @@ def get_companies_panels():
             params.append(f"%{company_name}%")
 
         # 🔹 Date filters
-        if from_date and to_date:
-            filters.append("DATE(created_at) BETWEEN %s AND %s")
-            params.extend([from_date, to_date])
-        elif from_date:
-            filters.append("DATE(created_at) >= %s")
-            params.append(from_date)
-        elif to_date:
-            filters.append("DATE(created_at) <= %s")
-            params.append(to_date)
+        date_filters, date_params = date_range("created_at", from_date, to_date)
+        filters += date_filters
+        params += date_params
 
         where_clause = " WHERE " + " AND ".join(filters)
 
@@ -57,9 +52,8 @@ def get_companies_panels():
         base_query = f"SELECT * FROM companies_panel{where_clause}"
 
         # 🔹 Count total records
-        count_query = f"SELECT COUNT(*) AS total FROM ({base_query}) AS subquery"
-        cursor.execute(count_query, params)
-        total_records = cursor.fetchone()["total"]
+        count_query = f"SELECT COUNT(*) AS total FROM companies_panel{where_clause}"
+        total_records = count_total(cursor, count_query, params, table=None if params else "companies_panel")
 
         # 🔹 Pagination + order
         base_query += " ORDER BY id DESC LIMIT %s OFFSET %s"
@@ -69,16 +63,17 @@ def get_companies_panels():
         company_panel = cursor.fetchall()
 
         end_time = time.time()
-        total_pages = math.ceil(total_records / record_per_page)
 
         return jsonify({
             "data": company_panel,
             "totalRecords": total_records,
-            "totalPages": total_pages,
+            "totalPages": total_pages(total_records, record_per_page),
             "currentPage": current_page,
             "executionTime": end_time - start_time
         }), 200
 
+    except InvalidDate as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -242,6 +237,7 @@ def get_companies_panel_by_id(id):
         counter_data = cursor.fetchall()
         
         patients = []
+        date_sql, date_params = date_range_sql("created_at", from_date, to_date)
 
         for row in counter_data:
             pt_id = row['pt_id']
@@ -250,10 +246,10 @@ def get_companies_panel_by_id(id):
             
             print("pr_id", pt_id)
         
-            cursor.execute("""
+            cursor.execute(f"""
                 SELECT * FROM patient_entry 
-                WHERE id=%s AND DATE(created_at) BETWEEN %s AND %s
-            """, (pt_id, from_date, to_date))
+                WHERE id=%s{date_sql}
+            """, [pt_id] + date_params)
             
             patient = cursor.fetchone()
             
@@ -270,6 +266,8 @@ def get_companies_panel_by_id(id):
             "patients": patients
         }), 200
 
+    except InvalidDate as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 #-------------------------Company Search by Head Name-------------------
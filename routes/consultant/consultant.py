@@ -1,12 +1,11 @@
 import os, base64
 import random, string
 from flask import Blueprint, request, jsonify
-from flask_mysqldb import MySQL
+from utils.db_pool import mysql
 import time
 
 consultant_bp = Blueprint('consultant', __name__, url_prefix='/api/consultant')
 
-mysql = MySQL()
 
 # Load key from env or generate (DO NOT generate on every run in production)
 
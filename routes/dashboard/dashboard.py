@@ -2,6 +2,8 @@ from flask import Blueprint, current_app, jsonify, request
 import MySQLdb.cursors
 import time
 from routes.authentication.authentication import token_required
+from utils.rollups import SALES, VOUCHERS, day_range, ensure_rollup
+from utils.date_filters import date_range, InvalidDate
 
 
 dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/api/dashboard')
@@ -19,18 +21,33 @@ def counter_report():
         mysql = current_app.mysql
         cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
 
-        # 🔹 CASE 1: Date filter diya ho
-        if from_date and to_date:
+        days = day_range(from_date, to_date)
+
+        # 🔹 Daily rollup (default: last 7 days)
+        if days and ensure_rollup(cursor, SALES, *days):
             query = """
+                SELECT 
+                    day AS created_at,
+                    SUM(total_fee) AS total_fee
+                FROM counter_daily_rollup
+                WHERE day BETWEEN %s AND %s
+                GROUP BY day
+                ORDER BY day
+            """
+            params = days
+
+        # 🔹 CASE 1: Date filter diya ho
+        elif from_date and to_date:
+            conditions, params = date_range("created_at", from_date, to_date)
+            query = f"""
                 SELECT 
                     DATE(created_at) AS created_at,
                     SUM(total_fee) AS total_fee
                 FROM counter
-                WHERE DATE(created_at) BETWEEN %s AND %s
+                WHERE {' AND '.join(conditions)}
                 GROUP BY DATE(created_at)
                 ORDER BY created_at
             """
-            params = (from_date, to_date)
 
         # 🔹 CASE 2: Date filter NA ho → default last 7 days
         else:
@@ -60,6 +77,8 @@ def counter_report():
             "execution_time": round(end_time - start_time, 4)
         })
 
+    except InvalidDate as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         return jsonify({
             "status": "error",
@@ -84,9 +103,44 @@ def cc_sale_report():
         mysql = current_app.mysql
         cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
 
-        # 🔹 CASE 1: Date filter diya ho (date-wise per CC)
-        if from_date and to_date:
+        days = day_range(from_date, to_date)
+        use_rollup = bool(days) and ensure_rollup(cursor, SALES, *days)
+
+        # 🔹 Daily per-CC rollup, date-wise per CC
+        if use_rollup and from_date and to_date:
             query = """
+                SELECT 
+                    r.cc AS cc_id,
+                    cc.name AS cc_name,
+                    r.day AS report_date,
+                    SUM(r.total_fee) AS total_sale
+                FROM counter_cc_daily_rollup r
+                JOIN collectioncenter cc ON cc.id = r.cc
+                WHERE r.day BETWEEN %s AND %s
+                GROUP BY r.cc, r.day
+                ORDER BY r.cc, report_date
+            """
+            params = days
+
+        # 🔹 Daily per-CC rollup, last 7 days per CC
+        elif use_rollup:
+            query = """
+                SELECT 
+                    r.cc AS cc_id,
+                    cc.name AS cc_name,
+                    SUM(r.total_fee) AS total_sale
+                FROM counter_cc_daily_rollup r
+                JOIN collectioncenter cc ON cc.id = r.cc
+                WHERE r.day BETWEEN %s AND %s
+                GROUP BY r.cc
+                ORDER BY total_sale DESC
+            """
+            params = days
+
+        # 🔹 CASE 1: Date filter diya ho (date-wise per CC)
+        elif from_date and to_date:
+            conditions, params = date_range("c.created_at", from_date, to_date)
+            query = f"""
                 SELECT 
                     c.cc AS cc_id,
                     cc.name AS cc_name,
@@ -94,11 +148,10 @@ def cc_sale_report():
                     SUM(c.total_fee) AS total_sale
                 FROM counter c
                 JOIN collectioncenter cc ON cc.id = c.cc
-                WHERE DATE(c.created_at) BETWEEN %s AND %s
+                WHERE {' AND '.join(conditions)}
                 GROUP BY c.cc, DATE(c.created_at)
                 ORDER BY c.cc, report_date
             """
-            params = (from_date, to_date)
 
         # 🔹 CASE 2: Date filter NA ho → default last 7 days
         else:
@@ -130,6 +183,8 @@ def cc_sale_report():
             "execution_time": round(end_time - start_time, 4)
         })
 
+    except InvalidDate as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         return jsonify({
             "status": "error",
@@ -222,7 +277,26 @@ def expense_report():
         mysql = current_app.mysql
         cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
 
-        query = """
+        days = day_range(from_date, to_date)
+        if days and ensure_rollup(cursor, VOUCHERS, *days):
+            cursor.execute("""
+                SELECT
+                    day AS report_date,
+                    voucher_type,
+                    SUM(total_dr) AS total_expense
+                FROM voucher_daily_rollup
+                WHERE day BETWEEN %s AND %s
+                AND voucher_type IN ('JV', 'CPV', 'BPV', 'BRV', 'CRV')
+                GROUP BY day, voucher_type
+                ORDER BY day, voucher_type
+            """, days)
+            return jsonify({
+                "data": cursor.fetchall(),
+                "execution_time": round(time.time() - start_time, 4)
+            })
+
+        conditions, params = date_range("j.date", from_date, to_date)
+        query = f"""
             SELECT
                 j.date AS report_date,
                 j.voucher_type,
@@ -230,13 +304,13 @@ def expense_report():
             FROM journal_voucher j
             JOIN journal_voucher_entries e 
                 ON e.journal_voucher_id = j.id
-            WHERE j.date BETWEEN %s AND %s
+            WHERE {' AND '.join(conditions)}
             AND j.voucher_type IN ('JV', 'CPV', 'BPV', 'BRV', 'CRV')
             GROUP BY j.date, j.voucher_type
             ORDER BY j.date, j.voucher_type
         """
 
-        cursor.execute(query, (from_date, to_date))
+        cursor.execute(query, params)
         rows = cursor.fetchall()
         end_time = time.time()  #  end timer
 
@@ -245,6 +319,8 @@ def expense_report():
             "execution_time": round(end_time - start_time, 4)  #  execution time in seconds
         })
 
+    except InvalidDate as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         return jsonify({
             "status": "error",
@@ -1,13 +1,13 @@
 from flask import Blueprint, request, jsonify, current_app
 from routes.authentication.authentication import token_required
-from flask_mysqldb import MySQL
+from utils.catalogue import invalidate_catalogue
+from utils.db_pool import mysql
 import MySQLdb.cursors
 import math
 import time
 import pandas as pd
 
 department_bp = Blueprint('department', __name__, url_prefix='/api/department')
-mysql = MySQL()
 
 # ---------------- Department GET ------------------- #
 @department_bp.route('/', methods=['GET'])
@@ -92,6 +92,7 @@ def create_department():
         cursor.execute("INSERT INTO departments (department_name) VALUES (%s)", (department_name,))
         mysql.connection.commit() # type: ignore
         cursor.close()
+        invalidate_catalogue("departments")
         end_time = time.time()
         return jsonify({"message": "Department created successfully",
                         "status": 201,
@@ -123,6 +124,7 @@ def update_department(id):
         cursor.execute("UPDATE departments SET department_name=%s WHERE id=%s", (department_name, id))
         mysql.connection.commit() # type: ignore
         cursor.close()
+        invalidate_catalogue("departments")
         end_time = time.time()
         return jsonify({"message": "Department updated successfully",
                         "status": 200,
@@ -148,6 +150,7 @@ def delete_department(id):
         cursor.execute("UPDATE departments SET trash = 1 WHERE id=%s", (id,))
         mysql.connection.commit() # type: ignore
         cursor.close()
+        invalidate_catalogue("departments")
         end_time = time.time()
         return jsonify({"message": "Department deleted successfully",
                         "status" : 200,
@@ -4,6 +4,8 @@ from MySQLdb.cursors import DictCursor
 import MySQLdb
 import time
 from routes.authentication.authentication import token_required
+from utils.counting import count_total, total_pages
+from utils.catalogue import invalidate_catalogue
 
 
 
@@ -43,6 +45,7 @@ def create_interpretation():
         )
         mysql.connection.commit()
         cur.close()
+        invalidate_catalogue("interpretations")
         end_time = time.time()
 
         return jsonify({"message": "Interpretation created successfully",
@@ -83,13 +86,12 @@ def get_interpretations():
             values.extend([f"%{search}%"])
 
         # Apply WHERE
-        if where_clauses:
-            base_query += " WHERE " + " AND ".join(where_clauses)
+        where_sql = " WHERE " + " AND ".join(where_clauses)
+        base_query += where_sql
 
         # Count total records
-        count_query = f"SELECT COUNT(*) as total FROM ({base_query}) as subquery"
-        cursor.execute(count_query, values)
-        total_records = cursor.fetchone()["total"]
+        count_query = f"SELECT COUNT(*) AS total FROM interpretations{where_sql}"
+        total_records = count_total(cursor, count_query, values, table=None if search else "interpretations")
 
         # Pagination
         base_query += " ORDER BY id DESC LIMIT %s OFFSET %s"
@@ -99,12 +101,11 @@ def get_interpretations():
         interpretations = cursor.fetchall()
 
         end_time = time.time()
-        total_pages = math.ceil(total_records / record_per_page)
 
         return jsonify({
             "data": interpretations,
             "totalRecords": total_records,
-            "totalPages": total_pages,
+            "totalPages": total_pages(total_records, record_per_page),
             "currentPage": current_page,
             "executionTime": end_time - start_time
         }), 200
@@ -154,6 +155,7 @@ def update_interpretation(id):
             (data.get("code"), data.get("heading"), data.get("detail"), id),
         )
         mysql.connection.commit()
+        invalidate_catalogue("interpretations")
 
         if cur.rowcount == 0:
             return jsonify({"error": "Interpretation not found"}), 404
@@ -178,6 +180,7 @@ def delete_interpretation(id):
         cur = mysql.connection.cursor()
         cur.execute("UPDATE interpretations SET trash = 1 WHERE id=%s AND trash = 0", (id,))
         mysql.connection.commit()
+        invalidate_catalogue("interpretations")
         deleted_rows = cur.rowcount
         cur.close()
 
@@ -1,16 +1,13 @@
 from flask import Flask, request, jsonify, Blueprint, current_app, url_for
-from flask_mysqldb import MySQL
-import qrcode
-import base64
-from io import BytesIO
+from utils.db_pool import mysql
 from datetime import datetime
 import MySQLdb.cursors
 import time
 import os
 from routes.authentication.authentication import token_required
+from utils.asset_cache import qr_data_url as qr_data_url_cached
 
 invoice_bp = Blueprint('invoice', __name__, url_prefix='/api/invoice')
-mysql = MySQL()
 
 # ------------------ Invoice API -------------------
 @invoice_bp.route('/<int:id>', methods=['GET'])
@@ -97,11 +94,7 @@ def generate_invoice(id):
 
 # PDF serve karne ka route
         pdf_url = url_for('pdfreport.get_pdf', filename=pdf_filename, _external=True)
-        qr_img = qrcode.make(pdf_url)
-        buffer = BytesIO()
-        qr_img.save(buffer, format="PNG")
-        qr_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-        qr_data_url = f"data:image/png;base64,{qr_base64}"
+        qr_data_url = qr_data_url_cached(pdf_url)
 
         # Step 5: Calculate unpaid
         unpaid = patient.get("unpaid")
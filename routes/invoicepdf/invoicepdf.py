@@ -1,21 +1,20 @@
-from flask import Blueprint, jsonify, send_file, url_for
-from flask_mysqldb import MySQL
+from flask import Blueprint, jsonify, request, send_file
+from utils.db_pool import mysql
 import MySQLdb.cursors
-from xhtml2pdf import pisa
 from datetime import datetime
-from io import BytesIO
-import qrcode
-import base64
 import os
 import traceback
 from routes.authentication.authentication import token_required
+from utils.pdf_jobs import register_output, pdf_job_response
+from utils.artifact_store import ArtifactStore
+from utils.asset_cache import qr_data_url as qr_data_url_cached
 
 
 invoicepdf_bp = Blueprint('invoicepdf', __name__, url_prefix='/api/invoicepdf')
-mysql = MySQL()
 
 INVOICE_FOLDER = "generated_invoices"
-os.makedirs(INVOICE_FOLDER, exist_ok=True)
+invoice_store = ArtifactStore("invoices", INVOICE_FOLDER)
+register_output("invoice", invoice_store, "invoicepdf.get_invoice_file")
 
 # ---------------- INVOICE HTML ----------------
 def generate_invoice_html(patient, counter, tests, qr_data_url, reff_by_name):
@@ -152,22 +151,15 @@ def generate_invoice_pdf(id):
         tests = cursor.fetchall()
 
         # QR Code
-        qr = qrcode.make(f"Invoice #{id}")
-        buf = BytesIO()
-        qr.save(buf, format="PNG")
-        qr_data_url = "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode()
+        qr_data_url = qr_data_url_cached(f"Invoice #{id}")
 
         # Generate HTML
         html = generate_invoice_html(patient, counter, tests, qr_data_url, reff_by_name)
 
-        # Generate PDF
+        # Generate PDF (in the render pool; ?async=1 returns a job id immediately)
         filename = f"invoice_{id}_{int(datetime.now().timestamp())}.pdf"
-        pdf_path = os.path.join(INVOICE_FOLDER, filename)
-        with open(pdf_path, "wb") as f:
-            pisa.CreatePDF(html, dest=f)
-
-        pdf_url = url_for("invoicepdf.get_invoice_file", filename=filename, _external=True)
-        return jsonify({"status": 200, "pdf_url": pdf_url}), 200
+        run_async = request.args.get("async", "0").lower() in ("1", "true", "yes")
+        return pdf_job_response("invoice", html, filename, run_async=run_async)
 
     except Exception as e:
         return jsonify({"status": 500, "error": str(e), "trace": traceback.format_exc()}), 500
@@ -175,7 +167,7 @@ def generate_invoice_pdf(id):
 # ---------------- SERVE PDF ----------------
 @invoicepdf_bp.route('/file/<filename>')
 def get_invoice_file(filename):
-    path = os.path.join(INVOICE_FOLDER, filename)
-    if not os.path.exists(path):
+    path = invoice_store.find(filename)
+    if not path:
         return jsonify({"status": 404, "message": "File not found"}), 404
     return send_file(path, mimetype="application/pdf", as_attachment=False)
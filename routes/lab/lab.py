@@ -1,14 +1,16 @@
 from flask import Blueprint, request, jsonify,current_app
-from flask_mysqldb import MySQL
 from MySQLdb.cursors import DictCursor
 import MySQLdb
 import time 
 from routes.authentication.authentication import token_required
+from utils.table_versions import bump_tables
+from utils.conditional import conditional_get
 
 lab_bp = Blueprint('lab', __name__, url_prefix='/api/lab')
 
 @lab_bp.route('/', methods=['GET'])
 @token_required
+@conditional_get("lab")
 def get_labs():
     start_time = time.time()
     try:
@@ -48,6 +50,7 @@ def add_lab():
         insert_query = "INSERT INTO lab (name, contact_no, email, location) VALUES (%s, %s, %s, %s)"
         cursor.execute(insert_query, (name, contact_no, email, location))
         mysql.connection.commit()
+        bump_tables("lab")
         end_time = time.time()
 
         return jsonify({"message": "Lab added successfully", "execution_time": end_time - start_time}), 201
@@ -79,6 +82,7 @@ def update_lab(lab_id):
         """
         cursor.execute(update_query, (name, contact_no, email, location, lab_id))
         mysql.connection.commit()
+        bump_tables("lab")
         end_time = time.time()
 
         return jsonify({"message": "Lab updated successfully", "execution_time": end_time - start_time}), 200
@@ -100,6 +104,7 @@ def delete_lab(lab_id):
         delete_query = "DELETE FROM lab WHERE id=%s"
         cursor.execute(delete_query, (lab_id,))
         mysql.connection.commit()
+        bump_tables("lab")
         end_time = time.time()
 
         return jsonify({"message": "Lab deleted successfully", "execution_time": end_time - start_time}), 200
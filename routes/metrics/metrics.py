@@ -0,0 +1,30 @@
+from flask import Blueprint, jsonify, current_app
+import os
+import time
+from routes.authentication.authentication import token_required
+from utils.artifact_store import all_store_stats
+
+metrics_bp = Blueprint('metrics', __name__, url_prefix='/api/metrics')
+
+
+# ------------------ Generated file storage (reports / invoices) ------------------ #
+@metrics_bp.route('/storage', methods=['GET'])
+@token_required
+def storage_metrics():
+    start_time = time.time()
+    return jsonify({
+        "stores": all_store_stats(),
+        "execution_time": time.time() - start_time
+    }), 200
+
+
+# ------------------ MySQL connection pool (this worker) ------------------ #
+@metrics_bp.route('/db_pool', methods=['GET'])
+@token_required
+def db_pool_metrics():
+    start_time = time.time()
+    return jsonify({
+        "pid": os.getpid(),
+        "pool": current_app.mysql.stats(),
+        "execution_time": time.time() - start_time
+    }), 200
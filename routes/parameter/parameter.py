@@ -1,14 +1,16 @@
 import math
 from flask import Blueprint, request, jsonify, current_app
 from MySQLdb.cursors import DictCursor
-from flask_mysqldb import MySQL
+from utils.db_pool import mysql
 import MySQLdb
 import datetime
 import time
 from routes.authentication.authentication import token_required
+from utils.counting import count_total, total_pages
+from utils.catalogue import get_catalogue, invalidate_catalogue
+from utils.conditional import conditional_get
 
 parameter_bp = Blueprint('parameter', __name__, url_prefix='/api/parameter')
-mysql = MySQL()
 
 # ===================== Parameter CRUD operations ===================== #
 
@@ -42,13 +44,12 @@ def get_all_parameters():
             values.append(f"%{search}%")
 
         # Apply WHERE
-        if where_clauses:
-            base_query += " WHERE " + " AND ".join(where_clauses)
+        where_sql = " WHERE " + " AND ".join(where_clauses)
+        base_query += where_sql
 
         # Count total records
-        count_query = f"SELECT COUNT(*) as total FROM ({base_query}) as subquery"
-        cursor.execute(count_query, values)
-        total_records = cursor.fetchone()["total"]
+        count_query = f"SELECT COUNT(*) AS total FROM parameters{where_sql}"
+        total_records = count_total(cursor, count_query, values, table=None if search else "parameters")
 
         # Pagination
         base_query += " ORDER BY id DESC LIMIT %s OFFSET %s"
@@ -58,12 +59,11 @@ def get_all_parameters():
         parameters = cursor.fetchall()
 
         end_time = time.time()
-        total_pages = math.ceil(total_records / record_per_page)
 
         return jsonify({
             "data": parameters,
             "totalRecords": total_records,
-            "totalPages": total_pages,
+            "totalPages": total_pages(total_records, record_per_page),
             "currentPage": current_page,
             "executionTime": end_time - start_time
         }), 200
@@ -159,6 +159,7 @@ def create_parameter(test_profile_id):
         ))
         mysql.connection.commit()
         cursor.close()
+        invalidate_catalogue("parameters")
         end_time = time.time()
 
         return jsonify({"message": "Parameter added successfully", "execution_time": end_time - start_time}), 201
@@ -169,43 +170,33 @@ def create_parameter(test_profile_id):
 #---------------------- GET parameter by test_profile_id --------
 @parameter_bp.route('/test_parameters/<int:test_profile_id>', methods=['GET'])
 @token_required
+@conditional_get("test_profiles", "parameters")
 def get_parameters(test_profile_id):
     start_time = time.time()
     try:
-        mysql = current_app.mysql
-        cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        catalogue = get_catalogue()
 
         #  Check if test_profile_id exists
-        cursor.execute("""
-            SELECT id, test_name 
-            FROM test_profiles 
-            WHERE id = %s
-        """, (test_profile_id,))
-        test_profile = cursor.fetchone()
-
-        if not test_profile:
-            cursor.close()
+        test = catalogue.test(test_profile_id)
+        if not test:
             return jsonify({"error": "Invalid test_profile_id"}), 404
-
-        #  Fetch ALL parameters for this test_profile_id
-        query = """
-            SELECT 
-                id AS parameter_id,
-                parameter_name,
-                IFNULL(sub_heading, '') AS sub_heading,
-                IFNULL(input_type, '') AS input_type,
-                IFNULL(unit, '') AS unit,
-                IFNULL(normalvalue, '') AS normalvalue,
-                IFNULL(default_value, '') AS default_value,
-                IFNULL(dropdown_values, '') AS dropdown_values,
-                test_profile_id
-            FROM parameters
-            WHERE test_profile_id = %s
-            ORDER BY id ASC
-        """
-        cursor.execute(query, (test_profile_id,))
-        parameters = cursor.fetchall()
-        cursor.close()
+        test_profile = {"id": test["id"], "test_name": test["test_name"]}
+
+        #  ALL parameters for this test_profile_id (ordered by id)
+        def ifnull(value):
+            return "" if value is None else value
+
+        parameters = [{
+            "parameter_id": p["id"],
+            "parameter_name": p["parameter_name"],
+            "sub_heading": ifnull(p["sub_heading"]),
+            "input_type": ifnull(p["input_type"]),
+            "unit": ifnull(p["unit"]),
+            "normalvalue": ifnull(p["normalvalue"]),
+            "default_value": ifnull(p["default_value"]),
+            "dropdown_values": ifnull(p["dropdown_values"]),
+            "test_profile_id": p["test_profile_id"],
+        } for p in catalogue.test_parameters(test_profile_id)]
         end_time = time.time()
 
         #  If no data found
@@ -276,6 +267,7 @@ def update_parameter(parameter_id):
 
         mysql.connection.commit()
         cur.close()
+        invalidate_catalogue("parameters")
         end_time = time.time()
 
         return jsonify({"message": "Parameter updated successfully", "status": 200, "execution_time": end_time - start_time}), 200
@@ -304,6 +296,7 @@ def delete_parameter(parameter_id):
         cur.execute("UPDATE parameters SET trash = 1 WHERE id = %s", (parameter_id,))
         mysql.connection.commit()
         cur.close()
+        invalidate_catalogue("parameters")
         end_time = time.time()
 
         return jsonify({"message": "Parameter deleted successfully","status":200, "execution_time": end_time - start_time}), 200
@@ -1,7 +1,7 @@
 import math
 from flask import Flask, request, jsonify, Blueprint, current_app, url_for,send_from_directory
 from MySQLdb.cursors import DictCursor
-from flask_mysqldb import MySQL    
+from utils.db_pool import mysql
 from datetime import datetime, timedelta
 from datetime import datetime
 import MySQLdb
@@ -11,11 +11,18 @@ import random
 import os
 import time
 from routes.authentication.authentication import token_required
+from utils.date_filters import date_range, InvalidDate
+from utils.counting import count_total, total_pages
+from utils.pdf_cache import invalidate_counter_reports
+from utils.batch_loader import load_children, attach_children
+from utils.pagination import get_cursor_args, keyset_clause, keyset_page
+from utils.rollups import invalidate_rollups
+from utils.result_writer import write_results, load_result_targets, valid_parameter_id
+from utils.catalogue import get_catalogue
 
 
 
 patient_entry_bp = Blueprint('patient_entry', __name__, url_prefix='/api/patient_entry')
-mysql = MySQL()
 
 # ================== Patient Entry CRUD Operations ================== #
 
@@ -113,6 +120,7 @@ def create_patient_entry():
             patient_id = patient_id_posted
             print("Existing patient_id:", patient_id)
 
+        invalidate_rollups(cursor)
         insert_counter = """INSERT INTO counter(pt_id,sample, priority, remarks, paid, total_fee, discount, pending_discount, date_created, user_id, reff_by,company_id, payment_method)VALUES(%s,%s, %s, %s, %s, %s, %s, %s, NOW(), %s, %s ,%s,%s)"""
         cursor.execute(insert_counter,(patient_id, sample, priority, remarks, paid, total_fee, discount, pending_discount, user_id, reff_by,company_id,payment_method))
 
@@ -210,10 +218,14 @@ def get_all_patient_entries():
         from_date = request.args.get("from_date", "", type=str)
         to_date = request.args.get("to_date", "", type=str)
 
-        # 🔹 Pagination
+        # 🔹 Pagination (page numbers, or keyset mode via after_id / before_id)
         current_page = request.args.get("currentpage", 1, type=int)
         record_per_page = request.args.get("recordperpage", 30, type=int)
         offset = (current_page - 1) * record_per_page
+        try:
+            direction, cursor_id = get_cursor_args()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         # 🔹 Build filters
         filters = []
@@ -228,15 +240,9 @@ def get_all_patient_entries():
         if cell:
             filters.append("pt.cell LIKE %s")
             params.append(f"%{cell}%")
-        if from_date and to_date:
-            filters.append("DATE(pt.created_at) BETWEEN %s AND %s")
-            params.extend([from_date, to_date])
-        elif from_date:
-            filters.append("DATE(pt.created_at) >= %s")
-            params.append(from_date)
-        elif to_date:
-            filters.append("DATE(pt.created_at) <= %s")
-            params.append(to_date)
+        date_filters, date_params = date_range("pt.created_at", from_date, to_date)
+        filters += date_filters
+        params += date_params
 
         # 🔹 Trash handling (show only trash=0)
         filters.append("c.trash = 0")
@@ -263,44 +269,57 @@ def get_all_patient_entries():
             {where_clause}
         """
 
-        # 🔹 Count query
-        count_query = f"SELECT COUNT(*) AS total FROM ({base_query}) AS subquery"
-        cursor.execute(count_query, params)
-        total_records = cursor.fetchone()["total"]
+        # 🔹 Count query (patient_entry join only needed for patient filters)
+        count_from = "counter c JOIN patient_entry pt ON c.pt_id = pt.id" if params else "counter c"
+        count_query = f"SELECT COUNT(*) AS total FROM {count_from} {where_clause}"
+        total_records = count_total(cursor, count_query, params, table=None if params else "counter")
 
         # 🔹 Pagination query
-        paginated_query = base_query + " ORDER BY c.id DESC LIMIT %s OFFSET %s"
-        params_with_pagination = params + [record_per_page, offset]
-        cursor.execute(paginated_query, params_with_pagination)
-        patient_data_list = cursor.fetchall()
+        next_cursor = prev_cursor = None
+        if direction:
+            seek, seek_params, order_by = keyset_clause("c.id", direction, cursor_id)
+            paginated_query = base_query + (f" AND {seek}" if seek else "") + f" {order_by} LIMIT %s"
+            cursor.execute(paginated_query, params + seek_params + [record_per_page + 1])
+            patient_data_list, next_cursor, prev_cursor = keyset_page(
+                cursor.fetchall(), "cid", direction, cursor_id, record_per_page
+            )
+        else:
+            paginated_query = base_query + " ORDER BY c.id DESC LIMIT %s OFFSET %s"
+            params_with_pagination = params + [record_per_page, offset]
+            cursor.execute(paginated_query, params_with_pagination)
+            patient_data_list = cursor.fetchall()
 
-        # 🔹 Fetch tests for each patient
-        for patient in patient_data_list:
-            cursor.execute("""
-                SELECT 
-                    pt.id AS patient_test_id, 
-                    tp.test_name,
-                    tp.delivery_time,
-                    tp.sample_required, 
-                    tp.fee
-                FROM patient_tests pt
-                JOIN test_profiles tp ON pt.test_id = tp.id
-                WHERE pt.patient_id = %s AND pt.counter_id = %s
-            """, (patient["patient_id"], patient["cid"]))
-            patient["tests"] = cursor.fetchall()
+        # 🔹 Fetch tests for all patients of this page in one query
+        tests_by_counter = load_children(cursor, """
+            SELECT 
+                pt.counter_id,
+                pt.id AS patient_test_id, 
+                tp.test_name,
+                tp.delivery_time,
+                tp.sample_required, 
+                tp.fee
+            FROM patient_tests pt
+            JOIN test_profiles tp ON pt.test_id = tp.id
+            WHERE pt.counter_id IN ({ids})
+            ORDER BY pt.id
+        """, "counter_id", [patient["cid"] for patient in patient_data_list])
+        attach_children(patient_data_list, "cid", "tests", tests_by_counter)
 
         # 🔹 Prepare response
         end_time = time.time()
-        total_pages = math.ceil(total_records / record_per_page)
 
         return jsonify({
             "patients": patient_data_list,
             "totalRecords": total_records,
-            "totalPages": total_pages,
+            "totalPages": total_pages(total_records, record_per_page),
             "currentPage": current_page,
+            "nextCursor": next_cursor,
+            "prevCursor": prev_cursor,
             "executionTime": end_time - start_time
         }), 200
 
+    except InvalidDate as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -425,7 +444,8 @@ def update_patient_entry(id):
             package_id, user_id, patient_id  
         ))
 
-        
+        # counter update below is keyed on pt_id, so every counter of the patient changes
+        invalidate_rollups(cursor, patient_id=patient_id)
         counter_update = """
             UPDATE counter 
             SET total_fee=%s, paid=%s, discount=%s, remarks=%s, priority=%s, sample=%s , reff_by=%s,company_id=%s , payment_method=%s
@@ -465,6 +485,7 @@ def update_patient_entry(id):
         
         mysql.connection.commit()
         cursor.close()
+        invalidate_counter_reports(id)
         end_time = time.time()
 
 
@@ -499,6 +520,7 @@ def delete_patient_entry(id):
 
         patient_id = result[0]
         
+        invalidate_rollups(cursor, [id])
         cursor.execute("UPDATE counter SET trash = 1 WHERE id = %s", (id,))
         #cursor.execute("DELETE FROM patient_entry WHERE id = %s", (patient_id,))
         mysql.connection.commit()
@@ -686,9 +708,7 @@ def delete_file(test_id):
     counter_id = countme['counter_id']
     tests_id = countme['test_id']
             
-    cursor.execute("SELECT test_name FROM test_profiles WHERE id = %s AND trash = 0", (tests_id,))
-    count = cursor.fetchone()
-    test_name_show = count['test_name']
+    test_name_show = get_catalogue().test_name(tests_id)
     pt_entry_log = f"File deleted  Test: {test_name_show}"
     cursor.execute("""
                     INSERT INTO patient_activity_log (patient_id, counter_id, activity, created_at)
@@ -741,9 +761,7 @@ def insert_file(test_id):
             counter_id = countme['counter_id']
             tests_id = countme['test_id']
             
-            cursor.execute("SELECT test_name FROM test_profiles WHERE id = %s", (tests_id,))
-            count = cursor.fetchone()
-            test_name_show = count['test_name']
+            test_name_show = get_catalogue().test_name(tests_id)
             pt_entry_log = f"File attached  Test: {test_name_show}"
             cursor.execute("""
                         INSERT INTO patient_activity_log (patient_id, counter_id, activity, created_at)
@@ -802,13 +820,8 @@ def add_or_update_result(id):
         
         
         
-        cursor.execute("""
-            SELECT c.pt_id AS patient_id, pt.id AS patient_test_id 
-            FROM counter c
-            JOIN patient_tests pt ON pt.patient_id = c.pt_id AND pt.counter_id = c.id
-            WHERE c.id = %s
-        """, (id,))
-        result = cursor.fetchone()
+        # same patient_tests row the batch endpoint picks for this test
+        result = next(iter(load_result_targets(cursor, [(id, test_profile_id)]).values()), None)
 
         if not result:
             return jsonify({"error": "Counter not found or no tests linked"}), 404
@@ -819,33 +832,22 @@ def add_or_update_result(id):
         # --- Validation ---
         if not parameters:
             return jsonify({"error": "No parameters provided"}), 400
+        if not all(isinstance(res, dict) and valid_parameter_id(res.get("parameter_id")) for res in parameters):
+            return jsonify({"error": "Each parameter needs an integer parameter_id"}), 400
 
-    
-        for res in parameters:
-            parameter_id = res.get("parameter_id")
-            result_value = res.get("result_value", None)
-            cutoff_value = res.get("cutoff_value", None)
 
-        
-            cursor.execute("""
-                SELECT id, test_profile_id FROM patient_results
-                WHERE patient_test_id = %s AND parameter_id = %s AND patient_id = %s AND counter_id = %s
-            """, (patient_test_id, parameter_id, patient_id, id))
-            existing = cursor.fetchone()
-
-            if existing:
-                cursor.execute("""
-                    UPDATE patient_results
-                    SET result_value = %s, cutoff_value = %s
-                    WHERE id = %s
-                """, (result_value, cutoff_value, existing['id']))
-            else:
-                cursor.execute("""
-                    INSERT INTO patient_results
-                    (patient_id, patient_test_id, parameter_id, result_value, cutoff_value, created_at, test_profile_id, is_completed, counter_id)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """, (patient_id, patient_test_id, parameter_id, result_value, cutoff_value,datetime.now(), test_profile_id,0, id))
+        # one read + one multi-row upsert for all parameters
+        changes = write_results(cursor, [{
+            "counter_id": id,
+            "patient_id": patient_id,
+            "patient_test_id": patient_test_id,
+            "test_profile_id": test_profile_id,
+            "parameter_id": res.get("parameter_id"),
+            "result_value": res.get("result_value", None),
+            "cutoff_value": res.get("cutoff_value", None),
+        } for res in parameters])
 
+        invalidate_rollups(cursor, [id])
         # comment add update
         cursor.execute("""
                             UPDATE patient_tests
@@ -861,9 +863,7 @@ def add_or_update_result(id):
 
 
             # ---  Insert into patient_activity_log ---
-        cursor.execute("SELECT test_name FROM test_profiles WHERE id = %s", (test_profile_id,))
-        count = cursor.fetchone()
-        test_name_show = count['test_name']
+        test_name_show = get_catalogue().test_name(test_profile_id)
         pt_entry_log = f"Result updated for Tests: {test_name_show}"
 
         cursor.execute("""
@@ -875,15 +875,141 @@ def add_or_update_result(id):
         
         mysql.connection.commit()
         cursor.close()
+        invalidate_counter_reports(id)
         end_time = time.time()
 
         return jsonify({
             "message": "Results saved successfully",
             "test_profile_id": test_profile_id,
+            "changed": {
+                "inserted": [r["parameter_id"] for r in changes["inserted"]],
+                "updated": [r["parameter_id"] for r in changes["updated"]],
+                "unchanged": len(changes["unchanged"]),
+            },
+            "execution_time": end_time - start_time
+        }), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+#--------------------- Add results of many tests / counters at once (analyzer runs) ----
+# Body: {"performed_by": 3, "results": [
+#           {"counter_id": 12, "test_profile_id": 4, "comment": "...",
+#            "parameters": [{"parameter_id": 1, "result_value": "4.5", "cutoff_value": null}, ...]},
+#           ...]}
+# Everything is written in one transaction: one upsert for all parameters,
+# one UPDATE for the patient tests, one counter status update and one
+# activity-log row per counter.
+
+RESULTS_BATCH_MAX = int(os.getenv("RESULTS_BATCH_MAX", 1000))
+
+
+@patient_entry_bp.route('/results_batch', methods=['POST'])
+@token_required
+def add_results_batch():
+    start_time = time.time()
+    try:
+        data = request.get_json() or {}
+        entries = data.get("results") or []
+        performed_by = data.get("performed_by")
+
+        # --- Validation ---
+        if not entries:
+            return jsonify({"error": "No results provided"}), 400
+        if len(entries) > RESULTS_BATCH_MAX:
+            return jsonify({"error": f"At most {RESULTS_BATCH_MAX} results per batch"}), 400
+        for entry in entries:
+            if not entry.get("counter_id") or not entry.get("test_profile_id") or not entry.get("parameters"):
+                return jsonify({"error": "Each result needs counter_id, test_profile_id and parameters"}), 400
+            if not all(isinstance(res, dict) and valid_parameter_id(res.get("parameter_id")) for res in entry["parameters"]):
+                return jsonify({"error": "Each parameter needs an integer parameter_id"}), 400
+
+        counter_ids = sorted({int(e["counter_id"]) for e in entries})
+        cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+
+        # patient + patient_test_id per (counter, test), picked like the single-test endpoint
+        pairs = [(int(e["counter_id"]), int(e["test_profile_id"])) for e in entries]
+        targets = load_result_targets(cursor, pairs)
+        missing = sorted({c for c, t in pairs if (c, t) not in targets})
+        if missing:
+            return jsonify({"error": "Counter not found or no tests linked", "counter_ids": missing}), 404
+        patient_of = {counter_id: t["patient_id"] for (counter_id, _), t in targets.items()}
+
+        rows = []
+        for entry, (counter_id, test_id) in zip(entries, pairs):
+            target = targets[(counter_id, test_id)]
+            for res in entry["parameters"]:
+                rows.append({
+                    "counter_id": counter_id,
+                    "patient_id": target["patient_id"],
+                    "patient_test_id": target["patient_test_id"],
+                    "test_profile_id": test_id,
+                    "parameter_id": res.get("parameter_id"),
+                    "result_value": res.get("result_value", None),
+                    "cutoff_value": res.get("cutoff_value", None),
+                })
+
+        invalidate_rollups(cursor, counter_ids)
+        changes = write_results(cursor, rows)
+
+        # comment / result status of every submitted (counter, test) in one statement
+        submitted = {}
+        for entry in entries:
+            submitted[(int(entry["counter_id"]), int(entry["test_profile_id"]))] = entry.get("comment")
+        params = []
+        for (counter_id, test_id), comment in submitted.items():
+            params.extend((counter_id, test_id, comment))
+        params.append(performed_by)
+        cursor.execute("""
+            UPDATE patient_tests pt
+            JOIN (""" + " UNION ALL ".join(["SELECT %s AS counter_id, %s AS test_id, %s AS comment"] * len(submitted)) + """) s
+                ON s.counter_id = pt.counter_id AND s.test_id = pt.test_id
+            SET pt.comment = s.comment, pt.result_status = 1, pt.performed_by = %s, pt.performed_date = NOW()
+        """, params)
+
+        # counters with no pending test left are complete
+        cursor.execute(f"""
+            UPDATE counter c
+            SET c.status = 1
+            WHERE c.id IN ({",".join(["%s"] * len(counter_ids))})
+                AND NOT EXISTS (
+                    SELECT 1 FROM patient_tests pt WHERE pt.counter_id = c.id AND pt.result_status = 0
+                )
+        """, counter_ids)
+
+        # --- one patient_activity_log row per counter ---
+        catalogue = get_catalogue()
+        tests_by_counter = {}
+        for counter_id, test_id in submitted:
+            tests_by_counter.setdefault(counter_id, []).append(catalogue.test_name(test_id) or str(test_id))
+        log_params = []
+        for counter_id, names in tests_by_counter.items():
+            log_params.extend((patient_of[counter_id], counter_id, f"Result updated for Tests: {', '.join(names)}"))
+        cursor.execute("""
+            INSERT INTO patient_activity_log (patient_id, counter_id, activity, created_at)
+            VALUES """ + ",".join(["(%s, %s, %s, NOW())"] * len(tests_by_counter)), log_params)
+
+        mysql.connection.commit()
+        cursor.close()
+        for counter_id in counter_ids:
+            invalidate_counter_reports(counter_id)
+        end_time = time.time()
+
+        return jsonify({
+            "message": "Results saved successfully",
+            "counters": len(counter_ids),
+            "tests": len(submitted),
+            "changed": {
+                "inserted": len(changes["inserted"]),
+                "updated": len(changes["updated"]),
+                "unchanged": len(changes["unchanged"]),
+            },
             "execution_time": end_time - start_time
         }), 200
 
     except Exception as e:
+        mysql.connection.rollback()
         return jsonify({"error": str(e)}), 500
 
 
@@ -900,7 +1026,7 @@ def discount_approvel(id):
         user_id = int(data.get("user_id"))
         cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
         
-        
+        invalidate_rollups(cursor, [id])
         cursor.execute("UPDATE counter SET discount = %s, pending_discount = %s, discount_approved_by = %s WHERE id=%s", (discount, 0, user_id, id))
         mysql.connection.commit()
         cursor.execute("SELECT pt_id FROM counter WHERE id = %s", (id,))
@@ -945,6 +1071,7 @@ def update_fee(id):
         total_paid = old_paid + int(new_paid)
         paid = total_paid
         
+        invalidate_rollups(cursor, [id])
         cursor.execute("UPDATE counter SET paid = %s WHERE id=%s", (total_paid, id))
         mysql.connection.commit()
         cursor.execute("SELECT pt_id FROM counter WHERE id = %s", (id,))
@@ -984,6 +1111,7 @@ def verify_test(test_id):
         code = int(data.get("code", 0))
         verified_sts = "Unverified" if code == 0 else "Verified"
 
+        invalidate_rollups(cursor, [counter_id])
         cursor.execute("""
             UPDATE patient_tests
             SET status = %s, verified_at = now(), verified_by = %s
@@ -998,9 +1126,7 @@ def verify_test(test_id):
              cursor.execute("UPDATE counter SET status = 1 WHERE id = %s", (counter_id,))
         else:
              cursor.execute("UPDATE counter SET status = 2 WHERE id = %s", (counter_id,))
-        cursor.execute("SELECT test_name FROM test_profiles WHERE id = %s", (test_id,))
-        count = cursor.fetchone()
-        test_name_show = count['test_name']
+        test_name_show = get_catalogue().test_name(test_id)
         cursor.execute("SELECT pt_id FROM counter WHERE id = %s", (counter_id,))
         count = cursor.fetchone()
         pt_id = count['pt_id']
@@ -1012,6 +1138,7 @@ def verify_test(test_id):
 
         mysql.connection.commit()
         cursor.close()
+        invalidate_counter_reports(counter_id)
         end_time = time.time()
 
 
@@ -1080,6 +1207,7 @@ def delete_alldata_patient(id):
 
         patient_id = result[0]
         
+        invalidate_rollups(cursor, [id], patient_id=patient_id)
         cursor.execute("DELETE FROM counter WHERE id = %s", (id,))
         cursor.execute("DELETE FROM patient_entry WHERE id = %s", (patient_id,))
         cursor.execute("DELETE FROM patient_activity_log WHERE patient_id = %s", (patient_id,))
@@ -0,0 +1,24 @@
+from flask import Blueprint, request, jsonify, url_for
+from routes.authentication.authentication import token_required
+from utils.pdf_jobs import job_status, file_endpoint, PDF_RENDER_TIMEOUT
+
+pdf_jobs_bp = Blueprint('pdf_jobs', __name__, url_prefix='/api/pdf_jobs')
+
+
+# ------------------ PDF job status / result ------------------ #
+# ?wait=<seconds> blocks up to PDF_RENDER_TIMEOUT for the job to finish.
+@pdf_jobs_bp.route('/<string:job_id>', methods=['GET'])
+@token_required
+def get_pdf_job(job_id):
+    wait = min(request.args.get("wait", 0, type=float), PDF_RENDER_TIMEOUT)
+    job = job_status(job_id, wait=wait)
+
+    if job["status"] == "unknown":
+        return jsonify({"status": 404, "message": "Job not found", "job_id": job_id}), 404
+
+    response = {"status": 200, "job_id": job_id, "job_status": job["status"]}
+    if job["status"] == "done":
+        response["pdf_url"] = url_for(file_endpoint(job["kind"]), filename=job["filename"], _external=True)
+    elif job["status"] == "failed":
+        response["error"] = job.get("error")
+    return jsonify(response), 200
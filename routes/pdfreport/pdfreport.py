@@ -1,43 +1,39 @@
 # pdfreport.py
 from flask import Blueprint, request, url_for, jsonify, send_file, current_app
-from flask_mysqldb import MySQL
-import qrcode
+from utils.db_pool import mysql
 from io import BytesIO
-from datetime import datetime
 import MySQLdb.cursors
-from xhtml2pdf import pisa
 import os
 import base64
 import traceback
+import hashlib
+import json
+import threading
+import time
 import matplotlib
 matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import numpy as np
 from pprint import pprint
 import logging
 from routes.authentication.authentication import token_required
+from utils.batch_loader import load_children, load_by_ids
+from utils.cache import TTLCache
+from utils.asset_cache import encoded_asset, asset_data_url, qr_data_url as qr_data_url_cached
+from utils.pdf_jobs import register_output, pdf_job_response, job_response, inflight_job, submit_pdf, submit_bundle, job_id_for, job_status, wait_for_jobs, PDF_RENDER_TIMEOUT
+from utils.pdf_cache import report_store, report_cache_key, report_filename, cached_report, batch_store, batch_filename
+from utils.date_filters import date_range
 
 
 pdfreport_bp = Blueprint('pdfreport', __name__, url_prefix='/api/pdfreport')
-mysql = MySQL()
-PDF_FOLDER = 'generated_reports'
-os.makedirs(PDF_FOLDER, exist_ok=True)
+register_output("report", report_store, "pdfreport.get_pdf")
+register_output("batch_pdf", batch_store, "pdfreport.get_batch_file", ext="pdf")
+register_output("batch_zip", batch_store, "pdfreport.get_batch_file", ext="zip")
 logging.basicConfig(level=logging.INFO)
 
 # -------------------- Helper Functions --------------------
-def build_parameters(cursor, patient_id, counter_id, test_id):
-    cursor.execute("""
-        SELECT pr.created_at AS result_date, p.parameter_name, p.unit, p.normalvalue,
-            pr.result_value, pr.cutoff_value, p.sub_heading
-        FROM patient_results pr
-        JOIN parameters p ON pr.parameter_id = p.id
-        JOIN patient_tests pt ON pt.patient_id=%s AND pt.counter_id <= %s AND pt.test_id=%s
-            AND pt.test_id = p.test_profile_id
-        WHERE pr.counter_id = pt.counter_id
-        ORDER BY pr.created_at ASC
-    """, (patient_id, counter_id, test_id))
-    rows = cursor.fetchall() or []
-
+def shape_parameters(rows):
     dates = sorted(list({str(r['result_date'])[:10] for r in rows}))
     params_map = {}
     for r in rows:
@@ -68,30 +64,153 @@ def build_parameters(cursor, patient_id, counter_id, test_id):
         })
     return dates, parameters
 
-def generate_graph_image(dates, values, parameter_name):
-    y = []
-    for v in values:
+def load_report_tests_many(cursor, counters, test_ids=None, verified_only=False):
+    """
+    Load the report tests of many counters with two queries: test rows
+    (joined with verifier, interpretation and department) for every counter,
+    and the parameter history of all their patients at once.
+    `counters` are rows with `id` and `pt_id`; returns {counter_id: test_list}.
+    """
+    counter_patient = {c['id']: c['pt_id'] for c in counters}
+    if not counter_patient:
+        return {}
+
+    filters, params = "", list(counter_patient)
+    if test_ids:
+        filters += f" AND tp.id IN ({','.join(['%s'] * len(test_ids))})"
+        params += list(test_ids)
+    if verified_only:
+        filters += " AND pt.status <> 0"
+
+    cursor.execute(f"""
+        SELECT pt.counter_id, pt.id AS patient_test_id, pt.verified_by, pt.verified_at, pt.comment,
+            tp.id AS test_id, tp.test_name, tp.fee, tp.serology_elisa,
+            u.name AS verified_name, u.qualification AS verified_qual,
+            i.detail AS intr_detail, d.department_name
+        FROM patient_tests pt
+        JOIN test_profiles tp ON pt.test_id = tp.id
+        LEFT JOIN users u ON u.id = pt.verified_by
+        LEFT JOIN interpretations i ON i.id = tp.interpretation
+        LEFT JOIN departments d ON d.id = tp.department_id
+        WHERE pt.counter_id IN ({','.join(['%s'] * len(counter_patient))}){filters}
+        ORDER BY pt.counter_id, pt.id
+    """, params)
+    tests = cursor.fetchall() or []
+
+    # history of every (patient, test) pair up to the newest counter in the set;
+    # each report then keeps the rows of its own patient up to its own counter
+    history_test_ids = list(dict.fromkeys(t['test_id'] for t in tests))
+    history = {}
+    if history_test_ids:
+        history = load_children(cursor, """
+            SELECT pt.patient_id, pt.counter_id AS source_counter_id, pt.test_id,
+                pr.created_at AS result_date, p.parameter_name, p.unit, p.normalvalue,
+                pr.result_value, pr.cutoff_value, p.sub_heading
+            FROM patient_tests pt
+            JOIN patient_results pr ON pr.counter_id = pt.counter_id
+            JOIN parameters p ON pr.parameter_id = p.id AND p.test_profile_id = pt.test_id
+            WHERE pt.counter_id <= %s AND pt.test_id IN (""" + ",".join(["%s"] * len(history_test_ids)) + """)
+                AND pt.patient_id IN ({ids})
+            ORDER BY pr.created_at ASC
+        """, "patient_id", counter_patient.values(), params=[max(counter_patient)] + history_test_ids)
+
+    reports = {cid: [] for cid in counter_patient}
+    for t in tests:
+        counter_id = t['counter_id']
+        rows = [r for r in history.get(counter_patient[counter_id], [])
+                if r['test_id'] == t['test_id'] and r['source_counter_id'] <= counter_id]
+
+        verified_name, verified_qual = "N/A", ""
+        if t.get('verified_by'):
+            verified_name = t.get('verified_name') or "N/A"
+            verified_qual = t.get('verified_qual') or ""
+
+        dates, parameters = shape_parameters(rows)
+        reports[counter_id].append({
+            "test_name": t.get('test_name'),
+            "fee": t.get('fee',0),
+            "department": t.get('department_name') or "N/A",
+            "dates": dates,
+            "parameters": parameters,
+            "serology_elisa": t.get('serology_elisa',''),
+            "comment": t.get('comment'),
+            "intr_detail": t.get('intr_detail'),
+            "test_verify_info": [{"name": verified_name, "qualification": verified_qual, "verified_at": str(t.get('verified_at'))}]
+        })
+    return reports
+
+def load_report_tests(cursor, patient_id, counter_id, test_ids=None):
+    """Report tests of a single counter (see load_report_tests_many)."""
+    counters = [{"id": counter_id, "pt_id": patient_id}]
+    return load_report_tests_many(cursor, counters, test_ids).get(counter_id, [])
+
+# -------------------- Trend graphs --------------------
+# One figure/axes template is built once per worker and reused for every
+# parameter (only the line data changes), and finished PNGs are kept in an
+# LRU keyed by (parameter, dates, values) so reprints skip matplotlib.
+
+_graph_cache = TTLCache(max_size=int(os.getenv("GRAPH_CACHE_SIZE", 1024)), ttl=None)
+_graph_lock = threading.Lock()
+_graph_template = None
+
+def _graph_axes():
+    global _graph_template
+    if _graph_template is None:
+        fig = Figure(figsize=(4,1.5), dpi=100)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111)
+        line, = ax.plot([], [], marker='o', linewidth=1, markersize=3, color='blue')
+        ax.tick_params(axis='y', labelsize=7)
+        ax.grid(axis='y', linestyle=':', linewidth=0.5)
+        fig.tight_layout(pad=0.2)
+        _graph_template = (fig, ax, line)
+    return _graph_template
+
+def _to_floats(values):
+    y = np.full(len(values), np.nan)
+    for i, v in enumerate(values):
         try:
-            y.append(float(v))
-        except:
-            y.append(np.nan)
-
-    x_labels = [str(d) for d in dates]
-    x = list(range(len(x_labels)))
-
-    fig, ax = plt.subplots(figsize=(4,1.5), dpi=100)
-    ax.plot(x, y, marker='o', linewidth=1, markersize=3, color='blue')
+            y[i] = float(v)
+        except (TypeError, ValueError):
+            pass
+    return y
+
+def _graph_key(parameter_name, dates, values):
+    raw = json.dumps([parameter_name, [str(d) for d in dates], [str(v) for v in values]])
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+def _draw_graph(dates, values):
+    fig, ax, line = _graph_axes()
+    x = np.arange(len(dates))
+    line.set_data(x, _to_floats(values))
     ax.set_xticks(x)
-    ax.set_xticklabels(x_labels, fontsize=6)
-    ax.tick_params(axis='y', labelsize=7)
-    ax.grid(axis='y', linestyle=':', linewidth=0.5)
-    plt.tight_layout(pad=0.2)
+    ax.set_xticklabels([str(d) for d in dates], fontsize=6)
+    ax.relim()
+    ax.autoscale_view()
 
     buf = BytesIO()
-    plt.savefig(buf, format='png', bbox_inches='tight', pad_inches=0.05)
-    plt.close(fig)
+    fig.savefig(buf, format='png', bbox_inches='tight', pad_inches=0.05)
     return f"data:image/png;base64,{base64.b64encode(buf.getvalue()).decode()}"
 
+def generate_graph_images(dates, params):
+    """Return {parameter_name: png data url} for all parameters of a test in one pass."""
+    images, missing = {}, []
+    for p in params:
+        name = p.get('parameter_name', '')
+        key = _graph_key(name, dates, safe_list(p.get("result_value")))
+        cached = _graph_cache.get(key)
+        if cached is None:
+            missing.append((name, key, safe_list(p.get("result_value"))))
+        else:
+            images[name] = cached
+
+    if missing:
+        # the template figure is shared, draw under the lock
+        with _graph_lock:
+            for name, key, values in missing:
+                images[name] = _draw_graph(dates, values)
+                _graph_cache.set(key, images[name])
+    return images
 
 
 import logging
@@ -112,237 +231,65 @@ def latest_value(lst):
 
 
 # ================= CORE RENDERER =================
-
-def render_table(test, layout, show_graph=False):
-    params = test.get('parameters', [])
-    dates  = safe_list(test.get('dates'))
-
-    if not params:
-        return "<p>No parameters available</p>"
-
-    # ================= EDITOR MODE =================
-    if layout == "editor":
-        # sirf pehle parameter ke results use hon gay
-        results = safe_list(params[0].get("result_value"))
-
-        html = """
-<table cellpadding="4" cellspacing="0"
-    style="border-collapse:collapse; width:100%; color:#333333;">
-<tr>
-    <th style="border:1px solid #9e9e9e; padding:7px; text-align:center;">Result</th>
-</tr>
-<tr>
-    <td style="padding:7px; text-align:center;">{}</td>
-</tr>
-</table><br>
-""".format(safe_get(results, 0))
-        return html
-
-    # ================= HEADERS =================
-    if layout == "four":
-        headers = ["Parameter", "Unit", "Normal Value"]
-        headers.extend(dates)
-        if show_graph:
-            headers.append("Graph")
-        
-
-    elif layout == "three":
-        headers = ["Parameter", "Unit", "Cutoff Value", "Result"]
-        if show_graph:
-            headers.append("Graph")
-
-    else:  # two
-        headers = ["Parameter", "Result"]
-        if show_graph:
-            headers.append("Graph")
-
-    colspan = len(headers)
-
-    html = """
-    <table  cellpadding="4">
-    <tr>
-    """
-    for h in headers:
-        html += f"<th style=\"text-align:center; border:1px solid #9e9e9e; vertical-align:middle; padding-top:7px;\">{h}</th>"
-    html += "</tr>"
-
-    last_sub = None
-
-    # ================= ROWS =================
-    for p in params:
-        results = safe_list(p.get("result_value"))
-        cutoffs = safe_list(p.get("cutoff_value"))
-
-        # ---- SUB HEADING ----
-        if p.get("sub_heading") and p["sub_heading"] != last_sub:
-            html += f"""
-            <tr>
-                <td colspan="{colspan}"
-                    style="font-weight:bold; background:#f2f2f2;">
-                    {p['sub_heading']}
-                </td>
-            </tr>
-            """
-            last_sub = p["sub_heading"]
-
-        html += "<tr>"
-
-        # ---- PARAMETER ----
-        html += f"<td style=\"text-align: center; vertical-align: middle; padding-top: 7px;\">{p.get('parameter_name','')}</td>"
-
-        # ================= FOUR COLUMN =================
-        if layout == "four":
-            html += f"<td align='center'>{p.get('unit','')}</td>"
-            html += f"""
-            <td style="white-space:pre-line; text-align:center;">
-                {p.get('normalvalue','').replace(',', '\\n')}
-            </td>
-            """
-            for i in range(len(dates)):
-                html += f"<td style=\"text-align: center; vertical-align: middle; padding-top: 7px;\">{safe_get(results, i)}</td>"
-
-        # ================= THREE COLUMN =================
-        elif layout == "three":
-            html += f"<td align='center'>{p.get('unit','')}</td>"
-            html += f"<td align='center'>{safe_get(cutoffs, 0)}</td>"
-            html += f"<td align='center'>{safe_get(results, 0)}</td>"
-
-        # ================= TWO COLUMN =================
-        elif layout == "two":
-            html += f"<td align='center'>{safe_get(results, 0)}</td>"
-
-        # ================= GRAPH =================
-        if show_graph and layout in ("four", "three", "two"):
-            html += f"""
-            <td>
-                <img src="{generate_graph_image(dates, results, p.get('parameter_name',''))}"
-                    style="width:200px; height:120px;">
-            </td>
-            """
-
-        html += "</tr>"
-
-    html += "</table><br>"
-    return html
-
-
-
-# ================= MAIN DISPATCHER =================
-
-def render_parameters_html(test, show_graph=False):
+# Report markup lives in templates/report/ (one template per layout). Flask's
+# jinja_env compiles each template once and keeps it in its template cache.
+
+LAYOUTS = {
+    "four columns": "four",
+    "three columns": "three",
+    "two columns": "two",
+    "editor": "editor",
+}
+
+def test_layout(test, show_graph=False):
+    """Return (layout, show_graph) for a test's serology_elisa setting."""
     serology = (test.get("serology_elisa") or "").lower().strip()
+    layout = LAYOUTS.get(serology, "two")
+    # editor and unknown layouts never carry graphs
+    return layout, show_graph and serology in ("four columns", "three columns", "two columns")
 
-    if serology == "four columns":
-        return render_table(test, "four", show_graph)
-
-    elif serology == "three columns":
-        return render_table(test, "three", show_graph)
-
-    elif serology == "two columns":
-        return render_table(test, "two", show_graph)
-
-    elif serology == "editor":
-        return render_table(test, "editor")
+def test_context(test, show_graph=False):
+    layout, show_graph = test_layout(test, show_graph)
+    dates = safe_list(test.get('dates'))
+    params = test.get('parameters', [])
+    return {
+        "test": test,
+        "layout": layout,
+        "show_graph": show_graph,
+        "dates": dates,
+        "graphs": generate_graph_images(dates, params) if show_graph and params else {},
+    }
 
-    else:
-        return render_table(test, "two")
+def render_report_template(name, **context):
+    template = current_app.jinja_env.get_template(name)
+    return template.render(cell=safe_get, **context)
 
 
 # -------------------- PDF HTML --------------------
-def generate_pdf_html(patient, counter, test_list, qr_data_url="", footer_data="", show_header_footer=True, show_graph=False):
-    footer_block = ""
-    if show_header_footer and footer_data:
-        footer_block = f"""
-        <div id="footer_content" style="text-align:center;">
-            <img src="data:image/jpeg;base64,{footer_data}" style="width:100%; height:100px;">
-        </div>
-        """
-
-    header_block = ""
-    if show_header_footer:
-        logo_html = "<img src='./static/gardezi_logo.jpg' style='width:70px;'>"
-        qr_html = f"<img src='{qr_data_url}' style='width:70px;'>"
-        header_block = f"""
-        <div id="header_content">
-            <table style="width:100%; margin-bottom:5px;">
-                <tr>
-                    <td style="text-align:left;">{logo_html}</td>
-                    <td style="text-align:right;">{qr_html}</td>
-                </tr>
-            </table>
-            <hr style="border:1px solid #000; margin:5px 0;">
-        </div>
-        """
-
-    patient_info_block = f"""
-    <div id="patient_info" style="font-size:12px; width:100%;">
-        <table style="width:100%; border-collapse:collapse;">
-            <tr>
-                <td><b>Name:</b> {patient.get('patient_name','')}</td>
-                <td><b>Gender:</b> {patient.get('gender','')}</td>
-                <td><b>MR No:</b> {patient.get('mr_number','')}</td>
-            </tr>
-            <tr>
-                <td><b>Phone:</b> {patient.get('cell','')}</td>
-                <td><b>Address:</b> {patient.get('address','')}</td>
-                <td><b>Father/Husband:</b> {patient.get('father_hasband_MR','')}</td>
-            </tr>
-            <tr>
-                <td><b>Registration:</b> {counter.get('date_created','')}</td>
-                <td><b>Date:</b> {counter.get('report_date','')}</td>
-                <td><b>Sample:</b> {counter.get('sample','')}</td>
-            </tr>
-            <tr>
-                <td colspan="3"><b>Remarks:</b> {counter.get('remarks','')}</td>
-            </tr>
-        </table>
-    </div>
-    """
-
-    html = f"""
-<html>
-<head>
-<style>
-@page {{
-    margin: 200px 40px 130px 40px;
-    @frame header_frame {{ -pdf-frame-content: header_content; left: 40px; right: 40px; top: 20px; height: 100px; }}
-    @frame patient_frame {{ -pdf-frame-content: patient_info; left: 40px; right: 40px; top: 130px; height: 90px; }}
-    @frame footer_frame {{ -pdf-frame-content: footer_content; left: 30px; right: 30px; bottom: 10px; height: 110px; }}
-}}
-#header_content, #footer_content, #patient_info {{ width: 100%; position: relative; }}
-body {{ font-family: Arial; font-size: 13px; color: #000; }}
-</style>
-</head>
-<body>
-{header_block}
-{patient_info_block}
-{footer_block}
-"""
-
-    # ------------------ Tests ------------------
-    for t in test_list:
-        html += f"""
-        <div style="text-align: center; vertical-align: middle; padding-top: 7px; border:1px solid; border-color:#000;"> 
-            <b>{t.get('department','')}</b>
-        </div>
-        
-        <div style="margin-bottom:8px;padding-top: 15px;">{t.get('test_name','')}</div>
-        """
-        html += render_parameters_html(t,show_graph)
-        if t.get('comment'):
-            html += f"<p><b>Comment:</b> {t['comment']}</p>"
-        if t.get('intr_detail'):
-            html += f"<p><b>Interpretation:</b> {t['intr_detail']}</p>"
-        vinfo = t.get("test_verify_info", [{}])[0]
-        html += f"""
-        <p style="margin-top:5px;">
-            <b>Verified By:</b> {vinfo.get('name','')} |
-            <b>Qualification:</b> {vinfo.get('qualification','')} |
-            <b>Verified At:</b> {vinfo.get('verified_at','')}
-        </p>
-        """
-    html += "</body></html>"
-    return html
+def generate_pdf_html(patient, counter, test_list, qr_data_url="", footer_data="", show_header_footer=True, show_graph=False, logo_data_url="./static/gardezi_logo.jpg"):
+    return render_report_template(
+        "report/report.html",
+        patient=patient,
+        counter=counter,
+        tests=[test_context(t, show_graph) for t in test_list],
+        qr_data_url=qr_data_url,
+        footer_data=footer_data,
+        show_header_footer=show_header_footer,
+        logo_data_url=logo_data_url,
+    )
+
+def build_report_html(patient, counter, test_list, show_header_footer=True, show_graph=False):
+    # stable per counter so the QR image comes from the cache on reprints
+    qr_text = f"Report for {patient['patient_name']} - {counter.get('date_created')}"
+    static_dir = os.path.join(current_app.root_path, "static")
+    return generate_pdf_html(
+        patient, counter, test_list,
+        qr_data_url=qr_data_url_cached(qr_text),
+        footer_data=encoded_asset(os.path.join(static_dir, "report_footer.jpeg")),
+        show_header_footer=show_header_footer,
+        show_graph=show_graph,
+        logo_data_url=asset_data_url(os.path.join(static_dir, "gardezi_logo.jpg"), "image/jpeg"),
+    )
 
 # -------------------- PDF Route --------------------
 @pdfreport_bp.route('/<int:id>', methods=['POST'])
@@ -368,89 +315,160 @@ def generate_pdf_report(id):
         
         show_graph = data.get("graph", False)
 
-        placeholders = ",".join(["%s"]*len(test_ids)) if test_ids else None
-        if placeholders:
-            cursor.execute(f"""
-                SELECT pt.id AS patient_test_id, pt.verified_by, pt.verified_at, tp.id AS test_id, tp.test_name,
-                    tp.interpretation, tp.department_id, tp.fee, tp.serology_elisa
-                FROM patient_tests pt
-                JOIN test_profiles tp ON pt.test_id=tp.id
-                WHERE pt.patient_id=%s AND pt.counter_id=%s AND tp.id IN ({placeholders})
-            """, [patient_id, id]+test_ids)
-        else:
-            cursor.execute(f"""
-                SELECT pt.id AS patient_test_id, pt.verified_by, pt.verified_at, tp.id AS test_id, tp.test_name,
-                       tp.interpretation, tp.department_id, tp.fee, tp.serology_elisa
-                FROM patient_tests pt
-                JOIN test_profiles tp ON pt.test_id=tp.id
-                WHERE pt.patient_id=%s AND pt.counter_id=%s
-            """, (patient_id, id))
-
-        tests = cursor.fetchall() or []
-        test_list = []
-        for t in tests:
-            verified_name, verified_qual = "N/A", ""
-            if t.get('verified_by'):
-                cursor.execute("SELECT name, qualification FROM users WHERE id=%s", (t['verified_by'],))
-                v = cursor.fetchone()
-                if v:
-                    verified_name = v.get('name') or "N/A"
-                    verified_qual = v.get('qualification') or ""
-            interp_detail = None
-            if t.get('interpretation'):
-                cursor.execute("SELECT detail FROM interpretations WHERE id=%s", (t['interpretation'],))
-                idetail = cursor.fetchone()
-                if idetail: interp_detail = idetail.get('detail')
-            cursor.execute("SELECT comment FROM patient_tests WHERE test_id=%s AND counter_id=%s", (t['test_id'], id))
-            com = cursor.fetchone()
-            commenttext = com.get('comment') if com else None
-
-            dept_name = "N/A"
-            if t.get('department_id'):
-                cursor.execute("SELECT department_name FROM departments WHERE id=%s", (t['department_id'],))
-                drow = cursor.fetchone()
-                if drow: dept_name = drow.get('department_name') or dept_name
-
-            dates, parameters = build_parameters(cursor, patient_id, id, t['test_id'])
-            test_list.append({
-                "test_name": t.get('test_name'),
-                "fee": t.get('fee',0),
-                "department": dept_name,
-                "dates": dates,
-                "parameters": parameters,
-                "serology_elisa": t.get('serology_elisa',''),
-                "comment": commenttext,
-                "intr_detail": interp_detail,
-                "test_verify_info": [{"name": verified_name, "qualification": verified_qual, "verified_at": str(t.get('verified_at'))}]
-            })
-
-        qr_text = f"Invoice for {patient['patient_name']} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-        qr_img = qrcode.make(qr_text)
-        buf = BytesIO()
-        qr_img.save(buf, format='PNG')
-        qr_data_url = f"data:image/png;base64,{base64.b64encode(buf.getvalue()).decode()}"
-        footer_path = os.path.join(current_app.root_path, "static", "report_footer.jpeg")
-        with open(footer_path, "rb") as f:
-            footer_data = base64.b64encode(f.read()).decode()
-
-        html = generate_pdf_html(patient, counter, test_list, qr_data_url=qr_data_url, footer_data=footer_data, show_header_footer=show_header_footer, show_graph=show_graph)
-
-        pdf_filename = f"report_{patient_id}_{int(datetime.now().timestamp())}.pdf"
-        pdf_path = os.path.join(PDF_FOLDER, pdf_filename)
-        with open(pdf_path, 'wb') as f:
-            pisa_status = pisa.CreatePDF(html, dest=f)
-        if pisa_status.err:
-            return jsonify({"status":500,"error":"PDF generation failed"}),500
-
-        pdf_url = url_for('pdfreport.get_pdf', filename=pdf_filename, _external=True)
-        return jsonify({"status":200,"pdf_url":pdf_url}),200
+        test_list = load_report_tests(cursor, patient_id, id, test_ids)
+
+        # unchanged reprint -> serve the already rendered file
+        cache_key = report_cache_key(id, test_ids, patient, counter, test_list, show_header_footer, show_graph)
+        cached_filename = cached_report(id, cache_key)
+        if cached_filename:
+            pdf_url = url_for('pdfreport.get_pdf', filename=cached_filename, _external=True)
+            return jsonify({"status":200,"pdf_url":pdf_url,"cached":True}),200
+
+        pdf_filename = report_filename(id, cache_key)
+        run_async = bool(data.get("async", False))
+        # same report already rendering (double click, another worker) -> join it
+        job_id = inflight_job("report", pdf_filename)
+        if job_id:
+            return job_response(job_id, run_async=run_async)
+
+        html = build_report_html(patient, counter, test_list, show_header_footer, show_graph)
+        return pdf_job_response("report", html, pdf_filename, run_async=run_async)
 
     except Exception as e:
         return jsonify({"status":500,"error":str(e),"trace":traceback.format_exc()}),500
 
 @pdfreport_bp.route('/file/<filename>', methods=['GET'])
 def get_pdf(filename):
-    pdf_path = os.path.join(PDF_FOLDER, filename)
-    if not os.path.exists(pdf_path):
+    pdf_path = report_store.find(filename)
+    if not pdf_path:
         return jsonify({"status":404,"message":"File not found"}),404
     return send_file(pdf_path, mimetype="application/pdf", as_attachment=False)
+
+
+# -------------------- Batch PDF Route --------------------
+# Print many reports in one call, e.g. all verified reports of a day:
+#   {"counter_ids": [1, 2, 3]}  or  {"from_date": "2025-01-01", "to_date": "2025-01-01", "status": "verified"}
+# optional: "format": "pdf" (one merged file, default) | "zip", "show_header_footer", "graph", "async"
+# The bundle is a PDF job (utils/pdf_jobs.py) that waits for the report renders;
+# a batch that outlives PDF_RENDER_TIMEOUT (or "async": true) returns 202 with its job id.
+PDF_BATCH_MAX = int(os.getenv("PDF_BATCH_MAX", 500))
+
+def load_batch_counters(cursor, data):
+    filters, params = [], []
+    counter_ids = data.get("counter_ids") or []
+    if not isinstance(counter_ids, list) or not all(str(c).strip().isdigit() for c in counter_ids):
+        raise ValueError("counter_ids must be a list of counter ids")
+    counter_ids = [int(c) for c in counter_ids]
+    if counter_ids:
+        filters.append(f"c.id IN ({','.join(['%s'] * len(counter_ids))})")
+        params += counter_ids
+    # raises InvalidDate (a ValueError) for a malformed date
+    date_filters, date_params = date_range("c.date_created", data.get("from_date"), data.get("to_date"))
+    filters += date_filters
+    params += date_params
+    if not filters:
+        raise ValueError("counter_ids or from_date / to_date is required")
+    if str(data.get("status", "")).lower() == "verified":
+        filters.append("c.status = 2")
+
+    cursor.execute(f"""
+        SELECT c.id, c.pt_id, c.reff_by, c.remarks, c.sample, c.total_fee, c.paid, c.discount, c.date_created
+        FROM counter c
+        WHERE {' AND '.join(filters)}
+        ORDER BY c.id
+        LIMIT %s
+    """, params + [PDF_BATCH_MAX + 1])
+    return cursor.fetchall() or []
+
+@pdfreport_bp.route('/batch', methods=['POST'])
+@token_required
+def generate_pdf_batch():
+    start_time = time.time()
+    try:
+        data = request.get_json() or {}
+        fmt = str(data.get("format", "pdf")).lower()
+        if fmt not in ("pdf", "zip"):
+            return jsonify({"status":400,"message":"format must be pdf or zip"}),400
+        show_header_footer = data.get("show_header_footer", True)
+        show_graph = data.get("graph", False)
+        verified_only = str(data.get("status", "")).lower() == "verified"
+
+        cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        try:
+            counters = load_batch_counters(cursor, data)
+        except ValueError as e:
+            return jsonify({"status":400,"message":str(e)}),400
+        if len(counters) > PDF_BATCH_MAX:
+            return jsonify({"status":400,"message":f"Batch is limited to {PDF_BATCH_MAX} reports"}),400
+        if not counters:
+            return jsonify({"status":404,"message":"No reports found"}),404
+
+        patients = load_by_ids(cursor, """
+            SELECT id, patient_name, cell, gender, age, father_hasband_MR, mr_number, address
+            FROM patient_entry WHERE id IN ({ids})
+        """, "id", [c['pt_id'] for c in counters])
+        tests_by_counter = load_report_tests_many(cursor, counters, verified_only=verified_only)
+
+        # cached reports are reused, the rest render in parallel in the pool
+        files, jobs, skipped = [], {}, []
+        for c in counters:
+            counter_id, patient = c.pop('id'), patients.get(c['pt_id'])
+            test_list = tests_by_counter.get(counter_id)
+            if not patient or not test_list:
+                skipped.append(counter_id)
+                continue
+            cache_key = report_cache_key(counter_id, [], patient, c, test_list, show_header_footer, show_graph)
+            filename = report_filename(counter_id, cache_key)
+            files.append((counter_id, filename))
+            if not cached_report(counter_id, cache_key):
+                job_id = inflight_job("report", filename)
+                if not job_id:
+                    html = build_report_html(patient, c, test_list, show_header_footer, show_graph)
+                    job_id = submit_pdf("report", html, filename)
+                jobs[counter_id] = job_id
+        if not files:
+            return jsonify({"status":404,"message":"No reports found","skipped":skipped}),404
+
+        kind = f"batch_{fmt}"
+        out_name = batch_filename([name for _, name in files], fmt)
+        out_path = batch_store.find(out_name)
+        # a bundle is reused only when none of its reports had to render again
+        if out_path and not jobs:
+            batch_store.touch(out_path)
+            bundle_job = job_id_for(kind, out_name)
+        else:
+            parts = [(f"report_{cid}.pdf", job_id_for("report", name)) for cid, name in files]
+            bundle_job = submit_bundle(kind, parts, out_name, fmt)
+
+        run_async = bool(data.get("async", False))
+        job = job_status(bundle_job, wait=0 if run_async else PDF_RENDER_TIMEOUT)
+        response = {
+            "format": fmt,
+            "reports": len(files),
+            "rendering": len(jobs),
+            "skipped": skipped,
+            "execution_time": time.time() - start_time
+        }
+        if job["status"] == "done":
+            report_jobs = wait_for_jobs(jobs.values(), 0)
+            response["failed"] = [
+                {"counter_id": cid, "status": report_jobs[j]["status"], "error": report_jobs[j].get("error")}
+                for cid, j in jobs.items() if report_jobs[j]["status"] != "done"
+            ]
+            file_url = url_for('pdfreport.get_batch_file', filename=out_name, _external=True)
+            return jsonify({"status": 200, "file_url": file_url, **response}),200
+        if job["status"] == "failed":
+            return jsonify({"status":500, "error": job.get("error") or "No report could be rendered", **response}),500
+        status_url = url_for("pdf_jobs.get_pdf_job", job_id=bundle_job, _external=True)
+        return jsonify({"status": 202, "job_id": bundle_job, "status_url": status_url, **response}),202
+
+    except Exception as e:
+        return jsonify({"status":500,"error":str(e),"trace":traceback.format_exc()}),500
+
+@pdfreport_bp.route('/batch/file/<filename>', methods=['GET'])
+def get_batch_file(filename):
+    path = batch_store.find(filename)
+    if not path:
+        return jsonify({"status":404,"message":"File not found"}),404
+    mimetype = "application/zip" if filename.endswith(".zip") else "application/pdf"
+    return send_file(path, mimetype=mimetype, as_attachment=filename.endswith(".zip"))
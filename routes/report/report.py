@@ -1,14 +1,14 @@
 from flask import Flask, request, jsonify, Blueprint, current_app
-from flask_mysqldb import MySQL
+from utils.db_pool import mysql
 import qrcode
 import base64
 from io import BytesIO
 from datetime import datetime
 import MySQLdb.cursors
 from routes.authentication.authentication import token_required
+from utils.catalogue import get_catalogue
 
 report_bp = Blueprint('report', __name__, url_prefix='/api/report')
-mysql = MySQL()
 
 # ------------------ Report API -------------------
 @report_bp.route('/<int:id>', methods=['POST'])
@@ -94,6 +94,7 @@ def generate_report(id):
 
         total_fee = 0
         test_list = []
+        catalogue = get_catalogue()
         
         
         for test in tests:
@@ -117,25 +118,13 @@ def generate_report(id):
             print("finding line error 1021s")
             verified_by_qualification = resulttest['qualification']
             
-            cursor.execute("SELECT interpretation FROM test_profiles WHERE id = %s", (test_id,)) 
-            resultinter = cursor.fetchone()
-            intprid = resultinter['interpretation']
-            detaildetail = ""
-            if intprid:
-                cursor.execute("SELECT detail FROM interpretations WHERE id = %s", (intprid,)) 
-                resulttest = cursor.fetchone()
-                detaildetail = resulttest['detail']
+            detaildetail = catalogue.interpretation_detail(test_id)
             
             cursor.execute("SELECT comment FROM patient_tests WHERE test_id = %s AND counter_id= %s", (test_id, id,)) 
             comresult = cursor.fetchone()
             commentcomment = comresult['comment']
             # Get department againt test_id
-            cursor.execute("SELECT department_id FROM test_profiles WHERE id = %s", (test_id,)) 
-            testdepart = cursor.fetchone()
-            departtest = testdepart['department_id']
-            cursor.execute("SELECT department_name FROM departments WHERE id = %s ", (departtest,))
-            result = cursor.fetchone()
-            department_name = result['department_name']
+            department_name = catalogue.department_name(test_id)
             
             
             
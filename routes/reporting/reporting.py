@@ -1,13 +1,16 @@
 from flask import Blueprint, request, jsonify, current_app
 from MySQLdb.cursors import DictCursor
 import MySQLdb
-from flask_mysqldb import MySQL
+from utils.db_pool import mysql
 import time
 from routes.authentication.authentication import token_required
+from utils.batch_loader import load_by_ids
+from utils.export import get_export_format, export_query
+from utils.date_filters import date_range_sql, InvalidDate
+from utils.rollups import SALES, business_totals, day_range, ensure_rollup
 
 
 reporting_bp = Blueprint('reporting', __name__, url_prefix='/api/reporting')
-mysql = MySQL()
 
 
 # ------------------ TODO Reception report --get all data their role is receptionist by their id and  from date to date -----------------------
@@ -32,9 +35,10 @@ def get_receptionists_by_date(center_id):
 
         mysql = current_app.mysql
         cursor = mysql.connection.cursor(DictCursor)
+        date_sql, date_params = date_range_sql("c.created_at", from_date, to_date)
 
         # 🔹 Base query
-        query = """
+        query = f"""
             SELECT 
                 u.id AS receptionist_id,
                 u.name AS receptionist_name,
@@ -57,25 +61,31 @@ def get_receptionists_by_date(center_id):
             LEFT JOIN test_profiles tp ON tp.id = t.test_id
             LEFT JOIN users r ON r.id = c.reff_by
             WHERE u.role = 'Reception' AND u.id = %s
-            AND c.created_at BETWEEN %s AND %s
+            {date_sql}
             GROUP BY c.id
             ORDER BY u.id DESC, c.id DESC
-            LIMIT %s OFFSET %s
         """
-        params = [center_id, from_date, to_date, record_per_page, offset]
+        params = [center_id] + date_params
+
+        export_format = get_export_format()
+        if export_format:
+            return export_query(export_format, "receptionists_report", query, params)
+
+        query += " LIMIT %s OFFSET %s"
+        params += [record_per_page, offset]
 
         cursor.execute(query, params)
         results = cursor.fetchall()
 
         # 🔹 total count (without pagination) for frontend info
-        count_query = """
+        count_query = f"""
             SELECT COUNT(DISTINCT c.id) AS total
             FROM users u
             LEFT JOIN counter c ON c.user_id = u.id
             WHERE u.role = 'Reception' AND u.id = %s
-            AND c.created_at BETWEEN %s AND %s
+            {date_sql}
         """
-        cursor.execute(count_query, [center_id, from_date, to_date])
+        cursor.execute(count_query, [center_id] + date_params)
         total_records = cursor.fetchone()['total']
 
         end_time = time.time()
@@ -86,6 +96,8 @@ def get_receptionists_by_date(center_id):
             "execution_time": end_time - start_time
         }), 200
 
+    except InvalidDate as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -118,9 +130,10 @@ def get_doctors_by_date(doctor_id):
 
         mysql = current_app.mysql
         cursor = mysql.connection.cursor(DictCursor)
+        date_sql, date_params = date_range_sql("t.verified_at", from_date, to_date)
 
         # 🔹 Base query
-        query = """
+        query = f"""
         SELECT 
             u.id AS doctor_id,
             u.name AS doctor_name,
@@ -137,12 +150,18 @@ def get_doctors_by_date(doctor_id):
         LEFT JOIN patient_entry p ON p.id = c.pt_id
         LEFT JOIN test_profiles tp ON tp.id = t.test_id
         WHERE u.role = 'Doctor' AND u.id = %s
-          AND DATE(t.verified_at) BETWEEN %s AND %s
+          {date_sql}
         GROUP BY t.counter_id
         ORDER BY MAX(t.verified_at) DESC
-        LIMIT %s OFFSET %s
         """
-        params = [doctor_id, from_date, to_date, record_per_page, offset]
+        params = [doctor_id] + date_params
+
+        export_format = get_export_format()
+        if export_format:
+            return export_query(export_format, "doctors_report", query, params)
+
+        query += " LIMIT %s OFFSET %s"
+        params += [record_per_page, offset]
 
         cursor.execute(query, params)
         rows = cursor.fetchall()
@@ -172,15 +191,15 @@ def get_doctors_by_date(doctor_id):
             }
 
         # 🔹 Total patients count (without pagination)
-        count_query = """
+        count_query = f"""
         SELECT COUNT(DISTINCT t.counter_id) AS total
         FROM users u
         LEFT JOIN patient_tests t ON t.verified_by = u.id
         LEFT JOIN counter c ON c.id = t.counter_id
         WHERE u.role = 'Doctor' AND u.id = %s
-          AND DATE(t.verified_at) BETWEEN %s AND %s
+          {date_sql}
         """
-        cursor.execute(count_query, [doctor_id, from_date, to_date])
+        cursor.execute(count_query, [doctor_id] + date_params)
         total_records = cursor.fetchone()['total']
 
         end_time = time.time()
@@ -189,6 +208,8 @@ def get_doctors_by_date(doctor_id):
 
         return jsonify(doctor_data), 200
 
+    except InvalidDate as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -239,9 +260,8 @@ def get_receptionists_by_cc(cc_id):
         params = list(receptionist_ids)
 
         if from_date and to_date:
-            date_condition = " AND c.date_created BETWEEN %s AND %s "
-            params.append(from_date)
-            params.append(to_date)
+            date_condition, date_params = date_range_sql("c.date_created", from_date, to_date)
+            params.extend(date_params)
 
         # Step 2: Main query with pagination
         query = f"""
@@ -283,8 +303,13 @@ def get_receptionists_by_cc(cc_id):
                 u2.role,
                 u.name
             ORDER BY pe.id DESC
-            LIMIT %s OFFSET %s
         """
+
+        export_format = get_export_format()
+        if export_format:
+            return export_query(export_format, "cc_report", query, tuple(params))
+
+        query += " LIMIT %s OFFSET %s"
         params.extend([record_per_page, offset])
 
         cursor.execute(query, tuple(params))
@@ -299,8 +324,8 @@ def get_receptionists_by_cc(cc_id):
         """
         count_params = list(receptionist_ids)
         if from_date and to_date:
-            count_query += " AND c.date_created BETWEEN %s AND %s"
-            count_params.extend([from_date, to_date])
+            count_query += date_condition
+            count_params.extend(date_params)
 
         cursor.execute(count_query, tuple(count_params))
         total_records = cursor.fetchone()['total']
@@ -314,6 +339,8 @@ def get_receptionists_by_cc(cc_id):
             "execution_time": end_time - start_time
         }), 200
 
+    except InvalidDate as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     finally:
@@ -354,9 +381,13 @@ def technician_report(technician_id):
         params = [technician_id]
 
         # 🔹 Optional date filter
-        if from_date and to_date:
-            query += " AND DATE(t.created_at) BETWEEN %s AND %s"
-            params.extend([from_date, to_date])
+        date_sql, date_params = date_range_sql("t.created_at", from_date, to_date) if from_date and to_date else ("", [])
+        query += date_sql
+        params.extend(date_params)
+
+        export_format = get_export_format()
+        if export_format:
+            return export_query(export_format, "technician_report", query + " ORDER BY t.created_at DESC", params)
 
         # 🔹 Total count (without pagination)
         count_query = f"""
@@ -366,9 +397,8 @@ def technician_report(technician_id):
             WHERE u.role = 'Technician' AND u.id = %s
         """
         count_params = [technician_id]
-        if from_date and to_date:
-            count_query += " AND DATE(t.created_at) BETWEEN %s AND %s"
-            count_params.extend([from_date, to_date])
+        count_query += date_sql
+        count_params.extend(date_params)
         cursor.execute(count_query, count_params)
         total_records = cursor.fetchone()['total']
 
@@ -388,6 +418,8 @@ def technician_report(technician_id):
             "total_records": total_records  # optional for frontend
         }), 200
 
+    except InvalidDate as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -408,48 +440,8 @@ def get_business_reports():
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
 
-        # Default conditions (match everything)
-        counter_date_filter = " WHERE 1=1 "
-        tests_date_filter = " WHERE 1=1 "
-        params = ()
-
-        if start_date and end_date:
-            # keep original logic (dates injected directly into the subquery strings)
-            counter_date_filter = f" WHERE date_created BETWEEN '{start_date}' AND '{end_date}' "
-            tests_date_filter = f" WHERE verified_at BETWEEN '{start_date}' AND '{end_date}' "
-
-        query = f"""
-        SELECT
-            -- Patient Details (from 'counter' table)
-            (SELECT COUNT(*) FROM counter {counter_date_filter}) AS total_patient,
-            (SELECT COUNT(*) FROM counter {counter_date_filter} AND status = 0) AS pending_patient,
-            (SELECT COUNT(*) FROM counter {counter_date_filter} AND status = 1) AS patient_processed,
-
-            -- Amount Summary (from 'counter' table)
-            (SELECT SUM(discount) FROM counter {counter_date_filter} AND discount > 0) AS total_discount,
-            (SELECT SUM(total_fee) FROM counter {counter_date_filter}) AS total_amount,
-            (SELECT SUM(paid) FROM counter {counter_date_filter}) AS paid_amount,
-            (SELECT SUM(total_fee - paid) FROM counter {counter_date_filter}) AS due_amount,
-
-            -- Test Details (from 'patient_tests' table)
-            (SELECT COUNT(*) FROM patient_tests {tests_date_filter}) AS total_test,
-            (SELECT COUNT(*) FROM patient_tests {tests_date_filter} AND status = 1) AS processed_test,
-            (SELECT COUNT(*) FROM patient_tests {tests_date_filter} AND status = 0) AS unprocessed_test_count
-        """
-
-        cursor.execute(query, params)
-        report = cursor.fetchone()
-
-        if report is None:
-            # ensure numeric zeros when no rows
-            report = {"total_patient": 0, "pending_patient": 0, "patient_processed": 0,
-                    "total_discount": 0, "total_amount": 0, "paid_amount": 0, "due_amount": 0,
-                    "total_test": 0, "processed_test": 0, "unprocessed_test_count": 0}
-        else:
-            # replace None with 0 for keys present
-            for k, v in report.items():
-                if v is None:
-                    report[k] = 0
+        # single pass per table; plain date ranges come from the daily rollup
+        report = business_totals(cursor, start_date, end_date)
 
         end_time = time.time()
 
@@ -501,15 +493,16 @@ def discount_report():
     query = "SELECT * FROM counter WHERE discount > 0"
     params = []
 
-    if from_date and to_date:
-        query += " AND DATE(created_at) BETWEEN %s AND %s"
-        params.extend([from_date, to_date])
-    elif from_date:
-        query += " AND DATE(created_at) >= %s"
-        params.append(from_date)
-    elif to_date:
-        query += " AND DATE(created_at) <= %s"
-        params.append(to_date)
+    try:
+        date_sql, date_params = date_range_sql("created_at", from_date, to_date)
+    except InvalidDate as e:
+        return jsonify({"error": str(e)}), 400
+    query += date_sql
+    params.extend(date_params)
+
+    export_format = get_export_format()
+    if export_format:
+        return export_query(export_format, "discount_report", query + " ORDER BY id DESC", tuple(params))
 
     mysql = current_app.mysql
     cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
@@ -545,6 +538,18 @@ def simple_patient_list():
     record_per_page = request.args.get('recordperpage', 30, type=int)
     offset = (current_page - 1) * record_per_page
 
+    export_format = get_export_format()
+    if export_format:
+        # same columns as the JSON rows, patient joined in instead of looked up per page
+        return export_query(export_format, "due_report", """
+            SELECT c.id, c.pt_id, p.patient_name AS name, p.mr_number,
+                c.total_fee, c.paid, (c.total_fee - c.paid) AS due_amount
+            FROM counter c
+            LEFT JOIN patient_entry p ON p.id = c.pt_id
+            WHERE c.paid < c.total_fee
+            ORDER BY c.id DESC
+        """)
+
     mysql = current_app.mysql
     cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
 
@@ -560,14 +565,17 @@ def simple_patient_list():
 
     final_data = []
 
-    # Step 3: For each counter record, fetch patient details
+    # Step 3: Fetch patient details for all counter records in one query
+    patients = load_by_ids(
+        cursor,
+        "SELECT id, patient_name, mr_number FROM patient_entry WHERE id IN ({ids})",
+        "id",
+        [row.get("pt_id") for row in counter_data]
+    )
+
     for row in counter_data:
         pt_id = row.get("pt_id")
-        cursor.execute(
-            "SELECT patient_name, mr_number FROM patient_entry WHERE id = %s",
-            (pt_id,)
-        )
-        patient = cursor.fetchone()
+        patient = patients.get(pt_id)
 
         # Response build
         final_data.append({
@@ -602,10 +610,14 @@ def get_activity():
         cursor.execute("SELECT * FROM patient_activity_log ORDER BY created_at DESC")
         activities = cursor.fetchall()
         #activities mn patient id a raha os patient ka name get krna hay 
+        patients = load_by_ids(
+            cursor,
+            "SELECT id, patient_name, mr_number FROM patient_entry WHERE id IN ({ids})",
+            "id",
+            [activity['patient_id'] for activity in activities]
+        )
         for activity in activities:
-            patient_id = activity['patient_id']
-            cursor.execute("SELECT patient_name, mr_number FROM patient_entry WHERE id = %s", (patient_id,))
-            patient = cursor.fetchone()
+            patient = patients.get(activity['patient_id'])
             if patient:
                 activity['patient_name'] = patient['patient_name']
                 activity['mr_number'] = patient['mr_number']
@@ -633,29 +645,59 @@ def get_sales_report():
         return jsonify({
             "error": "Both 'from_date' and 'to_date' are required (YYYY-MM-DD)"
         }), 400
+    try:
+        date_sql, date_params = date_range_sql("c.created_at", from_date, to_date)
+    except InvalidDate as e:
+        return jsonify({"error": str(e)}), 400
 
     mysql = current_app.mysql
     cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
 
-    query = """
-        SELECT 
-            DATE(c.created_at) AS sale_date,
-            c.total_fee,
-            c.discount,
-            c.total_fee - paid AS payment_recoveries,
-            cc.id AS cc,
-            cc.name AS collection_center_name,
-            SUM(c.paid) AS payment_received
-        FROM counter c
-        LEFT JOIN collectioncenter cc 
-            ON c.cc = cc.id
-        WHERE DATE(c.created_at) BETWEEN %s AND %s
-          AND c.trash = 0
-        GROUP BY DATE(c.created_at), cc.id, cc.name
-        ORDER BY sale_date ASC
-    """
-
-    cursor.execute(query, (from_date, to_date))
+    days = day_range(from_date, to_date)
+    if days and ensure_rollup(cursor, SALES, *days):
+        query = """
+            SELECT 
+                r.day AS sale_date,
+                SUM(r.total_fee) AS total_fee,
+                SUM(r.discount) AS discount,
+                SUM(r.total_fee - r.paid) AS payment_recoveries,
+                cc.id AS cc,
+                cc.name AS collection_center_name,
+                SUM(r.paid) AS payment_received
+            FROM counter_cc_daily_rollup r
+            LEFT JOIN collectioncenter cc 
+                ON r.cc = cc.id
+            WHERE r.day BETWEEN %s AND %s
+              AND r.trash = 0
+            GROUP BY r.day, cc.id, cc.name
+            ORDER BY sale_date ASC
+        """
+        params = days
+    else:
+        query = f"""
+            SELECT 
+                DATE(c.created_at) AS sale_date,
+                SUM(c.total_fee) AS total_fee,
+                SUM(c.discount) AS discount,
+                SUM(c.total_fee - c.paid) AS payment_recoveries,
+                cc.id AS cc,
+                cc.name AS collection_center_name,
+                SUM(c.paid) AS payment_received
+            FROM counter c
+            LEFT JOIN collectioncenter cc 
+                ON c.cc = cc.id
+            WHERE COALESCE(c.trash, 0) = 0{date_sql}
+            GROUP BY DATE(c.created_at), cc.id, cc.name
+            ORDER BY sale_date ASC
+        """
+        params = date_params
+
+    export_format = get_export_format()
+    if export_format:
+        cursor.close()
+        return export_query(export_format, "sales_statement_report", query, params)
+
+    cursor.execute(query, params)
     data = cursor.fetchall()
     cursor.close()
 
@@ -1,13 +1,14 @@
 import math
 from flask import Blueprint, request, jsonify, current_app
 from MySQLdb.cursors import DictCursor
-from flask_mysqldb import MySQL
+from utils.db_pool import mysql
 import time
 from routes.authentication.authentication import token_required
+from utils.counting import count_total, total_pages
+from utils.permission_cache import invalidate_permissions
 
 
 role_bp = Blueprint('role', __name__, url_prefix='/api/role')
-mysql = MySQL()
 
 # ===================== Role Crud operations ===================== #
 
@@ -39,9 +40,8 @@ def get_roles():
         base_query += where_clause
 
         # Count total records
-        count_query = f"SELECT COUNT(*) as total FROM ({base_query}) as subquery"
-        cur.execute(count_query, values)
-        total_records = cur.fetchone()["total"]
+        count_query = f"SELECT COUNT(*) AS total FROM roles{where_clause}"
+        total_records = count_total(cur, count_query, values, table=None if search else "roles")
 
         # Pagination + Order
         base_query += " ORDER BY id DESC LIMIT %s OFFSET %s"
@@ -50,12 +50,11 @@ def get_roles():
         roles = cur.fetchall()
         
         end_time = time.time()
-        total_pages = math.ceil(total_records / record_per_page)
 
         return jsonify({
             "data": roles,
             "totalRecords": total_records,
-            "totalPages": total_pages,
+            "totalPages": total_pages(total_records, record_per_page),
             "currentPage": current_page,
             "executionTime": end_time - start_time
         }), 200
@@ -134,6 +133,7 @@ def create_role():
             alter_sql = f"ALTER TABLE user_module_permissions ADD COLUMN `{role_name}` TINYINT(1) DEFAULT 0"
             cur.execute(alter_sql)
             mysql.connection.commit()
+            invalidate_permissions()
 
         cur.close()
         end_time = time.time()
@@ -277,6 +277,7 @@ def update_role_permissions(id):
             return jsonify({"message": f"Role ID {id} not found."}), 404
 
         current_app.mysql.connection.commit()
+        invalidate_permissions()
         end_time = time.time()
 
         
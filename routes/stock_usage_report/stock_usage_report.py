@@ -1,13 +1,13 @@
 import MySQLdb.cursors
 from flask import Blueprint, jsonify, request, current_app
 from routes.authentication.authentication import token_required
-from flask_mysqldb import MySQL
+from utils.date_filters import date_range_sql, InvalidDate
+from utils.db_pool import mysql
 
 # Blueprint
 stock_usage_report_bp = Blueprint(
     'stock_usage_report', __name__, url_prefix='/api/stock_usage_report'
 )
-mysql = MySQL()
 
 # -------------------- CREATE -------------------- #
 @stock_usage_report_bp.route('/', methods=['POST'])
@@ -190,8 +190,9 @@ def get_stock_usage_by_date():
 
         # Add date filter only if both dates are provided
         if from_date and to_date:
-            base_query += " AND DATE(date) BETWEEN %s AND %s"
-            params.extend([from_date, to_date])
+            date_sql, date_params = date_range_sql("date", from_date, to_date)
+            base_query += date_sql
+            params.extend(date_params)
 
         base_query += " ORDER BY id DESC"
 
@@ -204,5 +205,7 @@ def get_stock_usage_by_date():
             "count": len(usages)
         }), 200
 
+    except InvalidDate as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1,12 +1,14 @@
 import math
 from flask import Blueprint, request, jsonify, current_app
 from MySQLdb.cursors import DictCursor
-from flask_mysqldb import MySQL
+from utils.db_pool import mysql
 import time
 from routes.authentication.authentication import token_required
+from utils.counting import count_total, total_pages
+from utils.catalogue import get_catalogue, invalidate_catalogue
+from utils.conditional import conditional_get
 
 test_profile_bp = Blueprint('test_profile', __name__, url_prefix='/api/test_profile')
-mysql = MySQL()
 
 # ===================== Test Profile CRUD operations ===================== #
 
@@ -39,13 +41,12 @@ def get_all_test_profiles():
             where_clauses.append("test_name LIKE %s")
             values.append(f"%{search}%")
 
-        if where_clauses:
-            base_query += " WHERE " + " AND ".join(where_clauses)
+        where_sql = " WHERE " + " AND ".join(where_clauses)
+        base_query += where_sql
 
         # total records
-        count_query = f"SELECT COUNT(*) as total FROM ({base_query}) as subquery"
-        cur.execute(count_query, values)
-        total_records = cur.fetchone()["total"]
+        count_query = f"SELECT COUNT(*) AS total FROM test_profiles{where_sql}"
+        total_records = count_total(cur, count_query, values, table=None if search else "test_profiles")
 
         # pagination
         base_query += " ORDER BY id DESC LIMIT %s OFFSET %s"  # 🔹 ASC for ascending
@@ -53,13 +54,12 @@ def get_all_test_profiles():
         cur.execute(base_query, values)
         test_profiles = cur.fetchall()
 
-        total_pages = math.ceil(total_records / record_per_page)
         end_time = time.time()
 
         return jsonify({
             "data": test_profiles,
             "totalRecords": total_records,
-            "totalPages": total_pages,
+            "totalPages": total_pages(total_records, record_per_page),
             "currentPage": current_page,
             "execution_time": end_time - start_time
         }), 200
@@ -92,14 +92,15 @@ def get_test_profile(test_profile_id):
 # ----------------------get test name and id ---------------------#
 @test_profile_bp.route('/get_tests', methods=['GET'])
 @token_required
+@conditional_get("test_profiles")
 def get_test_names():
     start_time = time.time()
     try:
-        mysql = current_app.mysql
-        cursor = mysql.connection.cursor(DictCursor)
-        cursor.execute("SELECT id, test_name,sample_required, delivery_time, fee FROM test_profiles WHERE trash = 0")
-        rows = cursor.fetchall()
-        cursor.close()
+        catalogue = get_catalogue()
+        rows = [
+            {k: t[k] for k in ("id", "test_name", "sample_required", "delivery_time", "fee")}
+            for t in catalogue.tests.values() if t["trash"] == 0
+        ]
         end_time = time.time()
         return jsonify({
             "data": rows,
@@ -176,6 +177,7 @@ def create_test_profile():
         ))
         mysql.connection.commit()
         cursor.close()
+        invalidate_catalogue("test_profiles")
         end_time = time.time()
 
 
@@ -266,6 +268,7 @@ def update_test_profile(test_profile_id):
         cursor.execute(update_query, (test_name, test_code, sample_required, fee, delivery_time, serology_elisa, interpretation, test_profile_id))
         mysql.connection.commit()  
         cursor.close()
+        invalidate_catalogue("test_profiles")
         end_time = time.time()
 
         return jsonify({"message": "Test Profile updated successfully",
@@ -291,6 +294,7 @@ def delete_test_profile(test_profile_id):
         cursor.execute("UPDATE test_profiles SET trash = 1 WHERE id = %s", (test_profile_id,))
         mysql.connection.commit()
         cursor.close()
+        invalidate_catalogue("test_profiles")
         end_time = time.time()
         return jsonify({"message": "Test&Profile deleted successfully","status" : 200,
                         "execution_time": end_time - start_time}), 200
@@ -323,14 +327,12 @@ def search_test_profile(test_name):
 # --------------------- Get department names for select header --------------------- #
 @test_profile_bp.route('/departments', methods=['GET'])
 @token_required
+@conditional_get("departments")
 def get_departments():
     start_time = time.time()
     try:
-        mysql = current_app.mysql
-        cursor = mysql.connection.cursor(DictCursor)
-        cursor.execute("SELECT department_name FROM departments")
-        rows = cursor.fetchall()
-        cursor.close()
+        catalogue = get_catalogue()
+        rows = [{"department_name": d["department_name"]} for d in catalogue.departments.values()]
         end_time = time.time()
         rows.append({"execution_time": end_time - start_time})
         return jsonify(rows), 200
@@ -3,6 +3,8 @@ from flask import Blueprint, request, jsonify, current_app
 from MySQLdb.cursors import DictCursor
 import time
 from routes.authentication.authentication import token_required
+from utils.catalogue import get_catalogue, invalidate_catalogue
+from utils.conditional import conditional_get
 
 packages_bp = Blueprint('packages_bp', __name__, url_prefix='/api/test-packages')
 
@@ -51,6 +53,7 @@ def create_package():
     ))
     mysql.connection.commit()
     cur.close()
+    invalidate_catalogue("test_packages")
     end_time = time.time()
     return jsonify({"message": "Package created",
                     "status" : 201,
@@ -111,25 +114,21 @@ def get_packages():
 # -------- READ ONE (GET by id) --------
 @packages_bp.route('/<int:id>', methods=['GET'])
 @token_required
+@conditional_get("test_packages", "test_profiles")
 def get_package(id):
     start_time = time.time()
     try:
-            mysql = current_app.mysql
-            cur = mysql.connection.cursor(DictCursor)
-            cur.execute("SELECT selected_test FROM test_packages WHERE id=%s", (id,))
-            row = cur.fetchone()
-            selected_test = row['selected_test']
-            test_ids = [int(t.strip()) for t in selected_test.split(',') if t.strip().isdigit()]
+            catalogue = get_catalogue()
+            test_ids = catalogue.package_test_ids(id)
+            if test_ids is None:
+                return jsonify({"error": "Package not found"}), 404
             if not test_ids:
                 return jsonify({"error": "No valid test IDs found"}), 400
-        
-            placeholders = ', '.join(['%s'] * len(test_ids))
-            query = f"SELECT id, test_name, delivery_time,sample_required,fee FROM test_profiles WHERE id IN ({placeholders})"
-        
-            cur.execute(query, tuple(test_ids))
-            result = cur.fetchall()
-        
-            cur.close()
+
+            result = [
+                {k: catalogue.tests[t][k] for k in ("id", "test_name", "delivery_time", "sample_required", "fee")}
+                for t in test_ids if t in catalogue.tests
+            ]
             end_time = time.time()
 
             return jsonify({
@@ -139,7 +138,7 @@ def get_package(id):
             "execution_time": end_time - start_time
             }), 200
     except Exception as e:
-        return jsonify({"error": str(e)})
+        return jsonify({"error": str(e)}), 500
 
 # -------- UPDATE (PUT) --------
 @packages_bp.route('/<int:id>', methods=['PUT'])
@@ -171,6 +170,7 @@ def update_package(id):
     ))
     mysql.connection.commit()
     cur.close()
+    invalidate_catalogue("test_packages")
     end_time = time.time()
     return jsonify({"message": "Package updated",
                     "status" : 200,
@@ -187,6 +187,7 @@ def delete_package(id):
     cur.execute("UPDATE test_packages SET trash = 1 WHERE id=%s", (id,))
     mysql.connection.commit()
     cur.close()
+    invalidate_catalogue("test_packages")
     end_time = time.time()
     return jsonify({"message": "Package deleted",
                     "status" : 200,
@@ -1,13 +1,13 @@
 import MySQLdb.cursors
 from flask import Blueprint, jsonify, request, current_app
-from flask_mysqldb import MySQL
+from utils.db_pool import mysql
+from utils.date_filters import date_range_sql, InvalidDate
 import time
 import math
 trial_balance_report_bp = Blueprint(
     'trial_balance_report', __name__, url_prefix='/api/trial_balance'
 )
 
-mysql = MySQL()
 
 
 # -------------------- CREATE TRIAL BALANCE  -------------------- #
@@ -91,8 +91,9 @@ def get_trial_balance():
 
         # ---------------- Date Filter ---------------- #
         if from_date and to_date:
-            base_query += " AND tbr.date BETWEEN %s AND %s"
-            values.extend([from_date, to_date])
+            date_sql, date_params = date_range_sql("tbr.date", from_date, to_date)
+            base_query += date_sql
+            values.extend(date_params)
 
         # ---------------- Search Filter ---------------- #
         if search:
@@ -155,6 +156,8 @@ def get_trial_balance():
             "execution_time": execution_time
         }), 200
 
+    except InvalidDate as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         execution_time = time.time() - start_time
         return jsonify({
@@ -1,16 +1,18 @@
 import math, random, string
 from flask import Blueprint, request, jsonify, current_app
-from flask_mysqldb import MySQL
+from utils.db_pool import mysql
 from MySQLdb.cursors import DictCursor
 import MySQLdb
 import os
 from datetime import datetime
 import time
 from routes.authentication.authentication import token_required
+from utils.counting import count_total, total_pages
+from utils.table_versions import bump_tables
+from utils.conditional import conditional_get
 
 
 users_bp = Blueprint('users', __name__, url_prefix='/api/users')
-mysql = MySQL()
 
 #===================== Users CRUD Operations =====================
 
@@ -57,6 +59,7 @@ def create_user():
             cc
         ))
         mysql.connection.commit()
+        bump_tables("users")
         end_time = time.time()
 
         return jsonify({
@@ -106,13 +109,12 @@ def get_users():
             where_clauses.append("(name LIKE %s OR user_name LIKE %s OR role LIKE %s)")
             values.extend([f"%{search}%", f"%{search}%", f"%{search}%"])
 
-        if where_clauses:
-            base_query += " WHERE " + " AND ".join(where_clauses)
+        where_sql = " WHERE " + " AND ".join(where_clauses)
+        base_query += where_sql
 
         # total count
-        count_query = f"SELECT COUNT(*) as total FROM ({base_query}) as subquery"
-        cur.execute(count_query, values)
-        total_records = cur.fetchone()["total"]
+        count_query = f"SELECT COUNT(*) AS total FROM users{where_sql}"
+        total_records = count_total(cur, count_query, values, table=None if search else "users")
 
         # pagination
         base_query += " ORDER BY id DESC LIMIT %s OFFSET %s"
@@ -120,13 +122,12 @@ def get_users():
         cur.execute(base_query, values)
         users = cur.fetchall()
 
-        total_pages = math.ceil(total_records / record_per_page)
         end_time = time.time()
 
         return jsonify({
             "data": users,
             "totalRecords": total_records,
-            "totalPages": total_pages,
+            "totalPages": total_pages(total_records, record_per_page),
             "currentPage": current_page,
             "execution_time": end_time - start_time
         }), 200
@@ -189,6 +190,7 @@ def update_user(id):
             name, contact_no, user_name, role, age, discount, id
         ))
         mysql.connection.commit()
+        bump_tables("users")
         end_time = time.time()
 
         return jsonify({"message": "User updated successfully", "execution_time": end_time - start_time}), 200
@@ -209,6 +211,7 @@ def delete_user(id):
 
         cursor.execute("UPDATE users SET trash = 1 WHERE id = %s", (id,))
         mysql.connection.commit()
+        bump_tables("users")
         end_time = time.time()
         return jsonify({"message": "User deleted successfully", "execution_time": end_time - start_time}), 200
     except Exception as e:
@@ -297,6 +300,7 @@ def update_user_profile(id):
             WHERE id=%s
         """, (name, contact_no, user_name, age, email, qualification, image_path,id))
         conn.commit()
+        bump_tables("users")
         end_time = time.time()
 
         return jsonify({
@@ -325,6 +329,7 @@ def update_password(id):
             WHERE id = %s"""
         cursor.execute(update_query,(password,id,))
         conn.commit()
+        bump_tables("users")
         end_time = time.time()
         return jsonify({"message": "password is update succesfuly", "execution_time": end_time - start_time})
     except Exception as e:
@@ -333,6 +338,7 @@ def update_password(id):
 #-------------------------- GET all users their role is doctor------------------------
 @users_bp.route('/doctors/', methods=['GET'])
 @token_required
+@conditional_get("users")
 def get_doctors_only():
     start_time = time.time()
     try:
@@ -368,6 +374,7 @@ def get_doctors_only():
 # ------------------get all their role is technician  -----------------------
 @users_bp.route('/technicians/', methods=['GET'])
 @token_required
+@conditional_get("users")
 def get_technicians():
     start_time = time.time()
     try:
@@ -403,6 +410,7 @@ def get_technicians():
 # ---------------------get all users their role is reception-----------------------
 @users_bp.route('/receptionists/', methods=['GET'])
 @token_required
+@conditional_get("users")
 def get_receptionists_only():
     start_time = time.time()
     try:
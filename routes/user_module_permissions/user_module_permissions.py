@@ -2,6 +2,7 @@ from flask import Blueprint, jsonify, current_app,request
 from MySQLdb.cursors import DictCursor
 import time
 from routes.authentication.authentication import token_required
+from utils.permission_cache import invalidate_permissions
 
 permission_bp = Blueprint('permission', __name__, url_prefix='/api/permission')
 
@@ -104,6 +105,7 @@ def update_permissions():
 
         conn.commit()
         cursor.close()
+        invalidate_permissions()
         end_time = time.time()
         execution_time = end_time - start_time
 
@@ -0,0 +1,171 @@
+import glob
+import hashlib
+import os
+import threading
+import time
+
+
+# ------------------ Generated artifact storage ------------------ #
+# Rendered PDFs used to pile up in one flat folder forever. An ArtifactStore
+# spreads files over 256 shard sub-folders, keeps total size under
+# ARTIFACT_MAX_MB and age under ARTIFACT_MAX_AGE_DAYS (oldest-used first),
+# and runs a background sweeper every ARTIFACT_SWEEP_INTERVAL seconds.
+#
+# Files of the same owner (e.g. report_<counter_id>_*) share a shard, so
+# per-counter invalidation only lists one small folder.
+
+ARTIFACT_MAX_MB = int(os.getenv("ARTIFACT_MAX_MB", 2048))
+ARTIFACT_MAX_AGE_DAYS = float(os.getenv("ARTIFACT_MAX_AGE_DAYS", 30))
+ARTIFACT_SWEEP_INTERVAL = int(os.getenv("ARTIFACT_SWEEP_INTERVAL", 600))
+
+_stores = {}
+
+
+class ArtifactStore:
+
+    def __init__(self, name, root, max_bytes=None, max_age=None):
+        self.name = name
+        self.root = root
+        self.max_bytes = max_bytes if max_bytes is not None else ARTIFACT_MAX_MB * 1024 * 1024
+        self.max_age = max_age if max_age is not None else ARTIFACT_MAX_AGE_DAYS * 86400
+        self._lock = threading.Lock()
+        self._sweeper = None
+        self._sweeper_pid = None
+        self._stats = {
+            "files": 0, "bytes": 0, "last_sweep": None,
+            "evicted_files": 0, "evicted_bytes": 0,
+        }
+        os.makedirs(root, exist_ok=True)
+        _stores[name] = self
+
+    # ---------- paths ----------
+    @staticmethod
+    def shard_of(filename):
+        # owner prefix: "report_12_<hash>.pdf" -> "report_12"
+        owner = os.path.splitext(filename)[0].rsplit("_", 1)[0]
+        return hashlib.sha1(owner.encode()).hexdigest()[:2]
+
+    def path_for(self, filename, create=False):
+        filename = os.path.basename(filename)
+        folder = os.path.join(self.root, self.shard_of(filename))
+        if create:
+            os.makedirs(folder, exist_ok=True)
+            self.start_sweeper()
+        return os.path.join(folder, filename)
+
+    def find(self, filename):
+        """Return the on-disk path of a stored file (sharded or legacy flat), or None."""
+        filename = os.path.basename(filename)
+        for path in (self.path_for(filename), os.path.join(self.root, filename)):
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def touch(self, path):
+        # mtime doubles as "last used" for LRU eviction
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    def remove_owner(self, owner):
+        """Delete every file of an owner prefix, e.g. remove_owner("report_12")."""
+        folder = os.path.join(self.root, hashlib.sha1(owner.encode()).hexdigest()[:2])
+        removed = 0
+        for path in glob.glob(os.path.join(glob.escape(folder), glob.escape(owner) + "_*")):
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    # ---------- eviction ----------
+    def _scan(self):
+        entries = []
+        for top in os.scandir(self.root):
+            dirs = [top.path] if top.is_dir() else []
+            if top.is_file():
+                entries.append(top)
+            for d in dirs:
+                entries.extend(e for e in os.scandir(d) if e.is_file())
+        files = []
+        for e in entries:
+            try:
+                st = e.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, e.path))
+        return files
+
+    def sweep(self):
+        """Evict expired files, then least recently used ones until under max_bytes."""
+        with self._lock:
+            files = self._scan()
+            now = time.time()
+            keep, evicted_files, evicted_bytes = [], 0, 0
+
+            for mtime, size, path in files:
+                if self.max_age and now - mtime > self.max_age:
+                    if self._remove(path):
+                        evicted_files += 1
+                        evicted_bytes += size
+                        continue
+                keep.append((mtime, size, path))
+
+            total = sum(size for _, size, _ in keep)
+            if self.max_bytes and total > self.max_bytes:
+                keep.sort()
+                while keep and total > self.max_bytes:
+                    mtime, size, path = keep.pop(0)
+                    if self._remove(path):
+                        evicted_files += 1
+                        evicted_bytes += size
+                        total -= size
+
+            self._stats.update({
+                "files": len(keep),
+                "bytes": total,
+                "last_sweep": now,
+                "evicted_files": self._stats["evicted_files"] + evicted_files,
+                "evicted_bytes": self._stats["evicted_bytes"] + evicted_bytes,
+            })
+            return evicted_files
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    def start_sweeper(self):
+        # one daemon thread per worker process, started on first write
+        if self._sweeper_pid == os.getpid() or not ARTIFACT_SWEEP_INTERVAL:
+            return
+        self._sweeper_pid = os.getpid()
+
+        def run():
+            while True:
+                try:
+                    self.sweep()
+                except Exception:
+                    pass
+                time.sleep(ARTIFACT_SWEEP_INTERVAL)
+
+        self._sweeper = threading.Thread(target=run, name=f"artifact-sweeper-{self.name}", daemon=True)
+        self._sweeper.start()
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "root": self.root,
+            "max_bytes": self.max_bytes,
+            "max_age_seconds": self.max_age,
+            **self._stats,
+        }
+
+
+def all_store_stats():
+    return [store.stats() for store in _stores.values()]
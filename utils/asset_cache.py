@@ -0,0 +1,51 @@
+import base64
+import os
+import threading
+from functools import lru_cache
+from io import BytesIO
+
+
+# ------------------ Pre-encoded static assets ------------------ #
+# Report footer / logo are read and base64-encoded once per worker and kept
+# in memory; a cheap os.stat on each use reloads them if the file changes.
+# QR codes are cached per payload.
+
+QR_CACHE_SIZE = int(os.getenv("QR_CACHE_SIZE", 2048))
+
+_assets = {}   # abs path -> (mtime, size, base64 str)
+_lock = threading.Lock()
+
+
+def encoded_asset(path):
+    """Return the file's contents as a base64 string, re-reading only when it changes."""
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    cached = _assets.get(path)
+    if cached and cached[0] == st.st_mtime and cached[1] == st.st_size:
+        return cached[2]
+
+    with open(path, "rb") as f:
+        encoded = base64.b64encode(f.read()).decode()
+    with _lock:
+        _assets[path] = (st.st_mtime, st.st_size, encoded)
+    return encoded
+
+
+def asset_data_url(path, mime):
+    return f"data:{mime};base64,{encoded_asset(path)}"
+
+
+def preload_assets(paths):
+    """Warm the cache at startup; missing files are skipped."""
+    for path in paths:
+        if os.path.isfile(path):
+            encoded_asset(path)
+
+
+@lru_cache(maxsize=QR_CACHE_SIZE)
+def qr_data_url(payload):
+    import qrcode
+
+    buf = BytesIO()
+    qrcode.make(payload).save(buf, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode()
@@ -0,0 +1,46 @@
+def _placeholders(values):
+    return ",".join(["%s"] * len(values))
+
+
+def load_children(cursor, query, key_column, keys, params=()):
+    """
+    Run a child-row query once for all parent keys and group the rows by key.
+
+    `query` must contain a single `{ids}` marker inside an `IN (...)` clause and
+    select `key_column` so rows can be grouped, e.g.
+
+        SELECT pt.counter_id, tp.test_name ... WHERE pt.counter_id IN ({ids})
+
+    Extra `params` are bound before the key list. Returns {key: [rows]}; the
+    key column is removed from the grouped rows.
+    """
+    keys = list(dict.fromkeys(k for k in keys if k is not None))
+    if not keys:
+        return {}
+
+    cursor.execute(query.format(ids=_placeholders(keys)), list(params) + keys)
+
+    grouped = {}
+    for row in cursor.fetchall():
+        grouped.setdefault(row.pop(key_column), []).append(row)
+    return grouped
+
+
+def attach_children(parents, parent_key, field, grouped):
+    """Attach grouped child rows to each parent under `field` (empty list if none)."""
+    for parent in parents:
+        parent[field] = grouped.get(parent[parent_key], [])
+    return parents
+
+
+def load_by_ids(cursor, query, key_column, keys, params=()):
+    """
+    Same as load_children but for one-to-one lookups: returns {key: row}.
+    The key column is kept in the row.
+    """
+    keys = list(dict.fromkeys(k for k in keys if k is not None))
+    if not keys:
+        return {}
+
+    cursor.execute(query.format(ids=_placeholders(keys)), list(params) + keys)
+    return {row[key_column]: row for row in cursor.fetchall()}
@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+from flask import current_app
+from MySQLdb.cursors import DictCursor
+from utils.table_versions import bump_tables, table_versions
+
+
+# ------------------ Test catalogue cache ------------------ #
+# test_profiles, parameters, departments, interpretations and test_packages
+# change rarely but are read on almost every request. Each worker keeps one
+# in-memory snapshot, rebuilt only when one of the tables' versions
+# (utils/table_versions.py) moved. CRUD endpoints call invalidate_catalogue()
+# after commit, which bumps the version for every worker on the host.
+# Versions are host-local: edits made elsewhere (another app host, a
+# migration, manual SQL) are not seen as a version change, so a snapshot is
+# also rebuilt once it is CATALOGUE_MAX_AGE seconds old.
+
+CATALOGUE_TABLES = ("test_profiles", "parameters", "departments", "interpretations", "test_packages")
+CATALOGUE_MAX_AGE = float(os.getenv("CATALOGUE_MAX_AGE", 300))
+
+
+def _int_key(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class Catalogue:
+    """Immutable snapshot: dicts keyed by id, parameters grouped by test."""
+
+    __slots__ = ("version", "loaded_at", "tests", "parameters", "parameters_by_test",
+                 "departments", "interpretations", "packages")
+
+    def __init__(self, version, tests, parameters, departments, interpretations, packages):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.tests = {row["id"]: row for row in tests}
+        self.parameters = {row["id"]: row for row in parameters}
+        self.parameters_by_test = {}
+        for row in parameters:
+            self.parameters_by_test.setdefault(row["test_profile_id"], []).append(row)
+        self.departments = {row["id"]: row for row in departments}
+        self.interpretations = {row["id"]: row for row in interpretations}
+        self.packages = {row["id"]: row for row in packages}
+
+    def test(self, test_id):
+        return self.tests.get(_int_key(test_id))
+
+    def test_name(self, test_id):
+        test = self.test(test_id)
+        return test["test_name"] if test else None
+
+    def interpretation_detail(self, test_id):
+        """Interpretation text linked to a test, '' if none."""
+        test = self.test(test_id) or {}
+        interpretation = self.interpretations.get(_int_key(test.get("interpretation")))
+        return interpretation["detail"] if interpretation else ""
+
+    def department_name(self, test_id):
+        test = self.test(test_id) or {}
+        department = self.departments.get(_int_key(test.get("department_id")))
+        return department["department_name"] if department else None
+
+    def test_parameters(self, test_id):
+        return self.parameters_by_test.get(_int_key(test_id), [])
+
+    def package_test_ids(self, package_id):
+        package = self.packages.get(_int_key(package_id))
+        if not package:
+            return None
+        return sorted({int(t.strip()) for t in (package.get("selected_test") or "").split(",") if t.strip().isdigit()})
+
+
+_catalogue = None
+_lock = threading.Lock()
+
+
+def load_catalogue(cursor, version):
+    tables = {}
+    for table in CATALOGUE_TABLES:
+        cursor.execute(f"SELECT * FROM {table} ORDER BY id")
+        tables[table] = cursor.fetchall()
+    return Catalogue(
+        version,
+        tests=tables["test_profiles"],
+        parameters=tables["parameters"],
+        departments=tables["departments"],
+        interpretations=tables["interpretations"],
+        packages=tables["test_packages"],
+    )
+
+
+def _is_current(catalogue, version):
+    return (
+        catalogue is not None
+        and catalogue.version == version
+        and time.monotonic() - catalogue.loaded_at < CATALOGUE_MAX_AGE
+    )
+
+
+def get_catalogue():
+    """Return the current snapshot, reloading it if any catalogue table changed or it got too old."""
+    global _catalogue
+    # read the version before the rows: a write landing mid-load leaves the
+    # snapshot tagged with the older version, so the next call reloads again
+    version = table_versions(*CATALOGUE_TABLES)
+    catalogue = _catalogue
+    if _is_current(catalogue, version):
+        return catalogue
+    with _lock:
+        if not _is_current(_catalogue, version):
+            cursor = current_app.mysql.connection.cursor(DictCursor)
+            try:
+                _catalogue = load_catalogue(cursor, version)
+            finally:
+                cursor.close()
+        return _catalogue
+
+
+def invalidate_catalogue(*tables):
+    """Bump the changed catalogue tables (all of them by default); call after commit."""
+    bump_tables(*(tables or CATALOGUE_TABLES))
+
@@ -0,0 +1,131 @@
+import os
+import zlib
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+
+# ------------------ Response compression ------------------ #
+# Large JSON listings (patient entries with nested tests, logs, vouchers,
+# stock reports) compress 5-10x. Every text response is compressed with
+# brotli or gzip, whichever the client accepts (brotli preferred):
+# - buffered responses smaller than COMPRESS_MIN_SIZE bytes are left alone
+# - streamed responses (CSV / XLSX exports) are compressed chunk by chunk and
+#   flushed after every chunk, so the download still starts immediately
+# - already compressed types (PDF, zip, xlsx, images) and file responses are
+#   never touched
+# A route can opt out with @no_compress.
+
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))
+COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", 6))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", 4))
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+def no_compress(view):
+    """Serve this route uncompressed. Put it below @token_required (functools.wraps keeps the flag)."""
+    view.no_compress = True
+    return view
+
+
+def _is_compressible(mimetype):
+    return bool(mimetype) and (mimetype.startswith("text/") or mimetype in COMPRESSIBLE_TYPES)
+
+
+def choose_encoding():
+    """'br', 'gzip' or None, by the client's Accept-Encoding."""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    def __init__(self, encoding):
+        self.encoding = encoding
+        if encoding == "br":
+            self._c = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            # wbits 31 = gzip container
+            self._c = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._c.process(data) if self.encoding == "br" else self._c.compress(data)
+
+    def flush(self):
+        return self._c.flush() if self.encoding == "br" else self._c.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._c.finish() if self.encoding == "br" else self._c.flush(zlib.Z_FINISH)
+
+
+def compress_bytes(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    compressor = _Compressor(encoding)
+    return compressor.compress(data) + compressor.finish()
+
+
+def _compress_stream(chunks, encoding):
+    compressor = _Compressor(encoding)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            data = compressor.compress(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def compress_response(response):
+    """after_request hook: compress the response body when it is worth it."""
+    if (
+        request.method == "HEAD"
+        or response.status_code < 200
+        or response.status_code in (204, 206, 304)
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or not _is_compressible(response.mimetype)
+    ):
+        return response
+
+    view = current_app.view_functions.get(request.endpoint)
+    if getattr(view, "no_compress", False):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = choose_encoding()
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, encoding)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return response
+        response.set_data(compress_bytes(data, encoding))
+
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def init_compression(app):
+    app.after_request(compress_response)
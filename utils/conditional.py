@@ -0,0 +1,48 @@
+import hashlib
+from functools import wraps
+from flask import current_app, request
+from utils.table_versions import table_versions
+
+
+# ------------------ Conditional GET (ETag / If-None-Match) ------------------ #
+# The ETag of a lookup endpoint is derived from the change counters of the
+# tables it reads (utils/table_versions.py) plus the request path, so it is
+# known before the view runs. A client sending the current ETag back gets a
+# 304 without a MySQL query. Write endpoints of those tables must call
+# bump_tables() after commit, otherwise clients keep their old copy.
+#
+#   @users_bp.route('/doctors/', methods=['GET'])
+#   @token_required
+#   @conditional_get("users")
+#   def get_doctors_only(): ...
+
+# per-user data behind a token: browsers may keep it but must revalidate
+CACHE_CONTROL = "private, no-cache"
+
+
+def resource_etag(tables, versions):
+    key = f"{request.full_path}|{','.join(tables)}|{versions}"
+    return hashlib.sha1(key.encode()).hexdigest()[:20]
+
+
+def conditional_get(*tables):
+    """Answer If-None-Match with 304 and tag 200 responses with a weak ETag."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # versions are read before the view: a write racing with it only
+            # makes the next request miss, never serves new data as old
+            etag = resource_etag(tables, table_versions(*tables))
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+                response.set_etag(etag, weak=True)
+                response.headers["Cache-Control"] = CACHE_CONTROL
+                return response
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag, weak=True)
+                response.headers["Cache-Control"] = CACHE_CONTROL
+            return response
+        return wrapper
+    return decorator
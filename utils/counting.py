@@ -0,0 +1,65 @@
+import math
+import os
+from flask import request
+from utils.cache import TTLCache
+
+
+# ------------------ Total-count service for paginated listings ------------------ #
+# Request switches (all optional):
+#   include_total=false  -> skip counting, totalRecords / totalPages are null
+#   approx_total=true    -> use table statistics when the listing is unfiltered
+# Exact counts are cached per (query, params) for COUNT_CACHE_TTL seconds.
+
+COUNT_CACHE_TTL = int(os.getenv("COUNT_CACHE_TTL", 15))
+_count_cache = TTLCache(max_size=2048, ttl=COUNT_CACHE_TTL)
+
+FALSE_VALUES = ("0", "false", "no", "off")
+TRUE_VALUES = ("1", "true", "yes", "on")
+
+
+def _flag(name, default):
+    value = request.args.get(name)
+    if value is None:
+        return default
+    value = value.strip().lower()
+    if value in FALSE_VALUES:
+        return False
+    if value in TRUE_VALUES:
+        return True
+    return default
+
+
+def count_total(cursor, count_query, params=(), table=None):
+    """
+    Return the total row count for a listing, or None when the client asked
+    for include_total=false.
+
+    `count_query` must return one row with a `total` column. Pass `table` only
+    when the listing has no user filters; it enables approx_total mode.
+    """
+    if not _flag("include_total", True):
+        return None
+
+    if table and _flag("approx_total", False):
+        cursor.execute("""
+            SELECT TABLE_ROWS AS total
+            FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """, (table,))
+        row = cursor.fetchone()
+        if row and row["total"] is not None:
+            return int(row["total"])
+
+    key = (" ".join(count_query.split()), tuple(params))
+    total = _count_cache.get(key)
+    if total is None:
+        cursor.execute(count_query, params)
+        total = cursor.fetchone()["total"] or 0
+        _count_cache.set(key, total)
+    return total
+
+
+def total_pages(total_records, record_per_page):
+    if total_records is None:
+        return None
+    return math.ceil(total_records / record_per_page)
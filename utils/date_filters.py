@@ -0,0 +1,45 @@
+from datetime import date, datetime, timedelta
+
+
+# ------------------ Sargable date range filters ------------------ #
+# from_date / to_date (YYYY-MM-DD, both inclusive) become a half-open range on
+# the raw column:  col >= from_date AND col < to_date + 1 day
+# instead of DATE(col) BETWEEN ..., so MySQL can range-scan an index on col.
+# Works the same for DATE and DATETIME columns.
+
+class InvalidDate(ValueError):
+    """A from_date / to_date that is not YYYY-MM-DD; endpoints answer it with 400."""
+
+
+def parse_date(value):
+    """Accept a date, datetime or 'YYYY-MM-DD[ ...]' string; raise InvalidDate otherwise."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(str(value).strip()[:10], "%Y-%m-%d").date()
+    except ValueError:
+        raise InvalidDate(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+
+def date_range(column, from_date=None, to_date=None):
+    """
+    Return (conditions, params) for `column` between from_date and to_date,
+    either bound optional. Append them to an endpoint's filters / params lists.
+    """
+    conditions, params = [], []
+    if from_date:
+        conditions.append(f"{column} >= %s")
+        params.append(parse_date(from_date))
+    if to_date:
+        conditions.append(f"{column} < %s")
+        params.append(parse_date(to_date) + timedelta(days=1))
+    return conditions, params
+
+
+def date_range_sql(column, from_date=None, to_date=None):
+    """Same as date_range() as an ' AND ...' fragment for string-built queries."""
+    conditions, params = date_range(column, from_date, to_date)
+    sql = "".join(f" AND {c}" for c in conditions)
+    return sql, params
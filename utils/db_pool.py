@@ -0,0 +1,241 @@
+import os
+import threading
+import time
+import MySQLdb
+from flask import current_app, g
+from werkzeug.local import LocalProxy
+
+
+# ------------------ Pooled MySQL connections ------------------ #
+# Drop-in replacement for flask_mysqldb.MySQL: `current_app.mysql.connection`
+# still returns one connection per app context, but it is checked out of a
+# fixed size pool and handed back on teardown instead of being opened and
+# closed for every request.
+#
+# - one pool per process (a pool inherited through fork is discarded)
+# - a connection idle for more than MYSQL_POOL_PING_IDLE seconds is pinged
+#   on checkout and replaced if the server dropped it
+# - connections older than MYSQL_POOL_MAX_LIFETIME are closed and reopened
+# - checkout waits up to MYSQL_POOL_TIMEOUT seconds when every connection is
+#   busy; wait time and exhaustion are counted in stats()
+#
+# Config (app.config or env): MYSQL_POOL_SIZE, MYSQL_POOL_TIMEOUT,
+# MYSQL_POOL_MAX_LIFETIME, MYSQL_POOL_PING_IDLE.
+
+
+class PoolExhausted(Exception):
+    """No connection became free within the checkout timeout."""
+
+
+class _PooledConnection:
+    __slots__ = ("conn", "created_at", "last_used")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = self.last_used = time.monotonic()
+
+
+class ConnectionPool:
+    def __init__(self, connect_kwargs, size=10, timeout=10.0, max_lifetime=3600.0, ping_idle=5.0):
+        self.connect_kwargs = connect_kwargs
+        self.size = size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.ping_idle = ping_idle
+
+        self._idle = []         # LIFO: the most recently used connection is the warmest
+        self._open = 0          # idle + checked out
+        self._cond = threading.Condition()
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "exhausted": 0,
+            "connects": 0,
+            "recycled": 0,
+            "dead": 0,
+        }
+
+    # ---------- checkout / checkin ----------
+    def checkout(self):
+        start = time.monotonic()
+        deadline = start + self.timeout
+        waited = False
+        with self._cond:
+            while True:
+                if self._idle:
+                    item = self._idle.pop()
+                    break
+                if self._open < self.size:
+                    self._open += 1
+                    item = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["exhausted"] += 1
+                    raise PoolExhausted(f"no MySQL connection free after {self.timeout}s (pool size {self.size})")
+                waited = True
+                self._cond.wait(remaining)
+
+            waited_for = time.monotonic() - start
+            self._stats["checkouts"] += 1
+            if waited:
+                self._stats["waits"] += 1
+                self._stats["wait_seconds_total"] += waited_for
+                self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], waited_for)
+
+        try:
+            return self._ready(item)
+        except Exception:
+            self._release_slot()
+            raise
+
+    def checkin(self, item, discard=False):
+        if not discard:
+            try:
+                # end whatever the request left open, like closing the connection did
+                item.conn.rollback()
+            except MySQLdb.Error:
+                discard = True
+        if discard:
+            self._close(item)
+            self._release_slot()
+            return
+        item.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(item)
+            self._cond.notify()
+
+    # ---------- helpers ----------
+    def _ready(self, item):
+        """Return a usable connection for a checked-out slot (item None = open a new one)."""
+        now = time.monotonic()
+        if item is not None and now - item.created_at > self.max_lifetime:
+            self._close(item)
+            self._count("recycled")
+            item = None
+        if item is not None and now - item.last_used > self.ping_idle:
+            try:
+                item.conn.ping()
+            except MySQLdb.Error:
+                self._close(item)
+                self._count("dead")
+                item = None
+        if item is None:
+            item = _PooledConnection(MySQLdb.connect(**self.connect_kwargs))
+            self._count("connects")
+        return item
+
+    def _release_slot(self):
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    def _count(self, key):
+        with self._cond:
+            self._stats[key] += 1
+
+    @staticmethod
+    def _close(item):
+        try:
+            item.conn.close()
+        except MySQLdb.Error:
+            pass
+
+    def close_idle(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for item in idle:
+            self._close(item)
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "size": self.size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._open - len(self._idle),
+            })
+        checkouts = stats["checkouts"]
+        stats["wait_seconds_avg"] = stats["wait_seconds_total"] / checkouts if checkouts else 0.0
+        return stats
+
+
+def _setting(app, name, default, cast):
+    return cast(app.config.get(name, os.getenv(name, default)))
+
+
+class PooledMySQL:
+    """Same surface as flask_mysqldb.MySQL (`init_app`, `.connection`), backed by a pool."""
+
+    def __init__(self, app=None):
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("MYSQL_HOST", "localhost")
+        app.config.setdefault("MYSQL_USER", None)
+        app.config.setdefault("MYSQL_PASSWORD", None)
+        app.config.setdefault("MYSQL_DB", None)
+        app.config.setdefault("MYSQL_PORT", 3306)
+        app.config.setdefault("MYSQL_CHARSET", "utf8")
+        app.config.setdefault("MYSQL_CONNECT_TIMEOUT", 10)
+        app.teardown_appcontext(self.teardown)
+
+    def connect_kwargs(self, app):
+        kwargs = {
+            "host": app.config["MYSQL_HOST"],
+            "port": app.config["MYSQL_PORT"],
+            "charset": app.config["MYSQL_CHARSET"],
+            "connect_timeout": app.config["MYSQL_CONNECT_TIMEOUT"],
+        }
+        if app.config["MYSQL_USER"]:
+            kwargs["user"] = app.config["MYSQL_USER"]
+        if app.config["MYSQL_PASSWORD"]:
+            kwargs["passwd"] = app.config["MYSQL_PASSWORD"]
+        if app.config["MYSQL_DB"]:
+            kwargs["db"] = app.config["MYSQL_DB"]
+        return kwargs
+
+    @property
+    def pool(self):
+        with self._lock:
+            # a pool inherited through fork shares sockets with the parent, start a new one
+            if self._pool is None or self._pool_pid != os.getpid():
+                app = current_app._get_current_object()
+                self._pool = ConnectionPool(
+                    self.connect_kwargs(app),
+                    size=_setting(app, "MYSQL_POOL_SIZE", 10, int),
+                    timeout=_setting(app, "MYSQL_POOL_TIMEOUT", 10, float),
+                    max_lifetime=_setting(app, "MYSQL_POOL_MAX_LIFETIME", 3600, float),
+                    ping_idle=_setting(app, "MYSQL_POOL_PING_IDLE", 5, float),
+                )
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    @property
+    def connection(self):
+        item = g.get("_mysql_pooled")
+        if item is None:
+            item = g._mysql_pooled = self.pool.checkout()
+        return item.conn
+
+    def teardown(self, exception):
+        item = g.pop("_mysql_pooled", None)
+        if item is not None:
+            self.pool.checkin(item)
+
+    def stats(self):
+        return self._pool.stats() if self._pool is not None and self._pool_pid == os.getpid() else None
+
+
+# Module-level handle for blueprints: `from utils.db_pool import mysql`
+# then `mysql.connection` resolves to the app's pooled connection.
+mysql = LocalProxy(lambda: current_app.mysql)
@@ -0,0 +1,184 @@
+from MySQLdb.cursors import DictCursor
+
+
+# ------------------ EXPLAIN regression check ------------------ #
+# Runs EXPLAIN on the hot queries in routes/ against a seeded local
+# MySQL / MariaDB and reports any table that would be read with a full scan.
+#   flask --app main db seed-explain     # scratch database only
+#   flask --app main db explain-check
+# Every table these queries read is a hot table, so any type=ALL read is a
+# failure. On a near-empty database the optimizer scans even when the index
+# exists; seed-explain inserts SEED_ROWS spread-out rows per table and runs
+# ANALYZE TABLE, so the indexes win wherever they are usable.
+
+SEED_ROWS = 20000
+
+HOT_QUERIES = [
+    {
+        "name": "report history (pdfreport.load_report_tests_many)",
+        "sql": """
+            SELECT pt.patient_id, pt.counter_id, pr.parameter_id, pr.result_value
+            FROM patient_tests pt
+            JOIN patient_results pr ON pr.counter_id = pt.counter_id
+            JOIN parameters p ON pr.parameter_id = p.id AND p.test_profile_id = pt.test_id
+            WHERE pt.counter_id <= %s AND pt.test_id IN (%s) AND pt.patient_id IN (%s)
+        """,
+        "params": (1000000, 1, 1),
+    },
+    {
+        "name": "tests of a counter",
+        "sql": "SELECT * FROM patient_tests WHERE counter_id = %s AND test_id = %s",
+        "params": (1, 1),
+    },
+    {
+        "name": "result lookup / upsert",
+        "sql": "SELECT * FROM patient_results WHERE counter_id = %s AND parameter_id = %s",
+        "params": (1, 1),
+    },
+    {
+        "name": "counters of a patient",
+        "sql": "SELECT * FROM counter WHERE pt_id = %s",
+        "params": (1,),
+    },
+    {
+        "name": "parameters of a test profile",
+        "sql": "SELECT * FROM parameters WHERE test_profile_id = %s",
+        "params": (1,),
+    },
+    {
+        "name": "ledger entries of an account head",
+        "sql": """
+            SELECT * FROM journal_voucher_entries
+            WHERE account_head_id = %s AND date >= %s AND date < %s
+        """,
+        "params": (1, "2024-01-01", "2024-02-01"),
+    },
+    {
+        "name": "entries of a voucher",
+        "sql": "SELECT * FROM journal_voucher_entries WHERE journal_voucher_id = %s",
+        "params": (1,),
+    },
+    {
+        "name": "module permission lookup",
+        "sql": "SELECT * FROM user_module_permissions WHERE userid = %s AND modulename = %s",
+        "params": (1, "patient_entry"),
+    },
+    {
+        "name": "counters by created_at range",
+        "sql": "SELECT id FROM counter WHERE created_at >= %s AND created_at < %s",
+        "params": ("2024-01-01", "2024-01-02"),
+    },
+    {
+        "name": "tests by verified_at range",
+        "sql": "SELECT id FROM patient_tests WHERE verified_at >= %s AND verified_at < %s",
+        "params": ("2024-01-01", "2024-01-02"),
+    },
+    {
+        "name": "cash by date range",
+        "sql": "SELECT * FROM cash WHERE date >= %s AND date < %s",
+        "params": ("2024-01-01", "2024-01-02"),
+    },
+]
+
+
+def explain(cursor, query):
+    cursor.execute("EXPLAIN " + query["sql"], query["params"])
+    return cursor.fetchall()
+
+
+def full_scans(rows):
+    """EXPLAIN rows that read their table with a full scan (type=ALL)."""
+    return [row for row in rows if (row.get("type") or "").upper() == "ALL"]
+
+
+def run_explain_checks(connection, queries=HOT_QUERIES, echo=print, verbose=False):
+    """EXPLAIN every query; returns [(query name, table)] that need a full scan."""
+    cursor = connection.cursor(DictCursor)
+    failed = []
+    try:
+        for query in queries:
+            rows = explain(cursor, query)
+            failures = full_scans(rows)
+
+            echo(f"{'FAIL' if failures else 'ok  '} {query['name']}")
+            for row in failures:
+                keys = row.get("possible_keys")
+                echo(f"     full scan on {row.get('table')} "
+                     + (f"(possible keys {keys} not chosen, is the database seeded?)" if keys else "(no usable index)"))
+                failed.append((query["name"], row.get("table")))
+            if verbose:
+                for row in rows:
+                    echo(f"     {row.get('table')}: type={row.get('type')} key={row.get('key')} rows={row.get('rows')}")
+    finally:
+        cursor.close()
+    return failed
+
+
+# ------------------ Seed data ------------------ #
+# Numbers 1..99999 without a helper table (works on MySQL 5.7 and MariaDB).
+_DIGITS = "(SELECT 0 d UNION ALL SELECT 1 UNION ALL SELECT 2 UNION ALL SELECT 3 UNION ALL SELECT 4 " \
+          "UNION ALL SELECT 5 UNION ALL SELECT 6 UNION ALL SELECT 7 UNION ALL SELECT 8 UNION ALL SELECT 9)"
+_NUMBERS = f"""
+    (SELECT a.d + 10 * b.d + 100 * c.d + 1000 * e.d + 10000 * f.d AS n
+     FROM {_DIGITS} a, {_DIGITS} b, {_DIGITS} c, {_DIGITS} e, {_DIGITS} f) seq
+"""
+
+# Only the columns the hot queries filter on plus the ones the routes always
+# set; ids are spread so the equality lookups in HOT_QUERIES hit a few rows.
+SEED_SQL = {
+    "counter": """
+        INSERT INTO counter (pt_id, total_fee, paid, discount, remarks, date_created, created_at)
+        SELECT 1 + n %% %(patients)s, 0, 0, 0, 'explain seed',
+            '2023-01-01' + INTERVAL n * 50 MINUTE, '2023-01-01' + INTERVAL n * 50 MINUTE
+        FROM {numbers} WHERE n BETWEEN 1 AND %(rows)s
+    """,
+    "patient_tests": """
+        INSERT INTO patient_tests (patient_id, counter_id, test_id, reporting_time, verified_at, created_at)
+        SELECT 1 + n %% %(patients)s, 1 + n DIV 3, 1 + n %% 200,
+            '2023-01-01' + INTERVAL n * 50 MINUTE, '2023-01-01' + INTERVAL n * 50 MINUTE,
+            '2023-01-01' + INTERVAL n * 50 MINUTE
+        FROM {numbers} WHERE n BETWEEN 1 AND %(rows)s
+    """,
+    "patient_results": """
+        INSERT INTO patient_results (patient_id, patient_test_id, test_profile_id, parameter_id, counter_id,
+            result_value, created_at)
+        SELECT 1 + n %% %(patients)s, n, 1 + n %% 200, n, 1 + n DIV 6, '1', NOW()
+        FROM {numbers} WHERE n BETWEEN 1 AND %(rows)s
+    """,
+    "parameters": """
+        INSERT INTO parameters (parameter_name, test_profile_id)
+        SELECT CONCAT('explain seed ', n), 1 + n %% 500
+        FROM {numbers} WHERE n BETWEEN 1 AND %(rows)s
+    """,
+    "journal_voucher_entries": """
+        INSERT INTO journal_voucher_entries (journal_voucher_id, account_head_id, dr, cr, type, date)
+        SELECT 1 + n DIV 2, 1 + n %% 300, 0, 0, 'JV', '2023-01-01' + INTERVAL n %% 730 DAY
+        FROM {numbers} WHERE n BETWEEN 1 AND %(rows)s
+    """,
+    "user_module_permissions": """
+        INSERT INTO user_module_permissions (userid, modulename)
+        SELECT 1 + n %% 500, CONCAT('explain_seed_', n DIV 500)
+        FROM {numbers} WHERE n BETWEEN 1 AND %(rows)s
+    """,
+    "cash": """
+        INSERT INTO cash (description, dr, date)
+        SELECT 'explain seed', 0, '2023-01-01' + INTERVAL n %% 730 DAY
+        FROM {numbers} WHERE n BETWEEN 1 AND %(rows)s
+    """,
+}
+
+
+def seed_explain_data(connection, rows=SEED_ROWS, echo=print):
+    """Insert `rows` synthetic rows into every hot table and refresh the index statistics."""
+    rows = max(1, min(int(rows), 99999))
+    params = {"rows": rows, "patients": max(1, rows // 4)}
+    cursor = connection.cursor()
+    try:
+        for table, sql in SEED_SQL.items():
+            cursor.execute(sql.format(numbers=_NUMBERS), params)
+            connection.commit()
+            cursor.execute(f"ANALYZE TABLE {table}")
+            cursor.fetchall()
+            echo(f"seeded {table}: {rows} rows")
+    finally:
+        cursor.close()
@@ -0,0 +1,187 @@
+import csv
+import io
+import os
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+from flask import Response, current_app, request, stream_with_context
+from MySQLdb.cursors import SSDictCursor
+
+
+# ------------------ Streaming CSV / XLSX export ------------------ #
+# `?export=csv` or `?export=xlsx` on a report endpoint skips pagination and
+# streams every matching row. Rows come from an unbuffered (server side)
+# cursor in chunks of EXPORT_CHUNK_ROWS and are written straight into the
+# response, so memory stays flat no matter how many rows are exported.
+
+EXPORT_FORMATS = ("csv", "xlsx")
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", 1000))
+
+MIMETYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def get_export_format():
+    """Return 'csv' / 'xlsx' when the request asks for an export, else None."""
+    fmt = (request.args.get("export") or "").lower().strip()
+    return fmt if fmt in EXPORT_FORMATS else None
+
+
+def export_query(fmt, name, query, params=()):
+    """
+    Run `query` on a server-side cursor and return a streaming download.
+    The query is executed before the response starts, so SQL errors still
+    reach the endpoint's own error handling.
+    """
+    cursor = current_app.mysql.connection.cursor(SSDictCursor)
+    try:
+        cursor.execute(query, params)
+    except Exception:
+        cursor.close()
+        raise
+    columns = [col[0] for col in cursor.description or ()]
+
+    def rows():
+        try:
+            while True:
+                chunk = cursor.fetchmany(EXPORT_CHUNK_ROWS)
+                if not chunk:
+                    break
+                yield from chunk
+        finally:
+            cursor.close()
+
+    body = write_csv(columns, rows()) if fmt == "csv" else write_xlsx(columns, rows())
+    filename = f"{name}_{date.today().isoformat()}.{fmt}"
+    return Response(
+        stream_with_context(body),
+        mimetype=MIMETYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _cell_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    return str(value)
+
+
+# ---------- CSV ----------
+def write_csv(columns, rows):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    # BOM so Excel opens the file as UTF-8
+    buf.write("\ufeff")
+    writer.writerow(columns)
+
+    for i, row in enumerate(rows, 1):
+        writer.writerow([_cell_text(row.get(c)) for c in columns])
+        if i % EXPORT_CHUNK_ROWS == 0:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue().encode("utf-8")
+
+
+# ---------- XLSX ----------
+# An .xlsx file is a zip of XML parts. zipfile can write to an unseekable
+# stream (sizes go into data descriptors), so the sheet is generated row by
+# row and the compressed bytes are drained after every chunk.
+
+_ILLEGAL_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Report" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+class _ChunkSink:
+    """Write-only file object that hands buffered bytes back to the generator."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _xlsx_cell(value):
+    if value is None:
+        return "<c/>"
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return f"<c><v>{value}</v></c>"
+    text = escape(_ILLEGAL_XML.sub("", _cell_text(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(values):
+    return "<row>" + "".join(_xlsx_cell(v) for v in values) + "</row>"
+
+
+def write_xlsx(columns, rows):
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _ROOT_RELS)
+        zf.writestr("xl/workbook.xml", _WORKBOOK)
+        zf.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+                + _xlsx_row(columns)
+            ).encode("utf-8"))
+
+            batch = []
+            for row in rows:
+                batch.append(_xlsx_row(row.get(c) for c in columns))
+                if len(batch) >= EXPORT_CHUNK_ROWS:
+                    sheet.write("".join(batch).encode("utf-8"))
+                    batch = []
+                    yield sink.drain()
+            sheet.write(("".join(batch) + "</sheetData></worksheet>").encode("utf-8"))
+        yield sink.drain()
+    yield sink.drain()
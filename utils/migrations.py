@@ -0,0 +1,148 @@
+import hashlib
+import os
+import re
+import click
+import MySQLdb
+from flask import current_app
+from flask.cli import AppGroup
+
+
+# ------------------ Versioned SQL migrations ------------------ #
+# db/migrations/NNNN_name.sql files are applied in order, once. Applied
+# versions are recorded in schema_migrations. Objects that already exist
+# (tables / indexes created by hand before the runner existed) are treated
+# as applied instead of failing the upgrade.
+#   flask --app main db status
+#   flask --app main db upgrade
+#   flask --app main db seed-explain   (scratch database only)
+#   flask --app main db explain-check
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "db", "migrations")
+FILENAME_RE = re.compile(r"^(\d+)_([\w-]+)\.sql$")
+
+# table exists, duplicate column, duplicate key name
+ALREADY_EXISTS = {1050, 1060, 1061}
+
+
+def migration_files(folder=MIGRATIONS_DIR):
+    """Return [(version, name, path)] sorted by version."""
+    found = []
+    for filename in os.listdir(folder):
+        match = FILENAME_RE.match(filename)
+        if match:
+            found.append((match.group(1), match.group(2), os.path.join(folder, filename)))
+    return sorted(found)
+
+
+def split_statements(sql):
+    """Split a migration file into statements (no ';' inside literals in our files)."""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    return [s.strip() for s in "\n".join(lines).split(";") if s.strip()]
+
+
+def _checksum(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def ensure_migrations_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version     VARCHAR(16)     NOT NULL PRIMARY KEY,
+            name        VARCHAR(255)    NOT NULL,
+            checksum    CHAR(64)        NOT NULL,
+            applied_at  DATETIME        NOT NULL
+        ) ENGINE=InnoDB
+    """)
+
+
+def applied_versions(cursor):
+    ensure_migrations_table(cursor)
+    cursor.execute("SELECT version, checksum FROM schema_migrations")
+    return {row[0]: row[1] for row in cursor.fetchall()}
+
+
+def apply_migration(connection, version, name, path, echo=print):
+    cursor = connection.cursor()
+    try:
+        with open(path) as f:
+            statements = split_statements(f.read())
+        for statement in statements:
+            try:
+                cursor.execute(statement)
+            except MySQLdb.Error as e:
+                if not e.args or e.args[0] not in ALREADY_EXISTS:
+                    raise
+                echo(f"  already present: {e.args[1]}")
+        cursor.execute(
+            "INSERT INTO schema_migrations (version, name, checksum, applied_at) VALUES (%s, %s, %s, NOW())",
+            (version, name, _checksum(path))
+        )
+        connection.commit()
+    finally:
+        cursor.close()
+
+
+def upgrade(connection, echo=print):
+    """Apply every pending migration; returns the versions applied."""
+    cursor = connection.cursor()
+    try:
+        applied = applied_versions(cursor)
+    finally:
+        cursor.close()
+
+    done = []
+    for version, name, path in migration_files():
+        if version in applied:
+            continue
+        echo(f"applying {version}_{name}")
+        apply_migration(connection, version, name, path, echo=echo)
+        done.append(version)
+    return done
+
+
+# ------------------ CLI ------------------ #
+db_cli = AppGroup("db", help="Schema migrations and index checks.")
+
+
+@db_cli.command("status")
+def status_command():
+    """List migrations and whether they are applied."""
+    cursor = current_app.mysql.connection.cursor()
+    try:
+        applied = applied_versions(cursor)
+    finally:
+        cursor.close()
+    for version, name, path in migration_files():
+        state = "applied" if version in applied else "pending"
+        if version in applied and applied[version] != _checksum(path):
+            state = "applied (file changed since)"
+        click.echo(f"{version}_{name}: {state}")
+
+
+@db_cli.command("upgrade")
+def upgrade_command():
+    """Apply pending migrations."""
+    done = upgrade(current_app.mysql.connection, echo=click.echo)
+    click.echo(f"{len(done)} migration(s) applied" if done else "schema is up to date")
+
+
+@db_cli.command("seed-explain")
+@click.option("--rows", default=None, type=int, help="Rows per hot table (default SEED_ROWS).")
+@click.confirmation_option(prompt="This inserts synthetic rows. Run it on a scratch database only. Continue?")
+def seed_explain_command(rows):
+    """Fill the hot tables with synthetic rows for explain-check."""
+    from utils.explain_check import seed_explain_data, SEED_ROWS
+
+    seed_explain_data(current_app.mysql.connection, rows=rows or SEED_ROWS, echo=click.echo)
+
+
+@db_cli.command("explain-check")
+@click.option("--verbose", is_flag=True, help="Print the EXPLAIN rows of every query.")
+def explain_check_command(verbose):
+    """EXPLAIN the hot queries and fail if any of them needs a full table scan."""
+    from utils.explain_check import run_explain_checks
+
+    failures = run_explain_checks(current_app.mysql.connection, echo=click.echo, verbose=verbose)
+    if failures:
+        raise SystemExit(1)
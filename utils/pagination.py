@@ -0,0 +1,74 @@
+import base64
+import json
+from flask import request
+
+
+# ------------------ Keyset (cursor) pagination ------------------ #
+# Opt-in alternative to currentpage/recordperpage (LIMIT/OFFSET).
+# Client sends `after_id` (older rows) or `before_id` (newer rows); an empty
+# value starts from the newest row. Values can be a raw id or the opaque
+# nextCursor / prevCursor token returned by the previous page.
+
+def encode_cursor(row_id):
+    raw = json.dumps({"id": row_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    if token is None or str(token).strip() == "":
+        return None
+    token = str(token).strip()
+    if token.isdigit():
+        return int(token)
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded))["id"])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid pagination cursor")
+
+
+def get_cursor_args():
+    """
+    Return (direction, cursor_id) where direction is 'after' / 'before',
+    or (None, None) when the request uses classic page numbers.
+    """
+    if "before_id" in request.args:
+        cursor_id = decode_cursor(request.args.get("before_id"))
+        # empty before_id has nothing newer to seek to -> start from the top
+        return ("before", cursor_id) if cursor_id is not None else ("after", None)
+    if "after_id" in request.args:
+        return "after", decode_cursor(request.args.get("after_id"))
+    return None, None
+
+
+def keyset_clause(column, direction, cursor_id):
+    """
+    Build the seek condition and ORDER BY for `column` (the primary key).
+    Returns (condition or None, params, order_by). Listing order is always
+    newest first; 'before' pages are fetched ascending and flipped afterwards.
+    """
+    if direction == "before":
+        return f"{column} > %s", [cursor_id], f"ORDER BY {column} ASC"
+    if cursor_id is None:
+        return None, [], f"ORDER BY {column} DESC"
+    return f"{column} < %s", [cursor_id], f"ORDER BY {column} DESC"
+
+
+def keyset_page(rows, id_key, direction, cursor_id, limit):
+    """
+    Trim the `limit + 1` rows fetched by a keyset query and build cursors.
+    Returns (rows, next_cursor, prev_cursor).
+    """
+    rows = list(rows)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if direction == "before":
+        rows.reverse()
+        has_newer, has_older = has_more, True
+    else:
+        has_newer, has_older = cursor_id is not None, has_more
+
+    next_cursor = encode_cursor(rows[-1][id_key]) if rows and has_older else None
+    prev_cursor = encode_cursor(rows[0][id_key]) if rows and has_newer else None
+    return rows, next_cursor, prev_cursor
@@ -0,0 +1,58 @@
+import hashlib
+import json
+from utils.artifact_store import ArtifactStore
+
+
+# ------------------ Content-addressed lab report cache ------------------ #
+# A rendered report is stored as report_<counter_id>_<hash>.pdf where the hash
+# covers every input that changes the printed output. An unchanged reprint
+# finds the file and skips rendering. Result, verification and comment writes
+# call invalidate_counter_reports() so stale files don't pile up.
+
+REPORT_FOLDER = 'generated_reports'
+report_store = ArtifactStore("reports", REPORT_FOLDER)
+RENDER_VERSION = "2"   # bump when the report layout changes
+
+# merged PDFs / zips produced by the batch print endpoint
+BATCH_FOLDER = 'generated_batches'
+batch_store = ArtifactStore("report_batches", BATCH_FOLDER)
+
+
+def report_cache_key(counter_id, test_ids, patient, counter, test_list, show_header_footer, show_graph):
+    payload = {
+        "v": RENDER_VERSION,
+        "counter_id": counter_id,
+        "test_ids": sorted(str(t) for t in test_ids),
+        "patient": patient,
+        "counter": counter,
+        "tests": test_list,
+        "show_header_footer": bool(show_header_footer),
+        "graph": bool(show_graph),
+    }
+    raw = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha256(raw).hexdigest()[:24]
+
+
+def report_filename(counter_id, cache_key):
+    return f"report_{counter_id}_{cache_key}.pdf"
+
+
+def cached_report(counter_id, cache_key):
+    """Return the filename if this exact report was already rendered, else None."""
+    filename = report_filename(counter_id, cache_key)
+    path = report_store.find(filename)
+    if path:
+        report_store.touch(path)
+        return filename
+    return None
+
+
+def invalidate_counter_reports(counter_id):
+    """Delete every cached report rendered for a counter."""
+    return report_store.remove_owner(f"report_{int(counter_id)}")
+
+
+def batch_filename(report_files, fmt):
+    """Name a bundle after the exact reports it contains, so a repeat batch is reused."""
+    digest = hashlib.sha256("\n".join(report_files).encode()).hexdigest()[:24]
+    return f"batch_{len(report_files)}_{digest}.{fmt}"
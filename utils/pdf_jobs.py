@@ -0,0 +1,319 @@
+import multiprocessing
+import os
+import re
+import threading
+import time
+from uuid import uuid4
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from utils.cache import TTLCache
+
+
+# ------------------ Background PDF rendering ------------------ #
+# xhtml2pdf is CPU bound, so HTML -> PDF runs in a process pool instead of the
+# request thread. A job id is "<kind>.<file stem>" (e.g. report.report_12_1700000000)
+# which lets any worker answer a status request by looking at the output
+# store, even if the job was submitted to another worker process:
+#   <pdf>.queued  submitted, not finished (removed when the render ends)
+#   <pdf>.error   render failed
+#   <pdf>         done
+# A .queued marker older than PDF_JOB_STALE seconds belongs to a worker that
+# died mid-render and is reported as failed. A render child that dies (OOM,
+# segfault) breaks the pool: its jobs are marked failed and the next submit
+# starts a new pool.
+#
+# Bundles (merged PDF / zip of other jobs' files) are jobs too: a thread of
+# the submitting worker waits for the parts against one deadline
+# (PDF_BATCH_TIMEOUT), then bundles whatever rendered.
+
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", 2))
+PDF_RENDER_TIMEOUT = float(os.getenv("PDF_RENDER_TIMEOUT", 20))
+PDF_JOB_STALE = float(os.getenv("PDF_JOB_STALE", 600))
+PDF_BATCH_TIMEOUT = float(os.getenv("PDF_BATCH_TIMEOUT", 300))
+
+JOB_ID_RE = re.compile(r"^([a-z_]+)\.([A-Za-z0-9_-]+)$")
+
+_outputs = {}           # kind -> (ArtifactStore, file endpoint, extension)
+_futures = TTLCache(max_size=2000, ttl=3600)
+_executor = None
+_executor_pid = None
+_bundler = None
+_bundler_pid = None
+_lock = threading.Lock()
+_submit_lock = threading.Lock()
+
+
+def register_output(kind, store, file_endpoint, ext="pdf"):
+    """Register the ArtifactStore files of `kind` go to and which endpoint serves them."""
+    _outputs[kind] = (store, file_endpoint, ext)
+
+
+def _get_executor(reset=False):
+    global _executor, _executor_pid
+    with _lock:
+        # a pool inherited through fork belongs to the parent, start a new one
+        if reset or _executor is None or _executor_pid != os.getpid():
+            if reset and _executor is not None and _executor_pid == os.getpid():
+                _executor.shutdown(wait=False)
+            _executor = ProcessPoolExecutor(
+                max_workers=PDF_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _get_bundler(reset=False):
+    global _bundler, _bundler_pid
+    with _lock:
+        if reset or _bundler is None or _bundler_pid != os.getpid():
+            _bundler = ThreadPoolExecutor(max_workers=PDF_WORKERS, thread_name_prefix="pdf-bundle")
+            _bundler_pid = os.getpid()
+        return _bundler
+
+
+def _tmp_path(path):
+    # unique per render, so two renders of the same file never share a temp file
+    return f"{path}.{os.getpid()}.{uuid4().hex}.part"
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _mark_failed(path, message="PDF generation failed"):
+    # other workers only see the files: turn the queued marker into an error
+    with open(path + ".error", "w") as f:
+        f.write(message)
+    _remove(path + ".queued")
+
+
+def render_pdf_file(html, pdf_path):
+    """Runs in a pool process: render HTML into pdf_path atomically."""
+    from xhtml2pdf import pisa
+
+    tmp_path = _tmp_path(pdf_path)
+    try:
+        with open(tmp_path, "wb") as f:
+            status = pisa.CreatePDF(html, dest=f)
+        if status.err:
+            raise RuntimeError("PDF generation failed")
+        os.replace(tmp_path, pdf_path)
+    except Exception:
+        _remove(tmp_path)
+        _mark_failed(pdf_path)
+        raise
+    finally:
+        _remove(pdf_path + ".queued")
+    return pdf_path
+
+
+def bundle_pdf_files(files, out_path, fmt="pdf"):
+    """
+    Combine rendered PDFs into one file: a merged PDF (fmt="pdf") or a zip.
+    `files` is a list of (archive name, path). Written atomically like renders.
+    """
+    tmp_path = _tmp_path(out_path)
+    try:
+        if fmt == "zip":
+            import zipfile
+            # PDFs are already compressed, storing them keeps bundling cheap
+            with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_STORED) as zf:
+                for name, path in files:
+                    zf.write(path, arcname=name)
+        else:
+            from pypdf import PdfWriter
+            writer = PdfWriter()
+            for _, path in files:
+                writer.append(path)
+            with open(tmp_path, "wb") as f:
+                writer.write(f)
+            writer.close()
+        os.replace(tmp_path, out_path)
+    except Exception:
+        _remove(tmp_path)
+        raise
+    return out_path
+
+
+def _mark_queued(pdf_path):
+    # a failed earlier attempt must not shadow the new one
+    _remove(pdf_path + ".error")
+    with open(pdf_path + ".queued", "w") as f:
+        f.write(str(os.getpid()))
+
+
+def job_id_for(kind, filename):
+    return f"{kind}.{os.path.splitext(filename)[0]}"
+
+
+def inflight_job(kind, filename):
+    """Job id of a render of `filename` still running here or in another worker, else None."""
+    store = _outputs[kind][0]
+    job_id = job_id_for(kind, filename)
+    future = _futures.get(job_id)
+    if future is not None and not future.done():
+        return job_id
+    try:
+        queued_for = time.time() - os.path.getmtime(store.path_for(filename) + ".queued")
+    except OSError:
+        return None
+    return job_id if queued_for <= PDF_JOB_STALE else None
+
+
+def _on_job_done(out_path):
+    def callback(future):
+        # a killed render child never reaches render_pdf_file's cleanup
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            _mark_failed(out_path, "PDF worker process died")
+    return callback
+
+
+def _submit(kind, filename, get_executor, fn, *args):
+    # fn(*args, out_path) runs on get_executor(); a job of the same file in flight is joined
+    store = _outputs[kind][0]
+    with _submit_lock:
+        job_id = inflight_job(kind, filename)
+        if job_id:
+            return job_id
+        out_path = store.path_for(filename, create=True)
+        job_id = job_id_for(kind, filename)
+        _mark_queued(out_path)
+        try:
+            try:
+                future = get_executor().submit(fn, *args, out_path)
+            except BrokenProcessPool:
+                # a child died earlier and took the pool with it: start a new one once
+                future = get_executor(reset=True).submit(fn, *args, out_path)
+        except Exception:
+            _mark_failed(out_path, "PDF job could not be queued")
+            raise
+        future.add_done_callback(_on_job_done(out_path))
+        _futures.set(job_id, future)
+    return job_id
+
+
+def submit_pdf(kind, html, filename):
+    """Queue a render and return its job id; joins a render of the same file already in flight."""
+    return _submit(kind, filename, _get_executor, render_pdf_file, html)
+
+
+def wait_for_jobs(job_ids, timeout):
+    """Wait for many jobs against one overall deadline; return {job_id: job_status}."""
+    deadline = time.time() + timeout
+    jobs, pending = {}, list(job_ids)
+    while pending:
+        for job_id in pending:
+            jobs[job_id] = job_status(job_id, wait=max(0, min(deadline - time.time(), 1)))
+        pending = [j for j in pending if jobs[j]["status"] == "pending"]
+        if pending:
+            if time.time() >= deadline:
+                break
+            # jobs of other workers are only visible through their files
+            time.sleep(0.2)
+    return jobs
+
+
+def _bundle_job(parts, fmt, timeout, out_path):
+    try:
+        jobs = wait_for_jobs([job_id for _, job_id in parts], timeout)
+        files = []
+        for name, job_id in parts:
+            job = jobs[job_id]
+            if job["status"] != "done":
+                continue
+            path = _outputs[job["kind"]][0].find(job["filename"])
+            if path:
+                files.append((name, path))
+        if not files:
+            raise RuntimeError("No file of the bundle could be rendered")
+        bundle_pdf_files(files, out_path, fmt)
+    except Exception:
+        _mark_failed(out_path, "Bundle failed")
+        raise
+    finally:
+        _remove(out_path + ".queued")
+    return out_path
+
+
+def submit_bundle(kind, parts, filename, fmt="pdf", timeout=None):
+    """
+    Queue a bundle of other jobs' files and return its job id. `parts` is a
+    list of (archive name, job id); parts still pending after `timeout`
+    (PDF_BATCH_TIMEOUT) seconds, or failed, are left out.
+    """
+    timeout = PDF_BATCH_TIMEOUT if timeout is None else timeout
+    return _submit(kind, filename, _get_bundler, _bundle_job, list(parts), fmt, timeout)
+
+
+def job_status(job_id, wait=0):
+    """
+    Return {"job_id", "status": pending|done|failed|unknown, "filename", "error"}.
+    `wait` blocks up to that many seconds for a job submitted by this worker.
+    """
+    match = JOB_ID_RE.match(job_id or "")
+    if not match or match.group(1) not in _outputs:
+        return {"job_id": job_id, "status": "unknown"}
+
+    kind, stem = match.groups()
+    store, _, ext = _outputs[kind]
+    filename = f"{stem}.{ext}"
+    pdf_path = store.path_for(filename)
+    result = {"job_id": job_id, "kind": kind, "filename": filename}
+
+    future = _futures.get(job_id)
+    if future is not None:
+        try:
+            future.result(timeout=wait or 0)
+        except FutureTimeout:
+            return {**result, "status": "pending"}
+        except BrokenProcessPool:
+            return {**result, "status": "failed", "error": "PDF worker process died"}
+        except Exception as e:
+            return {**result, "status": "failed", "error": str(e)}
+        return {**result, "status": "done"}
+
+    # job belongs to another worker (or this one restarted): look at the files
+    if os.path.exists(pdf_path):
+        return {**result, "status": "done"}
+    if os.path.exists(pdf_path + ".error"):
+        return {**result, "status": "failed", "error": "PDF generation failed"}
+    try:
+        queued_for = time.time() - os.path.getmtime(pdf_path + ".queued")
+    except OSError:
+        return {"job_id": job_id, "status": "unknown"}
+    if queued_for > PDF_JOB_STALE:
+        return {**result, "status": "failed", "error": "PDF job was lost"}
+    return {**result, "status": "pending"}
+
+
+def file_endpoint(kind):
+    return _outputs[kind][1]
+
+
+def pdf_job_response(kind, html, filename, run_async=False):
+    """
+    Submit a render and build the endpoint response. Synchronous callers wait
+    up to PDF_RENDER_TIMEOUT and get the usual pdf_url; async callers (or a
+    render that outlives the timeout) get 202 with a job id to poll.
+    """
+    return job_response(submit_pdf(kind, html, filename), run_async=run_async)
+
+
+def job_response(job_id, run_async=False):
+    """Endpoint response for a job already submitted (see pdf_job_response)."""
+    from flask import jsonify, url_for
+
+    job = job_status(job_id, wait=0 if run_async else PDF_RENDER_TIMEOUT)
+
+    if job["status"] == "done":
+        pdf_url = url_for(file_endpoint(job["kind"]), filename=job["filename"], _external=True)
+        return jsonify({"status": 200, "pdf_url": pdf_url}), 200
+    if job["status"] == "failed":
+        return jsonify({"status": 500, "error": job.get("error") or "PDF generation failed"}), 500
+
+    status_url = url_for("pdf_jobs.get_pdf_job", job_id=job_id, _external=True)
+    return jsonify({"status": 202, "job_id": job_id, "status_url": status_url}), 202
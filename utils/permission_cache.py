@@ -0,0 +1,59 @@
+import os
+from flask import current_app
+from MySQLdb.cursors import DictCursor
+from utils.cache import TTLCache
+
+
+# ------------------ In-process permission cache ------------------ #
+# role_required and login used to hit user_module_permissions on every call.
+# Entries expire after PERMISSION_CACHE_TTL seconds; every endpoint that
+# writes permissions must call invalidate_permissions() after commit.
+
+PERMISSION_CACHE_TTL = int(os.getenv("PERMISSION_CACHE_TTL", 60))
+
+_module_permissions = TTLCache(max_size=4096, ttl=PERMISSION_CACHE_TTL)
+_role_permissions = TTLCache(max_size=256, ttl=PERMISSION_CACHE_TTL)
+
+_MISSING = object()
+
+
+def get_module_permission(userid, module_name):
+    """
+    Return the permission row (view / add_permission / edit_permission /
+    delete_permission) for (userid, module), or None if there is none.
+    """
+    key = (str(userid), module_name)
+    perm = _module_permissions.get(key, _MISSING)
+    if perm is not _MISSING:
+        return perm
+
+    cursor = current_app.mysql.connection.cursor(DictCursor)
+    cursor.execute("""
+        SELECT view, add_permission, edit_permission, delete_permission
+        FROM user_module_permissions
+        WHERE userid = %s AND modulename = %s
+    """, (userid, module_name))
+    perm = cursor.fetchone()
+    cursor.close()
+
+    # missing rows are cached too, so denied requests don't hit the DB either
+    _module_permissions.set(key, perm)
+    return perm
+
+
+def get_cached_role_permissions(role, loader):
+    """Return {module: allowed} for a role, calling `loader(role)` on a miss."""
+    key = (role or "").lower()
+    permissions = _role_permissions.get(key)
+    if permissions is None:
+        permissions = loader(role)
+        # the loader returns {} on DB errors as well, so only cache real results
+        if permissions:
+            _role_permissions.set(key, permissions)
+    return permissions
+
+
+def invalidate_permissions():
+    """Drop every cached permission; call after any write to user_module_permissions."""
+    _module_permissions.clear()
+    _role_permissions.clear()
@@ -0,0 +1,142 @@
+from collections import OrderedDict
+
+
+# ------------------ Bulk result writer ------------------ #
+# Saves a set of parameter results in two statements instead of a SELECT and
+# an UPDATE / INSERT per parameter:
+#   1. one read of the existing rows for the submitted (counter, patient test)
+#   2. one multi-row INSERT ... ON DUPLICATE KEY UPDATE for the rows that are
+#      new or whose value changed
+# Relies on the unique key (counter_id, patient_test_id, parameter_id) from
+# db/migrations/0005_patient_results_unique.sql.
+
+UPSERT_CHUNK_ROWS = 500
+
+RESULT_COLUMNS = ("result_value", "cutoff_value")
+
+
+def _value(v):
+    # compare the way the values end up stored (varchar columns)
+    return None if v is None else str(v)
+
+
+def _key(row):
+    return (int(row["counter_id"]), int(row["patient_test_id"]), int(row["parameter_id"]))
+
+
+def load_result_targets(cursor, pairs):
+    """
+    Return {(counter_id, test_profile_id): {"patient_id", "patient_test_id"}}
+    for the submitted (counter, test) pairs; pairs whose counter has no tests
+    are left out. Results go to the counter's patient_tests row of that test,
+    or its lowest row when the test is not on the counter, so every endpoint
+    writing results uses the same key.
+    """
+    counter_ids = sorted({int(c) for c, _ in pairs})
+    if not counter_ids:
+        return {}
+    cursor.execute(f"""
+        SELECT c.id AS counter_id, c.pt_id AS patient_id, pt.id AS patient_test_id, pt.test_id
+        FROM counter c
+        JOIN patient_tests pt ON pt.patient_id = c.pt_id AND pt.counter_id = c.id
+        WHERE c.id IN ({",".join(["%s"] * len(counter_ids))})
+        ORDER BY pt.id
+    """, counter_ids)
+    first, by_test = {}, {}
+    for row in cursor.fetchall():
+        first.setdefault(row["counter_id"], row)
+        by_test.setdefault((row["counter_id"], row["test_id"]), row)
+
+    targets = {}
+    for counter_id, test_id in pairs:
+        key = (int(counter_id), _int_or_none(test_id))
+        row = by_test.get(key) or first.get(key[0])
+        if row:
+            targets[key] = {"patient_id": row["patient_id"], "patient_test_id": row["patient_test_id"]}
+    return targets
+
+
+def _int_or_none(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def valid_parameter_id(value):
+    """True for an integer id (int or digit string); endpoints reject the rest with 400."""
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, int):
+        return True
+    return isinstance(value, str) and value.strip().isdigit()
+
+
+def load_existing_results(cursor, keys):
+    """Return {(counter_id, patient_test_id, parameter_id): row} for the given keys."""
+    counter_ids = sorted({k[0] for k in keys})
+    patient_test_ids = sorted({k[1] for k in keys})
+    if not counter_ids:
+        return {}
+    cursor.execute(f"""
+        SELECT id, counter_id, patient_test_id, parameter_id, result_value, cutoff_value
+        FROM patient_results
+        WHERE counter_id IN ({",".join(["%s"] * len(counter_ids))})
+            AND patient_test_id IN ({",".join(["%s"] * len(patient_test_ids))})
+    """, counter_ids + patient_test_ids)
+    wanted = set(keys)
+    existing = {}
+    for row in cursor.fetchall():
+        key = (row["counter_id"], row["patient_test_id"], row["parameter_id"])
+        if key in wanted:
+            existing[key] = row
+    return existing
+
+
+def write_results(cursor, rows):
+    """
+    Upsert parameter results. Each row is a dict with counter_id, patient_id,
+    patient_test_id, test_profile_id, parameter_id, result_value, cutoff_value.
+    A later row for the same key replaces an earlier one.
+
+    Returns {"inserted": [...], "updated": [...], "unchanged": [...]} of row dicts.
+    """
+    submitted = OrderedDict()
+    for row in rows:
+        submitted[_key(row)] = row
+
+    existing = load_existing_results(cursor, list(submitted))
+
+    changes = {"inserted": [], "updated": [], "unchanged": []}
+    pending = []
+    for key, row in submitted.items():
+        current = existing.get(key)
+        if current is None:
+            changes["inserted"].append(row)
+        elif any(_value(current[c]) != _value(row.get(c)) for c in RESULT_COLUMNS):
+            changes["updated"].append(row)
+        else:
+            changes["unchanged"].append(row)
+            continue
+        pending.append(row)
+
+    for i in range(0, len(pending), UPSERT_CHUNK_ROWS):
+        chunk = pending[i:i + UPSERT_CHUNK_ROWS]
+        params = []
+        for row in chunk:
+            params.extend((
+                row["patient_id"], row["patient_test_id"], row["parameter_id"],
+                row.get("result_value"), row.get("cutoff_value"),
+                row.get("test_profile_id"), row["counter_id"],
+            ))
+        cursor.execute("""
+            INSERT INTO patient_results
+                (patient_id, patient_test_id, parameter_id, result_value, cutoff_value,
+                 created_at, test_profile_id, is_completed, counter_id)
+            VALUES """ + ",".join(["(%s, %s, %s, %s, %s, NOW(), %s, 0, %s)"] * len(chunk)) + """
+            ON DUPLICATE KEY UPDATE
+                result_value = VALUES(result_value),
+                cutoff_value = VALUES(cutoff_value)
+        """, params)
+
+    return changes
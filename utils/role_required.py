@@ -1,11 +1,11 @@
 from functools import wraps
-from flask import request, jsonify, current_app
-from MySQLdb.cursors import DictCursor
+from flask import request, jsonify
+from utils.permission_cache import get_module_permission
 
 def role_required(module_name, action):
     """
     Check user permissions (view, add, edit, delete) from user_module_permissions table.
-    Requires `userid` in request header.
+    Requires `userid` in request header. Lookups are served from the permission cache.
     """
     def decorator(func):
         @wraps(func)
@@ -14,15 +14,7 @@ def role_required(module_name, action):
             if not userid:
                 return jsonify({"error": "userid header is required"}), 400
 
-            conn = current_app.mysql.connection
-            cursor = conn.cursor(DictCursor)
-            cursor.execute("""
-                SELECT view, add_permission, edit_permission, delete_permission
-                FROM user_module_permissions
-                WHERE userid = %s AND modulename = %s
-            """, (userid, module_name))
-            perm = cursor.fetchone()
-            cursor.close()
+            perm = get_module_permission(userid, module_name)
 
             if not perm:
                 return jsonify({"error": f"No permissions found for module '{module_name}'"}), 403
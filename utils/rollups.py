@@ -0,0 +1,376 @@
+import os
+from datetime import date, datetime, timedelta
+import click
+import MySQLdb
+from flask import current_app
+from flask.cli import AppGroup
+from MySQLdb.cursors import DictCursor
+
+
+# ------------------ Business summary (single pass + daily rollup) ------------------ #
+# The business summary is computed with one conditional-aggregation pass per
+# table. For date ranges it is read from business_daily_rollup
+# (db/migrations/0001_business_daily_rollup.sql): days that are missing are
+# recomputed from the raw tables, the rest are summed straight from the
+# rollup. Write paths call invalidate_rollups() so the days they touch are
+# recomputed on the next read. Only the last ROLLUP_RECENT_DAYS days also
+# expire after ROLLUP_TTL seconds (a backstop for writes that bypass the
+# hooks); older days stay fresh until they are invalidated.
+
+ROLLUP_TTL = int(os.getenv("ROLLUP_TTL", 300))
+ROLLUP_RECENT_DAYS = int(os.getenv("ROLLUP_RECENT_DAYS", 1))
+
+# rollup rows that can be used as they are
+FRESH_DAY_SQL = "(day < CURDATE() - INTERVAL %s DAY OR refreshed_at >= NOW() - INTERVAL %s SECOND)"
+
+BUSINESS_FIELDS = (
+    "total_patient", "pending_patient", "patient_processed",
+    "total_discount", "total_amount", "paid_amount", "due_amount",
+    "total_test", "processed_test", "unprocessed_test_count",
+)
+
+COUNTER_TOTALS = """
+    COUNT(*) AS total_patient,
+    SUM(status = 0) AS pending_patient,
+    SUM(status = 1) AS patient_processed,
+    SUM(CASE WHEN discount > 0 THEN discount END) AS total_discount,
+    SUM(total_fee) AS total_amount,
+    SUM(paid) AS paid_amount,
+    SUM(total_fee - paid) AS due_amount
+"""
+
+TEST_TOTALS = """
+    COUNT(*) AS total_test,
+    SUM(status = 1) AS processed_test,
+    SUM(status = 0) AS unprocessed_test_count
+"""
+
+ER_NO_SUCH_TABLE = 1146
+
+
+def _no_table(e):
+    return bool(e.args) and e.args[0] == ER_NO_SUCH_TABLE
+
+
+def _zeroed(row):
+    row = dict(row or {})
+    return {k: row.get(k) or 0 for k in BUSINESS_FIELDS}
+
+
+def day_runs(first_day, last_day, fresh_days):
+    """Split [first_day, last_day] minus `fresh_days` into contiguous (start, end) runs."""
+    runs, start, day = [], None, first_day
+    while day <= last_day:
+        if day in fresh_days:
+            if start:
+                runs.append((start, day - timedelta(days=1)))
+                start = None
+        elif start is None:
+            start = day
+        day += timedelta(days=1)
+    if start:
+        runs.append((start, last_day))
+    return runs
+
+
+def parse_day(value):
+    """'YYYY-MM-DD' -> date, anything else (missing, datetime strings) -> None."""
+    try:
+        return datetime.strptime(str(value), "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+
+
+def business_totals_live(cursor, start=None, end=None):
+    """
+    One pass over counter and one over patient_tests. start / end are
+    compared as given (BETWEEN), no filter when either is missing.
+    """
+    counter_where, tests_where, params = "", "", []
+    if start and end:
+        counter_where = " WHERE date_created BETWEEN %s AND %s"
+        tests_where = " WHERE verified_at BETWEEN %s AND %s"
+        params = [start, end, start, end]
+
+    cursor.execute(f"""
+        SELECT c.*, t.*
+        FROM (SELECT {COUNTER_TOTALS} FROM counter{counter_where}) c
+        CROSS JOIN (SELECT {TEST_TOTALS} FROM patient_tests{tests_where}) t
+    """, params)
+    return _zeroed(cursor.fetchone())
+
+
+def refresh_business_days(cursor, first_day, last_day):
+    """Recompute the rollup rows of every day in [first_day, last_day]."""
+    end = last_day + timedelta(days=1)
+
+    cursor.execute(f"""
+        SELECT DATE(date_created) AS day, {COUNTER_TOTALS}
+        FROM counter
+        WHERE date_created >= %s AND date_created < %s
+        GROUP BY DATE(date_created)
+    """, (first_day, end))
+    counters = {row["day"]: row for row in cursor.fetchall()}
+
+    cursor.execute(f"""
+        SELECT DATE(verified_at) AS day, {TEST_TOTALS}
+        FROM patient_tests
+        WHERE verified_at >= %s AND verified_at < %s
+        GROUP BY DATE(verified_at)
+    """, (first_day, end))
+    tests = {row["day"]: row for row in cursor.fetchall()}
+
+    rows, day = [], first_day
+    while day <= last_day:
+        totals = _zeroed({**(counters.get(day) or {}), **(tests.get(day) or {})})
+        rows.append([day] + [totals[k] for k in BUSINESS_FIELDS])
+        day += timedelta(days=1)
+
+    columns = ", ".join(BUSINESS_FIELDS)
+    updates = ", ".join(f"{k} = VALUES({k})" for k in BUSINESS_FIELDS)
+    cursor.executemany(f"""
+        INSERT INTO business_daily_rollup (day, {columns}, refreshed_at)
+        VALUES (%s, {', '.join(['%s'] * len(BUSINESS_FIELDS))}, NOW())
+        ON DUPLICATE KEY UPDATE {updates}, refreshed_at = NOW()
+    """, rows)
+
+
+def business_totals(cursor, start=None, end=None):
+    """
+    Business summary for start..end. Plain dates (YYYY-MM-DD, end inclusive)
+    are served from the daily rollup; anything else falls back to the live
+    single-pass query. `cursor` must be a DictCursor.
+    """
+    first_day, last_day = parse_day(start), parse_day(end)
+    if not first_day or not last_day or first_day > last_day:
+        return business_totals_live(cursor, start, end)
+
+    try:
+        cursor.execute("""
+            SELECT day
+            FROM business_daily_rollup
+            WHERE day BETWEEN %s AND %s AND """ + FRESH_DAY_SQL + """
+        """, (first_day, last_day, ROLLUP_RECENT_DAYS, ROLLUP_TTL))
+        runs = day_runs(first_day, last_day, {row["day"] for row in cursor.fetchall()})
+        for run_start, run_end in runs:
+            refresh_business_days(cursor, run_start, run_end)
+        if runs:
+            cursor.connection.commit()
+
+        sums = ", ".join(f"SUM({k}) AS {k}" for k in BUSINESS_FIELDS)
+        cursor.execute(f"""
+            SELECT {sums} FROM business_daily_rollup WHERE day BETWEEN %s AND %s
+        """, (first_day, last_day))
+        return _zeroed(cursor.fetchone())
+    except MySQLdb.Error as e:
+        # rollup table not migrated yet
+        if not _no_table(e):
+            raise
+        return business_totals_live(cursor, f"{first_day} 00:00:00", f"{last_day} 23:59:59")
+
+
+# ------------------ Daily sales / voucher rollups ------------------ #
+# counter_daily_rollup, counter_cc_daily_rollup and counter_user_daily_rollup
+# (bucketed by DATE(counter.created_at)) and voucher_daily_rollup (by
+# journal_voucher.date), see db/migrations/0002_sales_voucher_rollups.sql.
+# rollup_days records which days are materialised. Write paths delete the
+# rollup_days rows of the days they touch (invalidate_rollups /
+# invalidate_voucher_rollups) and readers recompute only those days, so a
+# dashboard over any range reads pre-aggregated rows plus at most the few
+# days written since the last read.
+
+SALES = "sales"
+VOUCHERS = "vouchers"
+
+COUNTER_SUMS = """
+    COUNT(*) AS counters,
+    COALESCE(SUM(total_fee), 0) AS total_fee,
+    COALESCE(SUM(paid), 0) AS paid,
+    COALESCE(SUM(discount), 0) AS discount
+"""
+
+
+def _refresh_sales_days(cursor, first_day, last_day):
+    end = last_day + timedelta(days=1)
+    for table in ("counter_daily_rollup", "counter_cc_daily_rollup", "counter_user_daily_rollup"):
+        cursor.execute(f"DELETE FROM {table} WHERE day BETWEEN %s AND %s", (first_day, last_day))
+
+    for table, key in (("counter_daily_rollup", None),
+                       ("counter_cc_daily_rollup", "cc"),
+                       ("counter_user_daily_rollup", "user_id")):
+        key_col = f"{key}, " if key else ""
+        key_expr = f"COALESCE({key}, 0), " if key else ""
+        cursor.execute(f"""
+            INSERT INTO {table} (day, {key_col}trash, counters, total_fee, paid, discount)
+            SELECT DATE(created_at), {key_expr}COALESCE(trash, 0), {COUNTER_SUMS}
+            FROM counter
+            WHERE created_at >= %s AND created_at < %s
+            GROUP BY DATE(created_at), {key_expr}COALESCE(trash, 0)
+        """, (first_day, end))
+
+
+def _refresh_voucher_days(cursor, first_day, last_day):
+    cursor.execute("DELETE FROM voucher_daily_rollup WHERE day BETWEEN %s AND %s", (first_day, last_day))
+    cursor.execute("""
+        INSERT INTO voucher_daily_rollup (day, voucher_type, trash, vouchers, total_dr, total_cr)
+        SELECT j.date, j.voucher_type, COALESCE(j.trash, 0), COUNT(DISTINCT j.id),
+            COALESCE(SUM(e.dr), 0), COALESCE(SUM(e.cr), 0)
+        FROM journal_voucher j
+        JOIN journal_voucher_entries e ON e.journal_voucher_id = j.id
+        WHERE j.date BETWEEN %s AND %s AND j.voucher_type IS NOT NULL
+        GROUP BY j.date, j.voucher_type, COALESCE(j.trash, 0)
+    """, (first_day, last_day))
+
+
+ROLLUPS = {
+    SALES: _refresh_sales_days,
+    VOUCHERS: _refresh_voucher_days,
+}
+
+
+def refresh_rollup(cursor, rollup, first_day, last_day):
+    """Recompute `rollup` for every day in [first_day, last_day] and mark the days fresh."""
+    ROLLUPS[rollup](cursor, first_day, last_day)
+    days, day = [], first_day
+    while day <= last_day:
+        days.append((rollup, day))
+        day += timedelta(days=1)
+    cursor.executemany("""
+        INSERT INTO rollup_days (rollup, day, refreshed_at) VALUES (%s, %s, NOW())
+        ON DUPLICATE KEY UPDATE refreshed_at = NOW()
+    """, days)
+
+
+def ensure_rollup(cursor, rollup, first_day, last_day):
+    """
+    Make sure `rollup` is materialised for [first_day, last_day], recomputing
+    only missing (invalidated) days and recent days older than ROLLUP_TTL. Returns False when the rollup tables are not
+    migrated yet (callers then run their live query).
+    """
+    try:
+        cursor.execute("""
+            SELECT day FROM rollup_days
+            WHERE rollup = %s AND day BETWEEN %s AND %s
+                AND """ + FRESH_DAY_SQL + """
+        """, (rollup, first_day, last_day, ROLLUP_RECENT_DAYS, ROLLUP_TTL))
+        fresh = {row["day"] for row in cursor.fetchall()}
+        runs = day_runs(first_day, last_day, fresh)
+        for run_start, run_end in runs:
+            refresh_rollup(cursor, rollup, run_start, run_end)
+        if runs:
+            cursor.connection.commit()
+        return True
+    except MySQLdb.Error as e:
+        if not _no_table(e):
+            raise
+        return False
+
+
+def day_range(from_date, to_date, default_days=7):
+    """
+    (first_day, last_day) for a from_date / to_date pair; the last
+    `default_days` days up to today when both are missing; None when
+    the values are not plain YYYY-MM-DD dates.
+    """
+    if not from_date and not to_date:
+        today = date.today()
+        return today - timedelta(days=default_days), today
+    first_day, last_day = parse_day(from_date), parse_day(to_date)
+    if not first_day or not last_day or first_day > last_day:
+        return None
+    return first_day, last_day
+
+
+# ------------------ Write path hooks ------------------ #
+def _delete_days(cursor, sql, params):
+    try:
+        cursor.execute(sql, params)
+    except MySQLdb.Error as e:
+        # rollup tables not migrated yet
+        if not _no_table(e):
+            raise
+
+
+def invalidate_rollups(cursor, counter_ids=(), patient_id=None):
+    """
+    Drop the business and sales rollup days a counter write is about to
+    change: the registration and verification days of `counter_ids` (or of
+    every counter of `patient_id`), plus today. Call it before the write,
+    in the same transaction.
+    """
+    counter_ids = [int(c) for c in counter_ids if c is not None]
+    days_sql, params = "SELECT CURDATE()", []
+    if counter_ids:
+        ids = ",".join(["%s"] * len(counter_ids))
+        days_sql += f"""
+            UNION SELECT DATE(date_created) FROM counter WHERE id IN ({ids})
+            UNION SELECT DATE(created_at) FROM counter WHERE id IN ({ids})
+            UNION SELECT DATE(verified_at) FROM patient_tests WHERE counter_id IN ({ids}) AND verified_at IS NOT NULL
+        """
+        params += counter_ids * 3
+    if patient_id is not None:
+        days_sql += """
+            UNION SELECT DATE(date_created) FROM counter WHERE pt_id = %s
+            UNION SELECT DATE(created_at) FROM counter WHERE pt_id = %s
+            UNION SELECT DATE(verified_at) FROM patient_tests WHERE patient_id = %s AND verified_at IS NOT NULL
+        """
+        params += [patient_id] * 3
+
+    _delete_days(cursor, f"DELETE FROM business_daily_rollup WHERE day IN ({days_sql})", params)
+    _delete_days(cursor, f"DELETE FROM rollup_days WHERE rollup = %s AND day IN ({days_sql})", [SALES] + params)
+
+
+def invalidate_voucher_rollups(cursor, voucher_ids=(), days=()):
+    """
+    Drop the voucher rollup days a voucher write is about to change: the
+    current date of `voucher_ids` plus any new `days`. Call it before the write.
+    """
+    voucher_ids = [int(v) for v in voucher_ids if v is not None]
+    days = [d for d in days if d]
+    parts, params = [], []
+    if voucher_ids:
+        parts.append(f"SELECT date FROM journal_voucher WHERE id IN ({','.join(['%s'] * len(voucher_ids))})")
+        params += voucher_ids
+    for d in days:
+        parts.append("SELECT DATE(%s)")
+        params.append(d)
+    if not parts:
+        return
+    _delete_days(cursor, f"DELETE FROM rollup_days WHERE rollup = %s AND day IN ({' UNION '.join(parts)})",
+                 [VOUCHERS] + params)
+
+
+# ------------------ Rebuild command ------------------ #
+# flask --app main rollups rebuild --from 2024-01-01 --to 2024-12-31 [--only sales]
+rollups_cli = AppGroup("rollups", help="Maintain the reporting rollup tables.")
+
+
+@rollups_cli.command("rebuild")
+@click.option("--from", "from_date", required=True, help="First day (YYYY-MM-DD).")
+@click.option("--to", "to_date", default=None, help="Last day (YYYY-MM-DD), default today.")
+@click.option("--only", type=click.Choice(["business", SALES, VOUCHERS]), default=None)
+@click.option("--chunk-days", default=31, show_default=True, help="Days recomputed per transaction.")
+def rebuild_command(from_date, to_date, only, chunk_days):
+    """Recompute rollups for a date range (backfill or repair)."""
+    first_day = parse_day(from_date)
+    last_day = parse_day(to_date) if to_date else date.today()
+    if not first_day or not last_day or first_day > last_day:
+        raise click.BadParameter("expected --from <= --to as YYYY-MM-DD")
+
+    connection = current_app.mysql.connection
+    cursor = connection.cursor(DictCursor)
+    names = [only] if only else ["business", SALES, VOUCHERS]
+    try:
+        for name in names:
+            start = first_day
+            while start <= last_day:
+                end = min(start + timedelta(days=chunk_days - 1), last_day)
+                if name == "business":
+                    refresh_business_days(cursor, start, end)
+                else:
+                    refresh_rollup(cursor, name, start, end)
+                connection.commit()
+                click.echo(f"{name}: {start} .. {end}")
+                start = end + timedelta(days=1)
+    finally:
+        cursor.close()
@@ -0,0 +1,67 @@
+import os
+import sqlite3
+import threading
+import time
+from flask import current_app
+
+
+class TableVersionStore:
+    """
+    Per-table change counters shared by every worker process on the host.
+
+    Write endpoints bump the tables they changed after commit; caches and
+    ETags compare versions instead of querying MySQL. Versions live in a small
+    SQLite file (like the revoked token store). A bump moves the version to at
+    least the current time in ms, so versions never repeat even if the file
+    is deleted.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS table_versions (
+                name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL
+            )
+        """)
+        conn.commit()
+
+    def _conn(self):
+        # sqlite3 connections are not shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            self._local.conn = conn
+        return conn
+
+    def bump(self, *tables):
+        now_ms = int(time.time() * 1000)
+        conn = self._conn()
+        conn.executemany("""
+            INSERT INTO table_versions (name, version) VALUES (?, ?)
+            ON CONFLICT(name) DO UPDATE SET version = MAX(version + 1, excluded.version)
+        """, [(t, now_ms) for t in tables])
+        conn.commit()
+
+    def versions(self, *tables):
+        """Return a tuple of versions in the order asked (0 = never bumped)."""
+        rows = self._conn().execute(
+            f"SELECT name, version FROM table_versions WHERE name IN ({','.join('?' * len(tables))})",
+            tables
+        ).fetchall()
+        found = dict(rows)
+        return tuple(found.get(t, 0) for t in tables)
+
+
+def bump_tables(*tables):
+    """Record a committed write to `tables`; call after mysql.connection.commit()."""
+    current_app.table_versions.bump(*tables)
+
+
+def table_versions(*tables):
+    return current_app.table_versions.versions(*tables)
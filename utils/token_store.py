@@ -0,0 +1,88 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from utils.cache import TTLCache
+
+
+class RevokedTokenStore:
+    """
+    Revoked JWT store shared by every worker process on the host.
+
+    Entries live in a small SQLite file keyed by the token's `jti` (or a
+    SHA-256 of the raw token for tokens issued without one) and are dropped
+    once their `exp` has passed. Revoked keys are also kept in a bounded
+    in-memory front cache so repeated requests with the same token skip SQLite.
+    """
+
+    PURGE_INTERVAL = 300  # seconds between expired-row sweeps
+
+    def __init__(self, path, max_cached=10000):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        self._cache = TTLCache(max_size=max_cached, ttl=None)
+        self._last_purge = 0
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS revoked_tokens (
+                token_key TEXT PRIMARY KEY,
+                expires_at INTEGER NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_revoked_expires ON revoked_tokens (expires_at)")
+        conn.commit()
+
+    def _conn(self):
+        # sqlite3 connections are not shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def token_key(token, payload=None):
+        if payload and payload.get("jti"):
+            return f"jti:{payload['jti']}"
+        return "sha256:" + hashlib.sha256(token.encode()).hexdigest()
+
+    def revoke(self, token, payload):
+        """Revoke a decoded token until its `exp` timestamp."""
+        key = self.token_key(token, payload)
+        expires_at = int(payload.get("exp") or time.time() + 86400)
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO revoked_tokens (token_key, expires_at) VALUES (?, ?)",
+            (key, expires_at)
+        )
+        conn.commit()
+        self._cache.set(key, expires_at, ttl=max(expires_at - time.time(), 1))
+        self.purge_expired()
+
+    def is_revoked(self, token, payload=None):
+        key = self.token_key(token, payload)
+        if self._cache.get(key) is not None:
+            return True
+
+        row = self._conn().execute(
+            "SELECT expires_at FROM revoked_tokens WHERE token_key = ?", (key,)
+        ).fetchone()
+        if not row or row[0] <= time.time():
+            return False
+
+        self._cache.set(key, row[0], ttl=max(row[0] - time.time(), 1))
+        return True
+
+    def purge_expired(self, force=False):
+        now = time.time()
+        if not force and now - self._last_purge < self.PURGE_INTERVAL:
+            return 0
+        self._last_purge = now
+        conn = self._conn()
+        deleted = conn.execute("DELETE FROM revoked_tokens WHERE expires_at <= ?", (int(now),)).rowcount
+        conn.commit()
+        return deleted
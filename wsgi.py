@@ -0,0 +1,7 @@
+# ---------- Production entry point ----------
+# gunicorn -c gunicorn.conf.py wsgi:app
+# Every worker imports this module after the fork (preload_app is off), so each
+# one builds its own app, MySQL pool and caches.
+from main import create_app
+
+app = create_app()